@@ -20,6 +20,7 @@ import os
 import platform
 import shutil
 import signal
+import subprocess
 import sys
 import tempfile
 import traceback
@@ -194,6 +195,9 @@ class CLI(object):
             overrider = ConfigOverrider(self.log)
             overrider.apply_overrides(self.options.option, self.engine.config)
 
+        if self.options.recheck_tools:
+            self.engine.config.get(SETTINGS)["recheck-tools"] = True
+
         if self.__is_verbose():
             CLI.console_handler.setLevel(logging.DEBUG)
         self.engine.create_artifacts_dir(configs, merged_config)
@@ -652,9 +656,47 @@ def get_option_parser():
                       help="Prints all logging messages to console")
     parser.add_option('-n', '--no-system-configs', action='store_true',
                       help="Skip system and user config files")
+    parser.add_option('--recheck-tools', action='store_true',
+                      help="Ignore cached results of tools installation checks")
+    parser.add_option('--import-profile', action='store_true',
+                      help="Print modules imported on startup with their import time and exit")
     return parser
 
 
+def get_import_profile(module="bzt.cli", limit=30):
+    """
+    Run `python -X importtime` for module in clean interpreter
+
+    :return: list of (self_us, cumulative_us, module_name) sorted by cumulative time, longest first
+    """
+    cmd = [sys.executable, "-X", "importtime", "-c", "import %s" % module]
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+    if proc.returncode:
+        raise TaurusInternalException("Failed to import %s: %s" % (module, proc.stderr.strip()))
+
+    records = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():  # header line
+            continue
+        records.append((int(parts[0]), int(parts[1]), parts[2].strip()))
+
+    records.sort(key=lambda rec: rec[1], reverse=True)
+    return records[:limit] if limit else records
+
+
+def print_import_profile(limit=30):
+    records = get_import_profile(limit=0)
+    total = max(rec[1] for rec in records) if records else 0
+    sys.stdout.write("%d modules imported in %.1fms on startup, top %d by cumulative time:\n" %
+                     (len(records), total / 1000.0, limit))
+    sys.stdout.write("%10s %10s  %s\n" % ("self, ms", "cumul, ms", "module"))
+    for self_us, cumulative_us, name in records[:limit]:
+        sys.stdout.write("%10.1f %10.1f  %s\n" % (self_us / 1000.0, cumulative_us / 1000.0, name))
+
+
 def signal_handler(sig, frame):
     """
     required for non-tty python runs to interrupt
@@ -673,6 +715,10 @@ def main():
 
     parsed_options, parsed_configs = parser.parse_args()
 
+    if parsed_options.import_profile:
+        print_import_profile()
+        sys.exit(0)
+
     executor = CLI(parsed_options)
 
     try:
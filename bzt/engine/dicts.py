@@ -16,10 +16,14 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 import codecs
-import copy
+import hashlib
 import json
 import logging
+import os
+import pickle
 import re
+import threading
+import time
 from collections import defaultdict
 from json import encoder
 
@@ -32,7 +36,10 @@ from bzt import TaurusConfigError, TaurusInternalException, InvalidTaurusConfigu
 from bzt.requests_model import RequestParser
 from collections import UserDict
 from bzt.utils import str_representer, parse_think_time
-from bzt.utils import to_json, ensure_is_dict, BetterDict
+from bzt.utils import to_json, ensure_is_dict, BetterDict, ComplexEncoder
+
+SENSITIVE_SUFFIXES = ('password', 'secret', 'token',)
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 class Scenario(UserDict, object):
@@ -127,6 +134,131 @@ class Scenario(UserDict, object):
         return requests_parser.extract_requests(require_url=require_url, )
 
 
+class ConfigCache(object):
+    """
+    Persistent cache of parsed config documents (and other small values) in cache dir.
+    Config entry is valid while content hash matches. Matching file path, mtime and size are trusted
+    without reading the file only if mtime is fine-grained and older than the entry itself.
+    Least recently used entries are evicted when cache exceeds MAX_ENTRIES or MAX_SIZE bytes.
+    """
+    MAX_ENTRIES = 256
+    MAX_SIZE = 32 * 1024 * 1024
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.log = logging.getLogger('')
+
+    def _entry_file(self, name):
+        return os.path.join(self.cache_dir, hashlib.sha1(name.encode('utf-8')).hexdigest() + ".pickle")
+
+    def _read_entry(self, name):
+        fname = self._entry_file(name)
+        try:
+            with open(fname, 'rb') as fds:
+                entry = pickle.load(fds)
+        except FileNotFoundError:
+            return None
+        except BaseException as exc:
+            self.log.debug("Failed to read config cache entry for %s: %s", name, exc)
+            return None
+
+        if not isinstance(entry, dict) or entry.get("name") != name:
+            return None
+
+        try:
+            os.utime(fname)  # mtime of entry file is its last use time
+        except OSError:
+            pass
+        return entry
+
+    def _write_entry(self, name, entry):
+        entry["name"] = name
+        fname = self._entry_file(name)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            is_new = not os.path.exists(fname)
+            with open(fname + ".tmp", 'wb') as fds:
+                pickle.dump(entry, fds, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(fname + ".tmp", fname)
+            if is_new:
+                self._evict()
+        except BaseException as exc:
+            self.log.debug("Failed to write config cache entry for %s: %s", name, exc)
+
+    def _evict(self):
+        entries = []
+        for dir_entry in os.scandir(self.cache_dir):
+            if dir_entry.name.endswith(".pickle"):
+                stat = dir_entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, dir_entry.path))
+
+        entries.sort()
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if len(entries) <= self.MAX_ENTRIES and total_size <= self.MAX_SIZE:
+                break
+            self.log.debug("Evicting config cache entry %s", path)
+            os.remove(path)
+            entries.pop(0)
+            total_size -= size
+
+    @staticmethod
+    def _is_trusted_stat(entry, stat):
+        """
+        Same mtime and size doesn't mean same content on filesystems with coarse mtime
+        or when file was modified right around caching moment
+        """
+        if (entry["mtime"], entry["size"]) != (stat.st_mtime_ns, stat.st_size):
+            return False
+
+        fine_grained = stat.st_mtime_ns % 10 ** 9 != 0
+        return fine_grained and stat.st_mtime_ns < entry.get("cached", 0) - 10 ** 9
+
+    def load(self, filename, parse):
+        """
+        Get parsed documents of config file, calling parse(filename, contents) on cache miss
+
+        :type filename: str
+        :type parse: callable
+        :rtype: list
+        """
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        entry = self._read_entry(path)
+        if entry and self._is_trusted_stat(entry, stat):
+            self.log.debug("Using cached %s", filename)
+            return entry["docs"]
+
+        with open(path, 'rb') as fds:
+            raw = fds.read()
+
+        digest = hashlib.sha1(raw).hexdigest()
+        if entry and entry["hash"] == digest:
+            self.log.debug("Using cached %s (content is not changed)", filename)
+            docs = entry["docs"]
+            if (entry["mtime"], entry["size"]) == (stat.st_mtime_ns, stat.st_size) and not stat.st_mtime_ns % 10 ** 9:
+                return docs  # coarse mtime, rewritten entry wouldn't be trusted anyway
+        else:
+            docs = parse(filename, raw.decode('utf-8'))
+
+        entry = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "hash": digest, "cached": time.time_ns(),
+                 "docs": docs}
+        self._write_entry(path, entry)
+        return docs
+
+    def get(self, name, key):
+        """
+        Get value stored with `put`, if it was stored with the same key
+        """
+        entry = self._read_entry(name)
+        if entry and entry.get("key") == key:
+            return entry["value"]
+        return None
+
+    def put(self, name, key, value):
+        self._write_entry(name, {"key": key, "value": value})
+
+
 class Configuration(BetterDict):
     """
     loading both JSONs and YAMLs and .properties-like override
@@ -142,6 +274,20 @@ class Configuration(BetterDict):
         self.dump_filename = None
         self.tab_replacement_spaces = 0
         self.warn_on_tab_replacement = True
+        self.dump_in_background = False
+        self._dump_hashes = {}
+        self._dump_lock = threading.Lock()
+        self._dump_thread = None
+        self._dump_pending = None
+        self.cache = None
+
+    def set_cache_dir(self, cache_dir):
+        """
+        Enable persistent cache of parsed config files
+
+        :type cache_dir: str or NoneType
+        """
+        self.cache = ConfigCache(cache_dir) if cache_dir else None
 
     def load(self, config_files, callback=None):
         """
@@ -153,14 +299,16 @@ class Configuration(BetterDict):
         self.log.debug("Configs: %s", config_files)
         for config_file in config_files:
             try:
-                configs = []
-                with codecs.open(config_file, 'r', encoding='utf-8') as fds:
-                    if self.tab_replacement_spaces:
-                        contents = self._replace_tabs(fds.readlines(), config_file)
-                    else:
-                        contents = fds.read()
+                if self.cache and not self.tab_replacement_spaces:
+                    configs = self.cache.load(config_file, self._parse_contents)
+                else:
+                    with codecs.open(config_file, 'r', encoding='utf-8') as fds:
+                        if self.tab_replacement_spaces:
+                            contents = self._replace_tabs(fds.readlines(), config_file)
+                        else:
+                            contents = fds.read()
 
-                    self._read_yaml_or_json(config_file, configs, contents)
+                    configs = self._parse_contents(config_file, contents)
 
                 for config in configs:
                     self.merge(config)
@@ -175,10 +323,15 @@ class Configuration(BetterDict):
             if callback is not None:
                 callback(config_file)
 
+    def _parse_contents(self, config_file, contents):
+        configs = []
+        self._read_yaml_or_json(config_file, configs, contents)
+        return configs
+
     def _read_yaml_or_json(self, config_file, configs, contents):
         try:
             self.log.debug("Reading %s as YAML", config_file)
-            yaml_documents = list(yaml.safe_load_all(contents))
+            yaml_documents = list(yaml.load_all(contents, Loader=YAML_LOADER))
             for doc in yaml_documents:
                 if doc is None:
                     continue
@@ -198,13 +351,15 @@ class Configuration(BetterDict):
             else:
                 raise
 
-    def set_dump_file(self, filename):
+    def set_dump_file(self, filename, background=False):
         """
         Set default file and format to be used by `dump` method
 
         :type filename: str
+        :param background: write default dumps from separate thread
         """
         self.dump_filename = filename
+        self.dump_in_background = background
 
     def write(self, fds, fmt):
         """
@@ -228,7 +383,9 @@ class Configuration(BetterDict):
     def dump(self, filename=None, fmt=None):
         """
         Dump current state of dict into file. If no filename or format
-        specified, defaults are used
+        specified, defaults are used and both YAML and JSON are written,
+        unless nothing has changed since previous default dump.
+        Sensitive values are masked and infinities are stringified on the fly.
 
         :type filename: str or NoneType
         :type fmt: str or NoneType
@@ -236,29 +393,78 @@ class Configuration(BetterDict):
         if not filename:
             filename = self.dump_filename
 
-        if filename:
-            if not fmt:
-                self.dump(filename + ".yml", self.YAML)
-                self.dump(filename + ".json", self.JSON)
-                return
+        if not filename:
+            return
 
-            acopy = copy.deepcopy(self)
-            BetterDict.traverse(acopy, self.masq_sensitive)
-            BetterDict.traverse(acopy, self.replace_infinities)
+        if fmt:
+            self.log.debug("Dumping %s config into %s", fmt, filename)
             with open(filename, "wb") as fhd:
-                self.log.debug("Dumping %s config into %s", fmt, filename)
-                acopy.write(fhd, fmt)
+                write_sanitized(self, fhd, fmt)
+            return
+
+        if self.dump_in_background:
+            snapshot = config_snapshot(self)  # config keeps changing while worker writes
+            with self._dump_lock:
+                self._dump_pending = (filename, snapshot)
+                if self._dump_thread is None:
+                    self._dump_thread = threading.Thread(target=self._dump_worker, name="config-dump", daemon=True)
+                    self._dump_thread.start()
+        else:
+            self._write_dumps(filename, self)
+
+    def wait_for_dump(self):
+        """
+        Wait until background dump (if any) is written
+        """
+        with self._dump_lock:
+            thread = self._dump_thread
+
+        if thread is not None:
+            thread.join()
+
+    def _dump_worker(self):
+        while True:
+            with self._dump_lock:
+                if self._dump_pending is None:
+                    self._dump_thread = None
+                    return
+                filename, snapshot = self._dump_pending
+                self._dump_pending = None
+
+            try:
+                self._write_dumps(filename, snapshot)
+            except BaseException as exc:
+                self.log.warning("Failed to dump config into %s: %s", filename, exc)
+
+    def _write_dumps(self, filename, source):
+        """
+        Write default YAML and JSON dumps, unless JSON content is the same as previously written
+
+        :param source: config itself or its snapshot
+        """
+        json_data = "".join(iter_sanitized_json(source)).encode('utf-8') + b"\n"
+        digest = hashlib.md5(json_data).hexdigest()
+        if self._dump_hashes.get(filename) == digest:
+            self.log.debug("Config has not changed since last dump into %s", filename)
+            return
+
+        self.log.debug("Dumping %s config into %s", self.YAML, filename + ".yml")
+        with open(filename + ".yml", "wb") as fhd:
+            write_sanitized(source, fhd, self.YAML)
+
+        self.log.debug("Dumping %s config into %s", self.JSON, filename + ".json")
+        with open(filename + ".json", "wb") as fhd:
+            fhd.write(json_data)
+
+        self._dump_hashes[filename] = digest
 
     @staticmethod
     def masq_sensitive(value, key, container):
         """
         Remove sensitive data from config
         """
-        if isinstance(key, str):
-            for suffix in ('password', 'secret', 'token',):
-                if key.lower().endswith(suffix):
-                    if value and isinstance(value, str):
-                        container[key] = '*' * 8
+        if value and isinstance(value, str) and is_sensitive_key(key):
+            container[key] = '*' * 8
 
     @staticmethod
     def replace_infinities(value, key, container):
@@ -289,6 +495,143 @@ SafeDumper.add_representer(Configuration, SafeRepresenter.represent_dict)
 SafeDumper.add_representer(BetterDict, SafeRepresenter.represent_dict)
 SafeDumper.add_representer(str, str_representer)
 
+
+def is_sensitive_key(key):
+    return isinstance(key, str) and key.lower().endswith(SENSITIVE_SUFFIXES)
+
+
+def sanitize_value(key, value):
+    """
+    Same as Configuration.masq_sensitive and Configuration.replace_infinities, but returns new value
+    """
+    if isinstance(value, float):
+        if math.isinf(value) or math.isnan(value):
+            return str(value)
+    elif value and isinstance(value, str) and is_sensitive_key(key):
+        return '*' * 8
+    return value
+
+
+def _json_key(key):
+    if isinstance(key, str):
+        return encoder.encode_basestring_ascii(key)
+    elif key is True:
+        return '"true"'
+    elif key is False:
+        return '"false"'
+    elif key is None:
+        return '"null"'
+    elif isinstance(key, (int, float)):
+        return '"%s"' % key
+    raise TypeError("keys must be str, int, float, bool or None, not %s" % type(key).__name__)
+
+
+def iter_sanitized_json(obj, indent=" ", level=0, complex_encoder=ComplexEncoder()):
+    """
+    Generate JSON text chunks identical to `to_json(obj)` output for sanitized copy of obj, without making a copy
+    """
+    if isinstance(obj, str):
+        yield encoder.encode_basestring_ascii(obj)
+    elif obj is None:
+        yield 'null'
+    elif obj is True:
+        yield 'true'
+    elif obj is False:
+        yield 'false'
+    elif isinstance(obj, int):
+        yield int.__repr__(obj)
+    elif isinstance(obj, float):
+        yield float.__repr__(obj) if math.isfinite(obj) else encoder.encode_basestring_ascii(str(obj))
+    elif isinstance(obj, dict):
+        if not obj:
+            yield '{}'
+            return
+        separator = "{\n" + indent * (level + 1)
+        for key, val in obj.items():
+            yield separator + _json_key(key) + ": "
+            yield from iter_sanitized_json(sanitize_value(key, val), indent, level + 1)
+            separator = ",\n" + indent * (level + 1)
+        yield "\n" + indent * level + "}"
+    elif isinstance(obj, (list, tuple)):
+        if not obj:
+            yield '[]'
+            return
+        separator = "[\n" + indent * (level + 1)
+        for idx, val in enumerate(obj):
+            yield separator
+            yield from iter_sanitized_json(sanitize_value(idx, val), indent, level + 1)
+            separator = ",\n" + indent * (level + 1)
+        yield "\n" + indent * level + "]"
+    else:
+        yield from iter_sanitized_json(complex_encoder.default(obj), indent, level)
+
+
+YAML_WIDTH = -1 if hasattr(yaml, "CSafeDumper") else float("inf")  # negative width is unlimited for libyaml
+
+
+class SanitizingDumper(getattr(yaml, "CSafeDumper", SafeDumper)):
+    """
+    YAML dumper that masks sensitive values and stringifies infinities while representing,
+    uses libyaml emitter when available
+    """
+
+    def represent_sanitized_dict(self, data):
+        mapping = [(key, sanitize_value(key, val)) for key, val in data.items()]
+        if self.sort_keys:
+            try:
+                mapping.sort()
+            except TypeError:
+                pass
+        return self.represent_mapping('tag:yaml.org,2002:map', mapping)
+
+    def represent_sanitized_list(self, data):
+        sequence = [sanitize_value(idx, val) for idx, val in enumerate(data)]
+        return self.represent_sequence('tag:yaml.org,2002:seq', sequence)
+
+    def represent_sanitized_float(self, data):
+        if math.isfinite(data):
+            return self.represent_float(data)
+        return self.represent_str(str(data))
+
+
+for _dict_type in (dict, BetterDict, Configuration):
+    SanitizingDumper.add_representer(_dict_type, SanitizingDumper.represent_sanitized_dict)
+SanitizingDumper.add_representer(list, SanitizingDumper.represent_sanitized_list)
+SanitizingDumper.add_representer(float, SanitizingDumper.represent_sanitized_float)
+SanitizingDumper.add_representer(str, str_representer)
+
+
+def write_sanitized(obj, fds, fmt):
+    """
+    Stream sanitized config into binary file, see `Configuration.write` for non-sanitized output
+    """
+    if fmt == Configuration.JSON:
+        chunks = []
+        for chunk in iter_sanitized_json(obj):
+            chunks.append(chunk)
+            if len(chunks) >= 4096:
+                fds.write("".join(chunks).encode('utf-8'))
+                chunks = []
+        fds.write("".join(chunks).encode('utf-8'))
+    elif fmt == Configuration.YAML:
+        yaml.dump(obj, fds, Dumper=SanitizingDumper, default_flow_style=False, explicit_start=True,
+                  canonical=False, allow_unicode=True, encoding="utf-8", width=YAML_WIDTH)
+    else:
+        raise TaurusInternalException("Unknown dump format: %s" % fmt)
+    fds.write("\n".encode('utf-8'))
+
+
+def config_snapshot(obj):
+    """
+    Copy structure of dicts and lists, leaving values shared
+    """
+    if isinstance(obj, dict):
+        return {key: config_snapshot(val) for key, val in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return obj.__class__(config_snapshot(val) for val in obj)
+    return obj
+
+
 def replace_in_config(config, samples, substitutes, log=None):
     def file_replacer(value, key, container):
         if value in samples:
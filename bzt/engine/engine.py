@@ -28,16 +28,17 @@ import threading
 import time
 import traceback
 import uuid
-from distutils.version import LooseVersion
 from urllib import parse
 
 from bzt import ManualShutdown, get_configs_dir, TaurusConfigError, TaurusInternalException
 from bzt.utils import reraise, load_class, BetterDict, ensure_is_dict, dehumanize_time, is_windows, is_linux, temp_file
-from bzt.utils import shell_exec, get_full_path, ExceptionalDownloader, get_uniq_name, HTTPClient, Environment
-from bzt.utils import NETWORK_PROBLEMS
+from bzt.utils import shell_exec, get_full_path, ExceptionalDownloader, HTTPClient, Environment
+from bzt.utils import NETWORK_PROBLEMS, ToolsCheckCache, UniqueNames, BlobStore
 from .dicts import Configuration
 from .modules import Provisioning, Reporter, Service, Aggregator, EngineModule
 from .names import EXEC, TAURUS_ARTIFACTS_DIR, SETTINGS
+from .profiler import EngineProfiler
+from .scheduler import CheckScheduler
 from .templates import Singletone
 from ..environment_helpers import expand_variable_with_os, custom_expandvars, expand_envs_with_os
 
@@ -63,7 +64,8 @@ class Engine(object):
         """
         self.file_search_paths = []
         self.services = []
-        self.__artifacts = []
+        self.__artifacts = UniqueNames()
+        self.__artifacts_lock = threading.Lock()  # executors might be prepared in parallel
         self.reporters = []
         self.artifacts_dir = None
         self.log = parent_logger.getChild(self.__class__.__name__)
@@ -79,8 +81,14 @@ class Engine(object):
         self.aggregator.engine = self
         self.interrupted = False
         self.check_interval = 1
+        self.min_check_interval = 0.1
+        self.scheduler = None
+        self.profiler = EngineProfiler(self.log)
+        self.blob_store = None
+        self.tools_check_cache = None
         self.stopping_reason = None
         self.engine_loop_utilization = 0
+        self.modules_loop_utilization = {}
         self.prepared = []
         self.started = []
 
@@ -121,6 +129,9 @@ class Engine(object):
         """
         self.log.info("Configuring...")
 
+        if not os.getenv("TAURUS_DISABLE_CONFIG_CACHE", ""):
+            self.config.set_cache_dir(get_full_path(os.path.join("~", ".bzt", "config-cache")))
+
         if read_config_files:
             self._load_base_configs()
 
@@ -213,6 +224,12 @@ class Engine(object):
         self.unify_config()
         interval = self.config.get(SETTINGS).get("check-interval", self.check_interval)
         self.check_interval = dehumanize_time(interval)
+        min_interval = self.config.get(SETTINGS).get("min-check-interval", self.min_check_interval)
+        self.min_check_interval = dehumanize_time(min_interval)
+        self.__prepare_profiler()
+        self.__prepare_tools_check_cache()
+        if self.config.get(SETTINGS).get("artifacts-blob-store", False):
+            self.blob_store = BlobStore(self.create_artifact("blobs", ".pack"), self.create_artifact("blobs", ".idx"))
 
         try:
             self.__prepare_aggregator()
@@ -225,12 +242,29 @@ class Engine(object):
             self.stopping_reason = exc
             raise
 
+    def __prepare_profiler(self):
+        settings = self.config.get(SETTINGS)
+        sampling_interval = dehumanize_time(settings.get("profile-sampling-interval", 0))
+        self.profiler.configure(settings.get("profile", False), sampling_interval)
+
+    def __prepare_tools_check_cache(self):
+        settings = self.config.get(SETTINGS)
+        ttl = dehumanize_time(settings.get("tools-check-ttl", "1h"))
+        if ttl > 0:
+            filename = get_full_path(os.path.join("~", ".bzt", "tools-check-cache.json"))
+            self.tools_check_cache = ToolsCheckCache(filename, ttl, recheck=settings.get("recheck-tools", False))
+        else:
+            self.tools_check_cache = None
+
     def _startup(self):
+        self.scheduler = CheckScheduler(self.log, self.min_check_interval, self.check_interval)
+        self.profiler.start_sampling()
         modules = self.services + [self.aggregator] + self.reporters + [self.provisioning]  # order matters
         for module in modules:
             self.log.debug("Startup %s", module)
             self.started.append(module)
-            module.startup()
+            with self.profiler.measure("startup", module):
+                module.startup()
         self.config.dump()
 
     def start_subprocess(self, args, env, cwd=None, **kwargs):
@@ -241,7 +275,10 @@ class Engine(object):
         env = env.get()
         env['GRACEFUL'] = self.graceful_tmp
 
-        return shell_exec(args, cwd=cwd, env=env, **kwargs)
+        process = shell_exec(args, cwd=cwd, env=env, **kwargs)
+        if self.scheduler:
+            self.scheduler.watch_process(process, self.provisioning)  # executors are checked via provisioning
+        return process
 
     def run(self):
         """
@@ -276,38 +313,72 @@ class Engine(object):
         if exc_value:
             reraise(exc_info, exc_value)
 
-    def _check_modules_list(self):
+    def _check_modules_list(self, modules=None):
         stop = False
-        modules = [self.provisioning, self.aggregator] + self.services + self.reporters  # order matters
+        if modules is None:
+            modules = self._get_checked_modules()
         for module in modules:
             if module in self.started:
                 self.log.debug("Checking %s", module)
+                if self.scheduler:
+                    self.scheduler.start_check(module)
+                start = time.time()
                 finished = bool(module.check())
+                duration = time.time() - start
+                self.profiler.record("check", module, duration)
+                if self.scheduler:
+                    self.scheduler.finish_check(module, duration)
                 if finished:
                     self.log.debug("%s finished", module)
                     stop = finished
         return stop
 
+    def _get_checked_modules(self):
+        return [self.provisioning, self.aggregator] + self.services + self.reporters  # order matters
+
     def _wait(self):
         """
-        Wait modules for finish
+        Wait modules for finish. Every module is checked with its own interval
+        or earlier if scheduler is woken up by module event (process exit, results file change, etc.)
         :return:
         """
-        prev = time.time()
-
-        while not self._check_modules_list():
-            now = time.time()
-            diff = now - prev
-            delay = self.check_interval - diff
-            self.engine_loop_utilization = diff / self.check_interval
-            self.log.debug("Iteration took %.3f sec, sleeping for %.3f sec...", diff, delay)
-            if delay > 0:
-                time.sleep(delay)
-            prev = time.time()
+        if self.scheduler is None:
+            self.scheduler = CheckScheduler(self.log, self.min_check_interval, self.check_interval)
+
+        for module in self._get_checked_modules():
+            if module in self.started:
+                interval = module.get_check_interval()
+                self.scheduler.add_module(module, self.check_interval if interval is None else interval)
+
+        window_start = time.time()
+        busy = 0
+        while True:
+            modules = self.scheduler.wait()
+            start = time.time()
+            if self._check_modules_list(modules):
+                break
+
+            busy += time.time() - start
+            elapsed = time.time() - window_start
+            if elapsed >= self.check_interval:
+                self._update_loop_utilization(busy, elapsed)
+                window_start = time.time()
+                busy = 0
+
             if self.interrupted:
                 raise ManualShutdown()
         self.config.dump()
 
+    def _update_loop_utilization(self, busy, elapsed):
+        self.engine_loop_utilization = busy / elapsed
+        self.modules_loop_utilization = {}
+        for module, duration in self.scheduler.durations.items():
+            name = module.__class__.__name__
+            self.modules_loop_utilization[name] = self.modules_loop_utilization.get(name, 0) + duration / elapsed
+        self.scheduler.durations.clear()
+        self.log.debug("Engine loop utilization for last %.3f sec: %.3f %s",
+                       elapsed, self.engine_loop_utilization, self.modules_loop_utilization)
+
     def _shutdown(self):
         """
         Shutdown modules
@@ -322,7 +393,8 @@ class Engine(object):
         for module in modules:
             try:
                 if module in self.started:
-                    module.shutdown()
+                    with self.profiler.measure("shutdown", module):
+                        module.shutdown()
             except BaseException as exc:
                 self.log.debug("%s:\n%s", exc, traceback.format_exc())
                 if not self.stopping_reason:
@@ -333,6 +405,8 @@ class Engine(object):
 
         if self.graceful_tmp and os.path.exists(self.graceful_tmp):
             os.remove(self.graceful_tmp)
+        if self.scheduler:
+            self.scheduler.close()
         self.config.dump()
         if exc_value:
             reraise(exc_info, exc_value)
@@ -349,7 +423,8 @@ class Engine(object):
         for module in modules:
             if module in self.prepared:
                 try:
-                    module.post_process()
+                    with self.profiler.measure("post_process", module):
+                        module.post_process()
                 except BaseException as exc:
                     if isinstance(exc, KeyboardInterrupt):
                         self.log.debug("post_process: %s", exc)
@@ -360,11 +435,22 @@ class Engine(object):
                     if not exc_value:
                         exc_value = exc
                         exc_info = sys.exc_info()
+        if self.blob_store:
+            self.blob_store.close()
         self.config.dump()
+        self.config.wait_for_dump()
+        self.__save_profile()
 
         if exc_info:
             reraise(exc_info, exc_value)
 
+    def __save_profile(self):
+        try:
+            for filename in self.profiler.save(self.artifacts_dir):
+                self.existing_artifact(filename)
+        except OSError as exc:
+            self.log.warning("Failed to save profiling results: %s", exc)
+
     def create_artifact(self, prefix, suffix):
         """
         Create new artifact in artifacts dir with given prefix and suffix
@@ -378,11 +464,29 @@ class Engine(object):
         if not self.artifacts_dir:
             raise TaurusInternalException("Cannot create artifact: no artifacts_dir set up")
 
-        filename = get_uniq_name(self.artifacts_dir, prefix, suffix, self.__artifacts)
-        self.__artifacts.append(filename)
+        with self.__artifacts_lock:
+            filename = self.__artifacts.get(self.artifacts_dir, prefix, suffix)
         self.log.debug("New artifact filename: %s", filename)
         return filename
 
+    def store_artifact_data(self, prefix, suffix, data):
+        """
+        Save data as new artifact file or into artifacts blob store, if it's enabled
+
+        :type prefix: str
+        :type suffix: str
+        :type data: bytes
+        :return: artifact filename or blob reference
+        :rtype: str
+        """
+        if self.blob_store:
+            return self.blob_store.put(data)
+
+        filename = self.create_artifact(prefix, suffix)
+        with open(filename, 'wb') as fds:
+            fds.write(data)
+        return filename
+
     def existing_artifact(self, filename, move=False, target_filename=None):
         """
         Add existing artifact, it will be collected into artifact_dir. If
@@ -399,7 +503,7 @@ class Engine(object):
 
         new_filename = os.path.basename(filename) if target_filename is None else target_filename
         new_name = os.path.join(self.artifacts_dir, new_filename)
-        self.__artifacts.append(new_name)
+        self.__artifacts.add(new_name)
 
         if get_full_path(filename) == get_full_path(new_name):
             self.log.debug("No need to copy %s", filename)
@@ -434,7 +538,8 @@ class Engine(object):
 
         # dump current effective configuration
         dump = self.create_artifact("effective", "")  # TODO: not good since this file not exists
-        self.config.set_dump_file(dump)
+        background = self.config.get(SETTINGS).get("dump-in-background", False)
+        self.config.set_dump_file(dump, background=background)
         self.config.dump()
 
         # dump merged configuration
@@ -557,6 +662,43 @@ class Engine(object):
         self.config.load(configs)
 
     def _scan_package_configs(self):
+        """
+        Scanning all packages in sys.path is slow, so result is cached while sys.path dirs
+        and found bzt-configs.json files stay untouched
+        """
+        cache_key = [(os.path.abspath(path), self._get_path_state(path)) for path in sys.path]
+        if self.config.cache:
+            cached = self.config.cache.get("package-configs", cache_key)
+            if cached is not None and all(self._get_mtime(index) == mtime for index, mtime in cached["indexes"]):
+                self.log.debug("Using cached package configs list")
+                return cached["configs"]
+
+        index_files = []
+        configs = self._find_package_configs(index_files)
+        if self.config.cache:
+            indexes = [(index, self._get_mtime(index)) for index in index_files]
+            self.config.cache.put("package-configs", cache_key, {"configs": configs, "indexes": indexes})
+        return configs
+
+    def _get_path_state(self, path):
+        if os.path.abspath(path) != os.path.abspath(os.path.curdir):
+            return self._get_mtime(path)
+
+        # new artifacts dir appears in curdir on every run, so only packages with configs are taken into account
+        try:
+            names = os.listdir(path)
+        except OSError:
+            return None
+        return sorted(name for name in names if os.path.isfile(os.path.join(path, name, 'bzt-configs.json')))
+
+    @staticmethod
+    def _get_mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _find_package_configs(self, index_files):
         configs = []
         for importer, modname, ispkg in pkgutil.iter_modules(path=None):
             try:
@@ -571,6 +713,7 @@ class Engine(object):
                 if not os.path.exists(index_path):
                     continue
 
+                index_files.append(os.path.abspath(index_path))
                 try:
                     with codecs.open(index_path, 'rb', encoding='utf-8') as fds:
                         index_configs = json.load(fds)
@@ -583,7 +726,7 @@ class Engine(object):
                     continue
 
                 for config_name in index_configs:
-                    configs.append(os.path.join(importer.path, modname, config_name))
+                    configs.append(os.path.abspath(os.path.join(importer.path, modname, config_name)))
             except BaseException as exc:
                 self.log.warning("Can't look for package configs in package %r: %s", modname, str(exc))
                 self.log.debug("Traceback: %s", traceback.format_exc())
@@ -739,6 +882,7 @@ class Engine(object):
         else:
             self.log.debug(f'Taurus updates info: "{data}"')
 
+            from distutils.version import LooseVersion
             mine = LooseVersion(VERSION)
             if (mine < latest) or needs_upgrade:
                 msg = "There is newer version of Taurus %s available, consider upgrading. " \
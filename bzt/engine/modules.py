@@ -72,6 +72,15 @@ class EngineModule(object):
         """
         return False
 
+    def get_check_interval(self):
+        """
+        How often `check` should be called, engine's check interval is used if None
+
+        :rtype: float
+        """
+        interval = self.settings.get("check-interval", None)
+        return None if interval is None else dehumanize_time(interval)
+
     def shutdown(self):
         """
         Stop all processes that were started in `startup` stage.
@@ -198,7 +207,8 @@ class ScenarioExecutor(EngineModule):
         self.preprocess_args = lambda x: None
 
     def _get_tool(self, tool, **kwargs):
-        instance = tool(env=self.env, log=self.log, http_client=self.engine.get_http_client(), **kwargs)
+        instance = tool(env=self.env, log=self.log, http_client=self.engine.get_http_client(),
+                        check_cache=self.engine.tools_check_cache, **kwargs)
         assert isinstance(instance, RequiredTool)
 
         return instance
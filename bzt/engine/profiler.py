@@ -0,0 +1,163 @@
+"""
+Lightweight profiling of engine modules
+
+Copyright 2019 BlazeMeter Inc.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import contextlib
+import csv
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+
+
+class ModuleTiming(object):
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration):
+        self.calls += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+
+class StackSampler(threading.Thread):
+    """
+    Periodically takes stacks of all threads and counts them in collapsed format:
+    'thread;outer_func (file.py);...;inner_func (file.py)' -> samples count
+    """
+
+    def __init__(self, interval, parent_logger=None):
+        super(StackSampler, self).__init__(name=self.__class__.__name__, daemon=True)
+        parent_logger = parent_logger or logging.getLogger('')
+        self.log = parent_logger.getChild(self.__class__.__name__)
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+        self._labels = {}  # code object -> frame label, to not format them on every sample
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+
+    def sample(self):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == self.ident:
+                continue
+
+            stack = []
+            while frame is not None:
+                stack.append(self._get_label(frame.f_code))
+                frame = frame.f_back
+
+            stack.append(names.get(ident, "thread-%s" % ident))
+            self.stacks[";".join(reversed(stack))] += 1
+
+        self.samples += 1
+
+    def _get_label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, "co_qualname", code.co_name)
+            label = "%s (%s)" % (name, os.path.basename(code.co_filename))
+            self._labels[code] = label
+        return label
+
+
+class EngineProfiler(object):
+    """
+    Measures time spent in calls of modules methods (check, startup, etc.)
+    and optionally samples stacks of all threads in background
+    """
+    TIMINGS_FILE = "profile-timings.csv"
+    STACKS_FILE = "profile-stacks.txt"
+
+    def __init__(self, parent_logger=None):
+        parent_logger = parent_logger or logging.getLogger('')
+        self.log = parent_logger.getChild(self.__class__.__name__)
+        self.enabled = False
+        self.sampling_interval = 0
+        self.timings = OrderedDict()  # (stage, module name) -> ModuleTiming
+        self.sampler = None
+
+    def configure(self, enabled, sampling_interval=0):
+        self.enabled = enabled
+        self.sampling_interval = sampling_interval if enabled else 0
+
+    def record(self, stage, module, duration):
+        if not self.enabled:
+            return
+
+        key = (stage, module.__class__.__name__)
+        timing = self.timings.get(key)
+        if timing is None:
+            timing = self.timings[key] = ModuleTiming()
+        timing.add(duration)
+
+    @contextlib.contextmanager
+    def measure(self, stage, module):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.record(stage, module, time.time() - start)
+
+    def start_sampling(self):
+        if self.sampling_interval > 0 and self.sampler is None:
+            self.log.debug("Starting stacks sampling with interval %s", self.sampling_interval)
+            self.sampler = StackSampler(self.sampling_interval, self.log)
+            self.sampler.start()
+
+    def stop_sampling(self):
+        if self.sampler:
+            self.sampler.stop()
+
+    def save(self, artifacts_dir):
+        """
+        Write timings CSV and collapsed stacks (if sampling was on) into artifacts dir
+
+        :return: list of written files
+        """
+        if not self.enabled:
+            return []
+
+        self.stop_sampling()
+        filenames = [os.path.join(artifacts_dir, self.TIMINGS_FILE)]
+        with open(filenames[0], "w", newline="") as fds:
+            writer = csv.writer(fds)
+            writer.writerow(["stage", "module", "calls", "total", "avg", "max"])
+            for (stage, module), timing in self.timings.items():
+                avg = timing.total / timing.calls
+                writer.writerow([stage, module, timing.calls, "%.6f" % timing.total, "%.6f" % avg, "%.6f" % timing.max])
+
+        if self.sampler:
+            filenames.append(os.path.join(artifacts_dir, self.STACKS_FILE))
+            with open(filenames[1], "w") as fds:
+                for stack, count in self.sampler.stacks.most_common():
+                    fds.write("%s %d\n" % (stack, count))
+
+        self.log.info("Profiling results are written into %s", ", ".join(filenames))
+        return filenames
@@ -0,0 +1,307 @@
+"""
+Event-driven scheduling of engine modules checks
+
+Copyright 2019 BlazeMeter Inc.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import logging
+import os
+import selectors
+import socket
+import struct
+import threading
+import time
+from collections import defaultdict
+
+
+class EventSource(object):
+    """
+    Registered file object and modules that should be woken up when it becomes readable
+    """
+
+    def __init__(self, fileobj, modules, on_ready=None, oneshot=False, owned=False):
+        self.fileobj = fileobj
+        self.modules = set(modules)
+        self.on_ready = on_ready  # returns modules to wake up, all source modules if None
+        self.oneshot = oneshot
+        self.owned = owned  # descriptor is opened by scheduler and must be closed by it
+        self.muted = False
+
+    def close(self):
+        if self.owned:
+            os.close(self.fileobj)
+
+
+class Inotify(object):
+    """
+    Minimal ctypes binding for Linux inotify, reports modules watching changed files
+    """
+    IN_MODIFY = 0x2
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.files = defaultdict(set)  # (watch descriptor, file basename) -> modules
+
+    def watch(self, filename, module):
+        # watching of parent dir allows to catch creation of file
+        dirname, basename = os.path.split(os.path.abspath(filename))
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        wdesc = self._add_watch(self.fd, os.fsencode(dirname), mask)
+        if wdesc < 0:
+            raise OSError("Can't watch %s" % dirname)
+
+        self.files[(wdesc, os.fsencode(basename))].add(module)
+
+    def read(self):
+        woken = set()
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+
+            if not data:
+                break
+
+            offset = 0
+            while offset < len(data):
+                wdesc, _, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                woken.update(self.files.get((wdesc, name), ()))
+
+        return woken
+
+    def close(self):
+        os.close(self.fd)
+
+
+class CheckScheduler(object):
+    """
+    Decides when `check` of every engine module is due. Module is checked with its own cadence
+    or earlier (but not more often than `min_interval`) when it is woken up by event:
+    readable file descriptor, process exit or explicit `wake_up` call. Result files may change
+    on every written sample, so their changes wake module up not more often than its file interval
+    (engine's `check_interval` by default).
+    """
+
+    def __init__(self, parent_logger=None, min_interval=0.1, check_interval=1.0):
+        parent_logger = parent_logger or logging.getLogger('')
+        self.log = parent_logger.getChild(self.__class__.__name__)
+        self.min_interval = min_interval
+        self.check_interval = check_interval
+        self.modules = []
+        self.intervals = {}
+        self.file_intervals = {}
+        self.last_check = {}
+        self.woken = set()
+        self.file_woken = set()
+        self.timers = {}  # module -> time of requested check
+        self.durations = defaultdict(float)  # module -> time spent in `check` since last reset
+        self.lock = threading.Lock()
+        self.selector = selectors.DefaultSelector()
+        self.sources = {}
+        self.inotify = None
+        self.closed = False
+
+        self._wakeup_reader, self._wakeup_writer = socket.socketpair()
+        self._wakeup_reader.setblocking(False)
+        self._wakeup_writer.setblocking(False)
+        self.selector.register(self._wakeup_reader, selectors.EVENT_READ, None)
+
+    def add_module(self, module, interval, file_interval=None):
+        self.modules.append(module)
+        self.intervals[module] = interval
+        if file_interval is None:
+            file_interval = self.check_interval
+        self.file_intervals[module] = max(file_interval, self.min_interval)
+
+    def wake_up(self, module):
+        """
+        Ask for module check as soon as possible, can be called from any thread
+        """
+        with self.lock:
+            self.woken.add(module)
+
+        self._notify()
+
+    def wake_up_at(self, module, timestamp):
+        """
+        Ask for module check at given time, earlier than its regular check if needed
+        """
+        with self.lock:
+            self.timers[module] = min(timestamp, self.timers.get(module, timestamp))
+
+        self._notify()
+
+    def _notify(self):
+        """
+        Interrupt waiting, so loop recalculates due modules
+        """
+        try:
+            self._wakeup_writer.send(b"\0")
+        except (BlockingIOError, OSError):  # buffer is full or scheduler is closed
+            pass
+
+    def watch_fd(self, fileobj, module, on_ready=None, oneshot=False):
+        self._add_source(EventSource(fileobj, [module], on_ready, oneshot))
+
+    def _add_source(self, source):
+        self.sources[source.fileobj] = source
+        self.selector.register(source.fileobj, selectors.EVENT_READ, source)
+
+    def watch_process(self, process, module):
+        """
+        Wake up module when process exits, works only on Linux with pidfd support
+
+        :return: True if watching is possible
+        """
+        if self.closed or not hasattr(os, "pidfd_open"):
+            return False
+
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except OSError as exc:
+            self.log.debug("Can't watch process %s: %s", process.pid, exc)
+            return False
+
+        self._add_source(EventSource(pidfd, [module], oneshot=True, owned=True))
+        return True
+
+    def watch_file(self, filename, module):
+        """
+        Wake up module when file is created or changed (coalesced to module's file interval), works only on Linux
+
+        :return: True if watching is possible
+        """
+        if self.closed:
+            return False
+
+        try:
+            if self.inotify is None:
+                self.inotify = Inotify()
+                self._add_source(EventSource(self.inotify.fd, [], on_ready=self.inotify.read))
+
+            self.inotify.watch(filename, module)
+            self.sources[self.inotify.fd].modules.add(module)
+        except (OSError, AttributeError) as exc:  # no inotify outside of Linux
+            self.log.debug("Can't watch file %s: %s", filename, exc)
+            return False
+
+        return True
+
+    def get_next_check(self, module):
+        last = self.last_check.get(module)
+        if last is None:
+            return 0
+        if module in self.woken:
+            next_check = last + min(self.min_interval, self.intervals[module])
+        elif module in self.file_woken:
+            next_check = last + min(self.file_intervals[module], self.intervals[module])
+        else:
+            next_check = last + self.intervals[module]
+        return min(next_check, self.timers.get(module, next_check))
+
+    def wait(self):
+        """
+        Block until some modules are due for check
+
+        :return: due modules in order of adding
+        """
+        while True:
+            now = time.time()
+            with self.lock:
+                next_checks = [(self.get_next_check(module), module) for module in self.modules]
+
+            if not next_checks:  # nothing to check yet, don't make caller spin
+                for key, _ in self.selector.select(self.check_interval):
+                    self._process_event(key.data)
+                return []
+
+            due = [module for next_check, module in next_checks if next_check <= now]
+            if due:
+                return due
+
+            timeout = min(next_check for next_check, _ in next_checks) - now
+            for key, _ in self.selector.select(timeout):
+                self._process_event(key.data)
+
+    def _process_event(self, source):
+        if source is None:  # wake_up call
+            try:
+                while self._wakeup_reader.recv(4096):
+                    pass
+            except (BlockingIOError, OSError):
+                pass
+            return
+
+        if source.oneshot:
+            self.selector.unregister(source.fileobj)
+            self.sources.pop(source.fileobj)
+
+        woken = source.on_ready() if source.on_ready else source.modules
+        with self.lock:
+            if self.inotify is not None and source.fileobj == self.inotify.fd:
+                self.file_woken.update(woken)
+            else:
+                self.woken.update(woken)
+            all_woken = source.modules.issubset(self.woken | self.file_woken)
+
+        if source.oneshot:
+            source.close()
+        elif all_woken:  # don't spin on readable descriptor until its modules are checked
+            self.selector.unregister(source.fileobj)
+            source.muted = True
+
+    def start_check(self, module):
+        with self.lock:
+            now = time.time()
+            self.woken.discard(module)
+            self.file_woken.discard(module)
+            self.last_check[module] = now
+            if self.timers.get(module, now) <= now:
+                self.timers.pop(module, None)
+
+        for source in self.sources.values():
+            if source.muted and module in source.modules:
+                source.muted = False
+                self.selector.register(source.fileobj, selectors.EVENT_READ, source)
+
+    def finish_check(self, module, duration):
+        self.durations[module] += duration
+
+    def close(self):
+        self.closed = True
+        self.selector.close()
+        for source in self.sources.values():
+            source.close()
+
+        if self.inotify:
+            self.inotify.close()
+
+        self._wakeup_reader.close()
+        self._wakeup_writer.close()
@@ -23,7 +23,7 @@ from bzt.engine import FileLister, SelfDiagnosable, ScenarioExecutor
 from bzt.modules.aggregator import ConsolidatingAggregator
 from bzt.modules.console import WidgetProvider, ExecutorWidget
 from bzt.modules.functional import FunctionalAggregator, FuncSamplesReader, LoadSamplesReader
-from bzt.utils import shutdown_process
+from bzt.utils import shutdown_process, read_file_tail
 
 
 class ReportableExecutor(ScenarioExecutor):
@@ -153,15 +153,13 @@ class SubprocessedExecutor(ReportableExecutor, FileLister, SelfDiagnosable, Widg
         diagnostics = []
         class_name = self.__class__.__name__
         if self.stdout is not None:
-            with open(self.stdout.name) as fds:
-                contents = fds.read().strip()
-                if contents:
-                    diagnostics.append(class_name + " STDOUT:\n" + contents)
+            contents = read_file_tail(self.stdout.name).strip()
+            if contents:
+                diagnostics.append(class_name + " STDOUT:\n" + contents)
         if self.stderr is not None:
-            with open(self.stderr.name) as fds:
-                contents = fds.read().strip()
-                if contents:
-                    diagnostics.append(class_name + " STDERR:\n" + contents)
+            contents = read_file_tail(self.stderr.name).strip()
+            if contents:
+                diagnostics.append(class_name + " STDERR:\n" + contents)
         return diagnostics
 
     def get_widget(self):
@@ -33,6 +33,7 @@ class ApiritifNoseExecutor(SubprocessedExecutor):
     """
     :type _tailer: FileReader
     """
+    PROGRESS_CHUNK_SIZE = 1024 * 1024
 
     def __init__(self):
         super(ApiritifNoseExecutor, self).__init__()
@@ -198,8 +199,9 @@ class ApiritifNoseExecutor(SubprocessedExecutor):
                 label = label.replace(char, '_')
         return label
 
-    def _check_stdout(self):
-        for line in self._tailer.get_lines():
+    def _check_stdout(self, last_pass=False):
+        # incomplete lines are left for next check, chunk size limits time spent in one check
+        for line in self._tailer.get_complete_lines(size=self.PROGRESS_CHUNK_SIZE, last_pass=last_pass):
             if "Adding worker" in line:
                 marker = "results="
                 pos = line.index(marker)
@@ -231,7 +233,7 @@ class ApiritifNoseExecutor(SubprocessedExecutor):
 
     def __log_lines(self):
         lines = []
-        for line in self._tailer.get_lines():
+        for line in self._tailer.get_complete_lines(last_pass=True):
             if not IGNORED_LINE.match(line):
                 lines.append(line)
 
@@ -242,7 +244,7 @@ class ApiritifNoseExecutor(SubprocessedExecutor):
         shutdown_process(self.process, self.log, send_sigterm=False)
 
     def post_process(self):
-        self._check_stdout()
+        self._check_stdout(last_pass=True)
         self.__log_lines()
         self._tailer.close()
         self.apiritif.post_process()
@@ -15,12 +15,15 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
+import heapq
 import json
 import math
 import os
 import sys
 from collections import OrderedDict, Counter
 
+import numpy
+
 from bzt import TaurusConfigError
 from bzt.engine import ScenarioExecutor, FileLister, Scenario, HavingInstallableTools, SelfDiagnosable
 from bzt.modules.aggregator import ConsolidatingAggregator, ResultsProvider, DataPoint, KPISet
@@ -28,8 +31,8 @@ from bzt.modules.console import WidgetProvider, ExecutorWidget
 from bzt.modules.jmeter import JTLReader
 from bzt.modules.services import PythonTool
 from bzt.requests_model import HTTPRequest
-from bzt.utils import iteritems, get_full_path, ensure_is_dict, PythonGenerator, FileReader, CALL_PROBLEMS
-from bzt.utils import shutdown_process, dehumanize_time, RESOURCES_DIR
+from bzt.utils import get_full_path, ensure_is_dict, PythonGenerator, FileReader, CALL_PROBLEMS
+from bzt.utils import shutdown_process, dehumanize_time, RESOURCES_DIR, read_file_tail
 
 
 class LocustIOExecutor(ScenarioExecutor, WidgetProvider, FileLister, HavingInstallableTools, SelfDiagnosable):
@@ -181,20 +184,17 @@ class LocustIOExecutor(ScenarioExecutor, WidgetProvider, FileLister, HavingInsta
     def get_error_diagnostics(self):
         diagnostics = []
         if self.stdout is not None:
-            with open(self.stdout.name) as fds:
-                contents = fds.read().strip()
-                if contents.strip():
-                    diagnostics.append("Locust STDOUT:\n" + contents)
+            contents = read_file_tail(self.stdout.name).strip()
+            if contents.strip():
+                diagnostics.append("Locust STDOUT:\n" + contents)
         if self.stderr is not None:
-            with open(self.stderr.name) as fds:
-                contents = fds.read().strip()
-                if contents.strip():
-                    diagnostics.append("Locust STDERR:\n" + contents)
+            contents = read_file_tail(self.stderr.name).strip()
+            if contents.strip():
+                diagnostics.append("Locust STDERR:\n" + contents)
         if self.log_file is not None and os.path.exists(self.log_file):
-            with open(self.log_file) as fds:
-                contents = fds.read().strip()
-                if contents.strip():
-                    diagnostics.append("Locust log:\n" + contents)
+            contents = read_file_tail(self.log_file).strip()
+            if contents.strip():
+                diagnostics.append("Locust log:\n" + contents)
         return diagnostics
 
 
@@ -204,6 +204,16 @@ class Locust(PythonTool):
 
 
 class WorkersReader(ResultsProvider):
+    """
+    Reads worker reports written by locust master and joins them into one point per second.
+
+    Every report holds stats collected by one worker since its previous report: request counts per
+    second and response times histogram of whole report interval. Histograms are recorded into
+    KPISet ones, split between seconds of report by their request counts. Second is complete when
+    all workers have reported later seconds (or it's older than REPORT_TIMEOUT than the newest one).
+    """
+    REPORT_TIMEOUT = 10
+
     def __init__(self, filename, num_workers, parent_logger):
         """
         :type filename: str
@@ -212,92 +222,147 @@ class WorkersReader(ResultsProvider):
         """
         super(WorkersReader, self).__init__()
         self.log = parent_logger.getChild(self.__class__.__name__)
-        self.join_buffer = {}
+        self.join_buffer = {}  # second -> {label: KPISet}
+        self.seconds = []  # heap of join_buffer keys
+        self.worker_seconds = {}  # worker -> latest second it reported
         self.num_workers = num_workers
         self.file = FileReader(filename=filename, parent_logger=self.log)
-        self.read_buffer = ""
 
     def _calculate_datapoints(self, final_pass=False):
-        read = self.file.get_bytes(size=1024 * 1024, last_pass=final_pass)
-        if not read or not read.strip():
-            return
-        self.read_buffer += read
-        while "\n" in self.read_buffer:
-            _line = self.read_buffer[:self.read_buffer.index("\n") + 1]
-            self.read_buffer = self.read_buffer[len(_line):]
-            self.fill_join_buffer(json.loads(_line))
-
-        max_full_ts = self.get_max_full_ts()
+        for line in self.file.get_complete_lines(last_pass=final_pass):
+            if line.strip():
+                self.fill_join_buffer(json.loads(line))
 
+        max_full_ts = self.get_max_full_ts(final_pass)
         if max_full_ts is not None:
             for point in self.merge_datapoints(max_full_ts):
                 yield point
 
     def merge_datapoints(self, max_full_ts):
         reader_id = self.file.name + "@" + str(id(self))
-        for key in sorted(self.join_buffer.keys(), key=int):
-            if int(key) <= max_full_ts:
-                sec_data = self.join_buffer.pop(key)
-                self.log.debug("Processing complete second: %s", key)
-                point = DataPoint(int(key))
-                point[DataPoint.SOURCE_ID] = reader_id
-                for sid, item in iteritems(sec_data):
-                    point.merge_point(self.point_from_locust(key, sid, item))
-                point.recalculate()
-                yield point
-
-    def get_max_full_ts(self):
-        max_full_ts = None
-        for key in sorted(self.join_buffer.keys(), key=int):
-            if len(key) >= self.num_workers:
-                max_full_ts = int(key)
+        while self.seconds and self.seconds[0] <= max_full_ts:
+            second = heapq.heappop(self.seconds)
+            self.log.debug("Processing complete second: %s", second)
+            point = DataPoint(second)
+            point[DataPoint.SOURCE_ID] = reader_id
+            current = point[DataPoint.CURRENT]
+            current.update(self.join_buffer.pop(second))
+            overall = self.__new_kpiset()
+            for kpiset in current.values():
+                overall.merge_kpis(kpiset, reader_id)
+            current[''] = overall
+            point.recalculate()
+            yield point
+
+    def get_max_full_ts(self, final_pass=False):
+        if not self.seconds:
+            return None
+
+        if final_pass:
+            return max(self.seconds)
+
+        newest = max(self.worker_seconds.values())
+        max_full_ts = newest - self.REPORT_TIMEOUT
+        if len(self.worker_seconds) >= self.num_workers:
+            max_full_ts = max(max_full_ts, min(self.worker_seconds.values()) - 1)
         return max_full_ts
 
     def fill_join_buffer(self, data):
         self.log.debug("Got worker data: %s", data)
-        for stats_item in data['stats']:
-            for timestamp in stats_item['num_reqs_per_sec'].keys():
-                if timestamp not in self.join_buffer:
-                    self.join_buffer[timestamp] = {}
-                self.join_buffer[timestamp][data['client_id']] = data
+        worker = data['client_id']
+        errors = {}
+        for err in data['errors'].values():
+            errors.setdefault((err['name'], err.get('method')), []).append(err)
+
+        for item in data['stats']:
+            seconds, requests, failures = self.__get_item_seconds(item)
+            if not seconds:
+                continue
+
+            self.worker_seconds[worker] = max(self.worker_seconds.get(worker, 0), seconds[-1])
+            item_errors = errors.get((item['name'], item.get('method')), errors.get((item['name'], None), []))
+            kpisets = [self.__get_kpiset(second, item['name']) for second in seconds]
+            self.__add_item(kpisets, item, requests, failures, item_errors)
+            for kpiset in kpisets:
+                kpiset.add_concurrency(data['user_count'], worker)
+
+    def __get_kpiset(self, second, label):
+        if second not in self.join_buffer:
+            self.join_buffer[second] = {}
+            heapq.heappush(self.seconds, second)
+
+        labels = self.join_buffer[second]
+        if label not in labels:
+            labels[label] = self.__new_kpiset()
+        return labels[label]
 
     @staticmethod
-    def point_from_locust(timestamp, sid, data):
+    def __get_item_seconds(item):
         """
-        :type timestamp: str
-        :type sid: str
-        :type data: dict
-        :rtype: DataPoint
+        Locust 1.0+ counts failures in 'num_requests' and reports them per second,
+        earlier versions count them separately and don't bind to seconds
+
+        :return: seconds, requests count and failures count of every second
         """
-        point = DataPoint(int(timestamp))
-        point[DataPoint.SOURCE_ID] = sid
-        overall = KPISet()
-        for item in data['stats']:
-            if timestamp not in item['num_reqs_per_sec']:
-                continue
+        per_sec = {int(second): count for second, count in item['num_reqs_per_sec'].items() if count}
+        if 'num_fail_per_sec' in item:
+            seconds = sorted(per_sec)
+            failures = [item['num_fail_per_sec'].get(str(second), 0) for second in seconds]
+            return seconds, numpy.array([per_sec[sec] for sec in seconds]), numpy.array(failures, dtype=numpy.int64)
+
+        if not per_sec and item['num_failures'] and item.get('last_request_timestamp'):
+            per_sec = {int(item['last_request_timestamp']): 0}
+
+        seconds = sorted(per_sec)
+        requests = numpy.array([per_sec[sec] for sec in seconds], dtype=numpy.int64)
+        weights = requests / requests.sum() if requests.sum() else numpy.ones(len(seconds)) / len(seconds)
+        failures = split_counts(numpy.array([item['num_failures']]), weights)[:, 0]
+        return seconds, requests + failures, failures
 
-            kpiset = KPISet()
-            kpiset[KPISet.SAMPLE_COUNT] = item['num_reqs_per_sec'][timestamp]
-            kpiset[KPISet.CONCURRENCY] = data['user_count']
-            kpiset[KPISet.BYTE_COUNT] = item['total_content_length']
-            if item['num_requests']:
-                avg_rt = (item['total_response_time'] / 1000.0) / item['num_requests']
-                kpiset.sum_rt = item['num_reqs_per_sec'][timestamp] * avg_rt
-
-            for err in data['errors'].values():
-                if err['name'] == item['name']:
-                    new_err = KPISet.error_item_skel(err['error'], None, err['occurences'], KPISet.ERRTYPE_ERROR,
+    @staticmethod
+    def __add_item(kpisets, item, requests, failures, errors):
+        """
+        Adds stats of report interval to KPISets of its seconds, split proportionally to request counts
+        """
+        weights = requests / requests.sum()
+        rt_values = numpy.array([float(r_time) for r_time in item['response_times']]) / 1000.0
+        rt_totals = numpy.array(list(item['response_times'].values()), dtype=numpy.int64)
+        rt_counts = split_counts(rt_totals, weights)
+        avg_rt = item['total_response_time'] / 1000.0 / rt_totals.sum() if rt_totals.sum() else 0
+        byte_counts = split_counts(numpy.array([item['total_content_length']]), weights)[:, 0]
+        err_weights = failures / failures.sum() if failures.sum() else weights
+        err_counts = split_counts(numpy.array([err['occurences'] for err in errors], dtype=numpy.int64), err_weights)
+
+        for idx, kpiset in enumerate(kpisets):
+            kpiset[KPISet.SAMPLE_COUNT] += int(requests[idx])
+            kpiset[KPISet.FAILURES] += int(failures[idx])
+            kpiset[KPISet.SUCCESSES] += int(requests[idx] - failures[idx])
+            kpiset[KPISet.BYTE_COUNT] += int(byte_counts[idx])
+            kpiset.sum_rt += avg_rt * int(requests[idx])  # old locust doesn't record times of failures
+            kpiset[KPISet.RESP_TIMES].add_values(rt_values, rt_counts[idx])
+            for err, count in zip(errors, err_counts[idx]):
+                if count:
+                    new_err = KPISet.error_item_skel(err['error'], None, int(count), KPISet.ERRTYPE_ERROR,
                                                      Counter(), None)
                     KPISet.inc_list(kpiset[KPISet.ERRORS], ("msg", err['error']), new_err)
-                    kpiset[KPISet.FAILURES] += err['occurences']
 
-            kpiset[KPISet.SUCCESSES] = kpiset[KPISet.SAMPLE_COUNT] - kpiset[KPISet.FAILURES]
-            point[DataPoint.CURRENT][item['name']] = kpiset
-            overall.merge_kpis(kpiset, sid)
+    def __new_kpiset(self):
+        return KPISet(self.track_percentiles, self.histogram_max * 1000.0)
+
+
+def split_counts(counts, weights):
+    """
+    Splits integer counts between parts by weights, keeping sum of every count exact
 
-        point[DataPoint.CURRENT][''] = overall
-        point.recalculate()
-        return point
+    :type counts: numpy.ndarray
+    :type weights: numpy.ndarray
+    :return: array of len(weights) rows by len(counts) columns
+    """
+    exact = numpy.outer(weights, counts)
+    parts = numpy.floor(exact).astype(numpy.int64)
+    leftover = counts - parts.sum(axis=0)
+    rank = numpy.argsort(numpy.argsort(parts - exact, axis=0, kind='stable'), axis=0, kind='stable')
+    return parts + (rank < leftover)
 
 
 class LocustIOScriptBuilder(PythonGenerator):
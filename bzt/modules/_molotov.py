@@ -24,7 +24,7 @@ from bzt.modules.aggregator import ConsolidatingAggregator, ResultsReader
 from bzt.modules.console import WidgetProvider, ExecutorWidget
 from bzt.modules.services import PythonTool
 from bzt.utils import unicode_decode, CALL_PROBLEMS
-from bzt.utils import shutdown_process, dehumanize_time, get_full_path, LDJSONReader
+from bzt.utils import shutdown_process, dehumanize_time, get_full_path, LDJSONReader, read_file_tail
 
 
 class MolotovExecutor(ScenarioExecutor, FileLister, WidgetProvider, HavingInstallableTools, SelfDiagnosable):
@@ -119,15 +119,13 @@ class MolotovExecutor(ScenarioExecutor, FileLister, WidgetProvider, HavingInstal
     def get_error_diagnostics(self):
         diagnostics = []
         if self.stdout is not None:
-            with open(self.stdout.name) as fds:
-                contents = fds.read().strip()
-                if contents.strip():
-                    diagnostics.append("molotov STDOUT:\n" + contents)
+            contents = read_file_tail(self.stdout.name).strip()
+            if contents.strip():
+                diagnostics.append("molotov STDOUT:\n" + contents)
         if self.stderr is not None:
-            with open(self.stderr.name) as fds:
-                contents = fds.read().strip()
-                if contents.strip():
-                    diagnostics.append("molotov STDERR:\n" + contents)
+            contents = read_file_tail(self.stderr.name).strip()
+            if contents.strip():
+                diagnostics.append("molotov STDERR:\n" + contents)
         return diagnostics
 
     def resource_files(self):
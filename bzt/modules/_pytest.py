@@ -93,11 +93,11 @@ class PyTestExecutor(SubprocessedExecutor, HavingInstallableTools):
     def post_process(self):
         super(PyTestExecutor, self).post_process()
         self.pytest.post_process()
-        self.__log_lines()
+        self.__log_lines(last_pass=True)
 
-    def __log_lines(self):
+    def __log_lines(self, last_pass=False):
         lines = []
-        for line in self._tailer.get_lines():
+        for line in self._tailer.get_complete_lines(last_pass=last_pass):
             if not IGNORED_LINE.match(line):
                 lines.append(line)
 
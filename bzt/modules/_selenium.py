@@ -25,7 +25,7 @@ from bzt.engine import FileLister, HavingInstallableTools, SelfDiagnosable
 from bzt.modules import ReportableExecutor
 from bzt.modules.console import WidgetProvider, PrioritizedWidget
 from bzt.utils import get_files_recursive, get_full_path, RequiredTool, unzip, untar
-from bzt.utils import is_windows, is_mac, platform_bitness
+from bzt.utils import is_windows, is_mac, platform_bitness, read_file_tail
 
 
 class AbstractSeleniumExecutor(ReportableExecutor):
@@ -238,8 +238,7 @@ class SeleniumExecutor(AbstractSeleniumExecutor, WidgetProvider, FileLister, Hav
         gecko_logs = ["geckodriver.log", os.path.join(self.engine.artifacts_dir, "geckodriver.log")]
         for possible_log in gecko_logs:
             if os.path.exists(possible_log):
-                with open(possible_log) as fds:
-                    diagnostics.append("Geckodriver log:\n" + fds.read())
+                diagnostics.append("Geckodriver log:\n" + read_file_tail(possible_log))
         return diagnostics
 
 
@@ -27,6 +27,7 @@ from bzt.modules.aggregator import ConsolidatingAggregator, ResultsReader
 from bzt.modules.console import WidgetProvider, ExecutorWidget
 from bzt.requests_model import HTTPRequest
 from bzt.utils import iteritems, CALL_PROBLEMS, shutdown_process, RequiredTool, dehumanize_time, FileReader
+from bzt.utils import read_file_tail
 
 
 class ApacheBenchmarkExecutor(ScenarioExecutor, WidgetProvider, HavingInstallableTools, SelfDiagnosable):
@@ -150,15 +151,13 @@ class ApacheBenchmarkExecutor(ScenarioExecutor, WidgetProvider, HavingInstallabl
     def get_error_diagnostics(self):
         diagnostics = []
         if self.stdout is not None:
-            with open(self.stdout.name) as fds:
-                contents = fds.read().strip()
-                if contents.strip():
-                    diagnostics.append("ab STDOUT:\n" + contents)
+            contents = read_file_tail(self.stdout.name).strip()
+            if contents.strip():
+                diagnostics.append("ab STDOUT:\n" + contents)
         if self.stderr is not None:
-            with open(self.stderr.name) as fds:
-                contents = fds.read().strip()
-                if contents.strip():
-                    diagnostics.append("ab STDERR:\n" + contents)
+            contents = read_file_tail(self.stderr.name).strip()
+            if contents.strip():
+                diagnostics.append("ab STDERR:\n" + contents)
         return diagnostics
 
 
@@ -178,7 +177,7 @@ class TSVDataReader(ResultsReader):
         return True
 
     def _read(self, last_pass=False):
-        lines = self.file.get_lines(size=1024 * 1024, last_pass=last_pass)
+        lines = self.file.get_complete_lines(last_pass=last_pass)
 
         for line in lines:
             if not self.skipped_header:
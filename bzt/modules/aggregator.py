@@ -17,14 +17,20 @@ limitations under the License.
 """
 import collections
 import copy
+import heapq
 import logging
 import math
+import re
+import threading
 import time
 from abc import abstractmethod
-from collections import Counter
+from array import array
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 import fuzzyset
-from hdrpy import HdrHistogram, RecordedIterator
+import numpy
+from hdrpy import HdrHistogram
 from yaml import SafeDumper
 from yaml.representer import SafeRepresenter
 
@@ -35,78 +41,23 @@ from bzt.utils import iteritems, dehumanize_time, JSONConvertible
 log = logging.getLogger('aggregator')
 
 
-class SinglePassIterator(RecordedIterator):
-    """
-    An iterator to do only one pass on data and calculate all we need inside it.
-    Should do one pass and return:
-    - stddev
-    - percentiles
-    - histogram
-    """
-
-    def __init__(self, histogram, percentiles, mean):
-        super(SinglePassIterator, self).__init__(histogram)
-        assert mean is not None, "Known mean is required"
-        self.perc_levels = list(percentiles)
-        self.perc_levels.sort()
-        self._mean = mean
-        self._init()
-
-    def reset(self, histogram=None):
-        super(SinglePassIterator, self).reset(histogram)
-        self._init()
-
-    def _init(self):
-        self.percentiles = {}
-        self.stdev = 0
-        self.hist_values = {}
-        self._geometric_dev_total = 0.0
-        self._perc_indexes = copy.copy(self.perc_levels)
-
-    def __next__(self):
-        item = super(SinglePassIterator, self).__next__()
-
-        # histogram
-        self.hist_values[item.value_iterated_to] = item.count_at_value_iterated_to
-
-        # stddev FIXME: protected mt
-        dev = (self.histogram._hdr_median_equiv_value(item.value_iterated_to) * 1.0) - self._mean * 1000
-        self._geometric_dev_total += (dev * dev) * item.count_added_in_this_iter_step
-
-        # percentiles
-        self._fill_percentiles()
-
-        return item
-
-    def _fill_percentiles(self):
-        while self._perc_indexes and self._perc_indexes[0] <= self.get_percentile_iterated_to():
-            perc_level = self._perc_indexes.pop(0)
-            self.percentiles[perc_level] = self.value_at_index
-
-    next = __next__
-
-    def has_next(self):
-        has = super(SinglePassIterator, self).has_next()
-        if not has:
-            self.stdev = math.sqrt(self._geometric_dev_total / self.total_count)
-            assert set(self.perc_levels) == set(self.percentiles.keys()), 'Not all percentiles are generated'
-        return has
-
-
 class RespTimesCounter(JSONConvertible):
+
     def __init__(self, low, high, sign_figures, perc_levels=()):
         super(RespTimesCounter, self).__init__()
         self.low = low
         self.high = high
         self.sign_figures = sign_figures
         self.histogram = HdrHistogram(low, high, sign_figures)
-        self._ff_iterator = None
+        self.generation = 0  # incremented on every change of histogram
+        self._cache = {}
         self._perc_levels = perc_levels
         self.known_mean = None
 
     def __deepcopy__(self, memo):
         new = RespTimesCounter(self.low, self.high, self.sign_figures)
-        new._ff_iterator = self._ff_iterator
+        new.generation = self.generation
+        new._cache = copy.copy(self._cache)  # cached values are never mutated
         new._perc_levels = self._perc_levels
 
         # TODO: maybe hdrpy can encapsulate this itself
@@ -123,35 +74,134 @@ class RespTimesCounter(JSONConvertible):
     def __len__(self):
         return self.histogram.total_count
 
+    def _touch(self):
+        self.generation += 1
+        self._cache = {}
+
     def add(self, item, count=1):
         item = round(item * 1000.0, 3)
         if item > self.high:
             self.__grow(math.ceil(item / 1000.0) * 1000.0)
-        self._ff_iterator = None
+        self._touch()
         self.histogram.record_value(item, count)
 
+    def add_values(self, values, counts=None):
+        """
+        Bulk version of add(), records numpy array of response times at once
+
+        :type values: numpy.ndarray
+        :param counts: optional array of counts for each value
+        :type counts: numpy.ndarray
+        """
+        if not len(values):
+            return
+
+        values = numpy.round(values * 1000.0, 3)
+        top = values.max()
+        if top > self.high:
+            self.__grow(math.ceil(top / 1000.0) * 1000.0)
+        self._touch()
+        self._record(values, counts)
+
+    def _record(self, values, counts=None):
+        """
+        Vectorized equivalent of HdrHistogram.record_value() for arrays of values (in histogram units)
+        """
+        hist = self.histogram
+        ints = values.astype(numpy.int64)
+        pow2ceiling = numpy.frexp((ints | hist.sub_bucket_mask).astype(numpy.float64))[1]
+        bucket_idx = pow2ceiling - hist.unit_magnitude - (hist.sub_bucket_half_count_magnitude + 1)
+        sub_bucket_idx = ints >> (bucket_idx + hist.unit_magnitude)
+        counts_idx = ((bucket_idx + 1) << hist.sub_bucket_half_count_magnitude) + sub_bucket_idx - hist.sub_bucket_half_count
+        valid = (counts_idx >= 0) & (counts_idx < hist.counts_len) & (values >= 0)
+        if not valid.all():
+            values = values[valid]
+            counts_idx = counts_idx[valid]
+            if counts is not None:
+                counts = counts[valid]
+            if not len(values):
+                return
+
+        if counts is None:
+            hist.counts += numpy.bincount(counts_idx, minlength=hist.counts_len)
+            hist.total_count += len(values)
+        else:
+            counts = numpy.asarray(counts, dtype=numpy.int64)
+            numpy.add.at(hist.counts, counts_idx, counts)
+            hist.total_count += int(counts.sum())
+        hist.min_value = min(hist.min_value, float(values.min()))
+        hist.max_value = max(hist.max_value, float(values.max()))
+
     def merge(self, other):
-        self._ff_iterator = None
+        self._touch()
         if other.high > self.high:
             self.__grow(other.high)
 
-        self.histogram.add(other.histogram)
+        self.__add_histogram(other)
 
-    def _get_ff(self):
-        if self._ff_iterator is None:
-            self._ff_iterator = SinglePassIterator(self.histogram, self._perc_levels, self.known_mean)
-            for _ in self._ff_iterator:
-                pass  # consume it
-        return self._ff_iterator
+    def __add_histogram(self, other):
+        """
+        :type other: RespTimesCounter
+        """
+        hist, other_hist = self.histogram, other.histogram
+        if hist.counts_len == other_hist.counts_len and hist.unit_magnitude == other_hist.unit_magnitude:
+            hist.add(other_hist)
+        elif other_hist.total_count:  # hdrpy would record it bucket by bucket
+            values, _, counts = other._get_recorded()
+            self._record(values, counts)
+
+    def _get_recorded(self):
+        """
+        Vectorized walk over recorded buckets of histogram, cached until next change of histogram
 
-    def get_percentiles_dict(self):
-        return self._get_ff().percentiles
+        :return: values of non-empty buckets, sizes of their value ranges and counts
+        """
+        if "recorded" not in self._cache:
+            hist = self.histogram
+            indexes = numpy.nonzero(hist.counts)[0]
+            buckets = (indexes >> hist.sub_bucket_half_count_magnitude) - 1
+            sub_buckets = (indexes & (hist.sub_bucket_half_count - 1)) + hist.sub_bucket_half_count
+            low_half = buckets < 0
+            sub_buckets[low_half] -= hist.sub_bucket_half_count
+            buckets[low_half] = 0
+            self._cache["recorded"] = (sub_buckets << (buckets + hist.unit_magnitude),
+                                       1 << (buckets + hist.unit_magnitude),
+                                       hist.counts[indexes])
+        return self._cache["recorded"]
+
+    def get_percentiles_dict(self, levels=None):
+        """
+        Calculate percentiles, only for requested levels if they are specified
+
+        :type levels: list[float]
+        :rtype: dict[float,int]
+        """
+        levels = tuple(sorted(set(self._perc_levels if levels is None else levels)))
+        key = ("perc", levels)
+        if key not in self._cache:
+            values, _, counts = self._get_recorded()
+            percents = (100.0 * numpy.cumsum(counts)) / self.histogram.total_count
+            positions = numpy.searchsorted(percents, levels, side='left')
+            self._cache[key] = {level: int(values[pos]) for level, pos in zip(levels, positions) if pos < len(values)}
+        return self._cache[key]
 
     def get_counts(self):
-        return self._get_ff().hist_values
+        if "counts" not in self._cache:
+            values, sizes, counts = self._get_recorded()
+            self._cache["counts"] = dict(zip((values + sizes - 1).tolist(), counts.tolist()))
+        return self._cache["counts"]
 
     def get_stdev(self):
-        return self._get_ff().stdev / 1000.0
+        assert self.known_mean is not None, "Known mean is required"
+        key = ("stdev", self.known_mean)
+        if key not in self._cache:
+            values, sizes, counts = self._get_recorded()
+            if len(counts):
+                devs = (values + (sizes >> 1)).astype(numpy.float64) - self.known_mean * 1000
+                self._cache[key] = math.sqrt(float(numpy.dot(devs * devs, counts)) / self.histogram.total_count) / 1000.0
+            else:
+                self._cache[key] = 0.0
+        return self._cache[key]
 
     def __json__(self):
         return {
@@ -161,10 +211,47 @@ class RespTimesCounter(JSONConvertible):
 
     def __grow(self, newsize):
         log.debug("Growing HDR from %s to %s", self.high, newsize)
-        old = self.histogram
+        old_counter = copy.copy(self)
         self.high = newsize
         self.histogram = HdrHistogram(self.low, self.high, self.sign_figures)
-        self.histogram.add(old)
+        self._touch()
+        self.__add_histogram(old_counter)
+
+
+class ErrorsList(list):
+    """
+    List of error items, indexed by value of selector field to find items in O(1).
+    Index is rebuilt if list was modified bypassing KPISet.inc_list()
+    """
+
+    def __init__(self, items=()):
+        super(ErrorsList, self).__init__(items)
+        self._index = {}
+        self._indexed = 0
+
+    def __deepcopy__(self, memo):
+        return ErrorsList(KPISet.copy_error_item(item) for item in self)
+
+    def __reduce__(self):
+        return ErrorsList, (list(self),)
+
+    def find(self, field, value):
+        """
+        :rtype: dict
+        """
+        if self._indexed != len(self) or field not in self._index:
+            self._index = {field: {}}
+            for item in reversed(self):  # first item with value is found by linear search
+                self._index[field][item[field]] = item
+            self._indexed = len(self)
+
+        return self._index[field].get(value)
+
+    def add(self, field, item):
+        self.append(item)
+        if self._indexed == len(self) - 1 and field in self._index:
+            self._index[field].setdefault(item[field], item)
+            self._indexed += 1
 
 
 class KPISet(dict):
@@ -196,6 +283,7 @@ class KPISet(dict):
         self.sum_cn = 0
         self.perc_levels = perc_levels
         self._concurrencies = Counter()
+        self._derived = {}  # state of histogram that derived values were calculated for
         # scalars
         self[KPISet.SAMPLE_COUNT] = 0
         self[KPISet.CONCURRENCY] = 0
@@ -207,7 +295,7 @@ class KPISet(dict):
         self[KPISet.AVG_CONN_TIME] = 0
         self[KPISet.BYTE_COUNT] = 0
         # vectors
-        self[KPISet.ERRORS] = []
+        self[KPISet.ERRORS] = ErrorsList()
         self[KPISet.RESP_TIMES] = RespTimesCounter(1, hist_max_rt, 3, perc_levels)
         self[KPISet.RESP_CODES] = Counter()
         self[KPISet.PERCENTILES] = {}
@@ -281,6 +369,53 @@ class KPISet(dict):
             # TODO: max/min rt? there is percentiles...
             # TODO: throughput if interval is not 1s
 
+    def add_samples(self, samples):
+        """
+        Add samples in bulk, vectorized equivalent of add_sample() calls
+
+        :type samples: SamplesBatch
+        """
+        count = len(samples)
+        if not count:
+            return
+
+        values = samples.values
+        self[self.SAMPLE_COUNT] += count
+
+        conc = samples.column('conc')
+        with_conc = numpy.nonzero(conc)[0]
+        if len(with_conc):
+            conc = conc[with_conc]
+            trnames = samples.column('trname')[with_conc]
+            for tr_id in numpy.unique(trnames):
+                self.add_concurrency(int(conc[trnames == tr_id].max()), values.trnames[tr_id])
+
+        r_codes = samples.column('rc')
+        with_rc = r_codes != 0
+        if with_rc.any():
+            # count times only if we have RCs
+            self.sum_cn += float(samples.column('ct')[with_rc].sum())
+            self.sum_lt += float(samples.column('lt')[with_rc].sum())
+            self.sum_rt += float(samples.column('rt')[with_rc].sum())
+            rc_ids, rc_counts = numpy.unique(r_codes[with_rc], return_counts=True)
+            for rc_id, rc_count in zip(rc_ids, rc_counts):
+                self[self.RESP_CODES][values.rcodes[rc_id]] += int(rc_count)
+
+        errors = samples.column('error')
+        failed = numpy.nonzero(errors)[0]
+        self[self.FAILURES] += len(failed)
+        self[self.SUCCESSES] += count - len(failed)
+        if len(failed):
+            err_ids, first_idx, err_counts = numpy.unique(errors[failed], return_index=True, return_counts=True)
+            for pos in numpy.argsort(first_idx):  # keep the order of first occurrence
+                r_code = values.rcodes[r_codes[failed[first_idx[pos]]]]
+                error = values.errors[err_ids[pos]]
+                item = self.error_item_skel(error, r_code, int(err_counts[pos]), KPISet.ERRTYPE_ERROR, Counter(), None)
+                self.inc_list(self[self.ERRORS], ("msg", error), item)
+
+        self[self.RESP_TIMES].add_values(samples.column('rt'))
+        self[self.BYTE_COUNT] += int(samples.column('bytes').sum())
+
     def add_concurrency(self, cnc, sid):
         # sid: source id, e.g. node id for jmeter distributed mode
         if self._concurrencies.get(sid, 0) < cnc:   # take max value of concurrency during the second.
@@ -291,39 +426,71 @@ class KPISet(dict):
         """
         Increment list item, based on selector criteria
 
-        :param values: list to update
+        :param values: list to update, lookup is O(1) for ErrorsList
         :param selector: tuple of 2 values, field name and value to match
         :param value: dict to put into list
         :type values: list[dict]
         :type selector: tuple
         :type value: dict
         """
-        found = False
-        for item in values:
-            if item[selector[0]] == selector[1]:
-                item['cnt'] += value['cnt']
-                item['urls'] += value['urls']
-                found = True
-                break
+        if isinstance(values, ErrorsList):
+            item = values.find(*selector)
+        else:
+            item = next((item for item in values if item[selector[0]] == selector[1]), None)
+
+        if item is not None:
+            item['cnt'] += value['cnt']
+            item['urls'] += value['urls']
+        elif isinstance(values, ErrorsList):
+            values.add(selector[0], KPISet.copy_error_item(value))
+        else:
+            values.append(KPISet.copy_error_item(value))
+
+    @staticmethod
+    def copy_error_item(item):
+        """
+        Cheap replacement for deepcopy of item made by error_item_skel()
 
-        if not found:
-            values.append(copy.deepcopy(value))
+        :type item: dict
+        :rtype: dict
+        """
+        item = copy.copy(item)
+        item['urls'] = copy.copy(item['urls'])
+        return item
 
     def __getitem__(self, key):
-        rtimes = self.get(self.RESP_TIMES, no_recalc=True)
-        rtimes.known_mean = self.get(self.AVG_RESP_TIME, no_recalc=True)
-        if key != self.RESP_TIMES and rtimes:
-            if key == self.STDEV_RESP_TIME:
-                self[self.STDEV_RESP_TIME] = rtimes.get_stdev()
-            elif key == self.PERCENTILES:
-                percs = {str(float(perc)): value / 1000.0 for perc, value in
-                         iteritems(rtimes.get_percentiles_dict())}
-                self[self.PERCENTILES] = percs
+        if key == self.STDEV_RESP_TIME or key == self.PERCENTILES:
+            self.__update_derived(key)
 
         val = super(KPISet, self).__getitem__(key)
         assert key != KPISet.ERRORS or isinstance(val, list)
         return val
 
+    def __update_derived(self, key):
+        """
+        Calculate stdev or percentiles from response times histogram,
+        at most once per change of histogram (or of mean value for stdev)
+        """
+        rtimes = self.get(self.RESP_TIMES, no_recalc=True)
+        if not rtimes:
+            return
+
+        rtimes.known_mean = self.get(self.AVG_RESP_TIME, no_recalc=True)
+        if key == self.STDEV_RESP_TIME:
+            state = (rtimes, rtimes.generation, rtimes.known_mean)
+        else:
+            state = (rtimes, rtimes.generation, tuple(self.perc_levels))
+
+        if self._derived.get(key) == state:
+            return
+
+        if key == self.STDEV_RESP_TIME:
+            self[self.STDEV_RESP_TIME] = rtimes.get_stdev()
+        else:
+            self[self.PERCENTILES] = {str(float(perc)): value / 1000.0 for perc, value in
+                                      iteritems(rtimes.get_percentiles_dict(self.perc_levels))}
+        self._derived[key] = state
+
     def get(self, k, no_recalc=False):
         if no_recalc:
             return super(KPISet, self).get(k)
@@ -403,20 +570,170 @@ class KPISet(dict):
 
         for key, val in iteritems(obj):
             if key == inst.RESP_TIMES:
-                if isinstance(val, dict):
-                    for value, count in iteritems(val):
-                        inst[inst.RESP_TIMES].add(float(value), count)
+                if isinstance(val, dict) and val:
+                    values = numpy.fromiter((float(value) for value in val.keys()), numpy.float64, len(val))
+                    counts = numpy.fromiter(val.values(), numpy.int64, len(val))
+                    inst[inst.RESP_TIMES].add_values(values, counts)
             else:
                 inst[key] = val
 
         inst.sum_cn = obj[inst.AVG_CONN_TIME] * obj[inst.SAMPLE_COUNT]
         inst.sum_lt = obj[inst.AVG_LATENCY] * obj[inst.SAMPLE_COUNT]
         inst.sum_rt = obj[inst.AVG_RESP_TIME] * obj[inst.SAMPLE_COUNT]
+        inst[KPISet.ERRORS] = ErrorsList(inst[KPISet.ERRORS])
         for error in inst[KPISet.ERRORS]:
             error['urls'] = Counter(error['urls'])
         return inst
 
 
+class ValuesIndex(object):
+    """
+    Interns hashable values into consecutive integer ids, id 0 always stands for None.
+    Optional normalizer is applied to values before interning.
+    """
+
+    def __init__(self, normalizer=None):
+        self.values = [None]
+        self.ids = {None: 0}
+        self.normalizer = normalizer
+
+    def get_id(self, value):
+        if self.normalizer is not None and value is not None:
+            value = self.normalizer(value)
+        value_id = self.ids.get(value)
+        if value_id is None:
+            value_id = len(self.values)
+            self.ids[value] = value_id
+            self.values.append(value)
+        return value_id
+
+    def __getitem__(self, value_id):
+        return self.values[value_id]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class SampleValues(object):
+    """
+    Set of string value indexes, shared by all sample batches of single reader
+
+    :param fold_label: function to fold labels with, returns None for labels to skip
+    :param fold_error: function to fold error messages with
+    """
+
+    def __init__(self, fold_label=None, fold_error=None):
+        self.labels = ValuesIndex(fold_label)
+        self.rcodes = ValuesIndex()
+        self.errors = ValuesIndex(fold_error)
+        self.trnames = ValuesIndex()
+
+
+class SamplesBatch(object):
+    """
+    Columnar storage of samples. Numeric columns are kept in compact arrays,
+    string ones (label, rc, error, trname) are stored as ids of SampleValues indexes.
+    Column views for vectorized processing are provided as numpy arrays.
+
+    :type values: SampleValues
+    """
+    COLUMNS = (
+        ('ts', 'q'), ('label', 'q'), ('conc', 'q'), ('rt', 'd'), ('ct', 'd'),
+        ('lt', 'd'), ('rc', 'q'), ('error', 'q'), ('trname', 'q'), ('bytes', 'q'),
+    )
+    DTYPES = {'q': numpy.int64, 'd': numpy.float64}
+
+    def __init__(self, values, columns=None):
+        self.values = values
+        if columns is None:
+            columns = {name: array(typecode) for name, typecode in self.COLUMNS}
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns['ts'])
+
+    def append(self, t_stamp, label, conc, r_time, con_time, latency, r_code, error, trname, byte_count):
+        """
+        Add single sample, in the format of ResultsReader._read() tuples
+        """
+        values = self.values
+        columns = self.columns
+        columns['ts'].append(int(t_stamp))
+        columns['label'].append(values.labels.get_id(label))
+        columns['conc'].append(int(conc or 0))
+        columns['rt'].append(r_time)
+        columns['ct'].append(con_time or 0)
+        columns['lt'].append(latency or 0)
+        columns['rc'].append(values.rcodes.get_id(r_code))
+        columns['error'].append(values.errors.get_id(error))
+        columns['trname'].append(values.trnames.get_id(trname))
+        columns['bytes'].append(int(byte_count or 0))
+
+    def add_columns(self, t_stamps, labels, concs, r_times, con_times, latencies, r_codes, errors, trnames,
+                    byte_counts):
+        """
+        Add bunch of samples given as sequences of column values, numeric ones may be numpy arrays.
+        None values are allowed the same way as for append()
+        """
+        values = self.values
+        self.__extend_numbers('ts', t_stamps)
+        self.__extend_ids('label', labels, values.labels)
+        self.__extend_numbers('conc', concs)
+        self.__extend_numbers('rt', r_times)
+        self.__extend_numbers('ct', con_times)
+        self.__extend_numbers('lt', latencies)
+        self.__extend_ids('rc', r_codes, values.rcodes)
+        self.__extend_ids('error', errors, values.errors)
+        self.__extend_ids('trname', trnames, values.trnames)
+        self.__extend_numbers('bytes', byte_counts)
+
+    def __extend_numbers(self, name, column_values):
+        column = self.columns[name]
+        if isinstance(column_values, numpy.ndarray):
+            column.frombytes(column_values.astype(self.DTYPES[column.typecode], copy=False).tobytes())
+        elif column.typecode == 'd':
+            column.extend(x or 0 for x in column_values)
+        else:
+            column.extend(int(x or 0) for x in column_values)
+
+    def __extend_ids(self, name, column_values, index):
+        ids = {}
+        for value in set(column_values):
+            ids[value] = index.get_id(value)
+        self.columns[name].extend(ids[value] for value in column_values)
+
+    def extend(self, other):
+        """
+        Append all samples of other batch, that must share values with this one
+
+        :type other: SamplesBatch
+        """
+        assert other.values is self.values, "Can't mix batches with different value indexes"
+        for name, typecode in self.COLUMNS:
+            column = other.columns[name]
+            if isinstance(column, numpy.ndarray):
+                self.columns[name].frombytes(column.astype(self.DTYPES[typecode], copy=False).tobytes())
+            else:
+                self.columns[name].extend(column)
+
+    def column(self, name):
+        """
+        :rtype: numpy.ndarray
+        """
+        column = self.columns[name]
+        if isinstance(column, array):
+            column = numpy.frombuffer(column, dtype=self.DTYPES[column.typecode])
+        return column
+
+    def take(self, indexes):
+        """
+        Get new batch containing only samples with given indexes
+
+        :rtype: SamplesBatch
+        """
+        return SamplesBatch(self.values, {name: self.column(name)[indexes] for name, _ in self.COLUMNS})
+
+
 class DataPoint(dict):
     """
     Represents an aggregate data point
@@ -492,36 +809,24 @@ class DataPoint(dict):
             self.recalculate()
 
 
+SafeDumper.add_representer(ErrorsList, SafeRepresenter.represent_list)
 SafeDumper.add_representer(KPISet, SafeRepresenter.represent_dict)
 SafeDumper.add_representer(DataPoint, SafeRepresenter.represent_dict)
 
 
-class ResultsProvider(object):
+class KeysFolder(object):
     """
-    :type listeners: list[AggregatorListener]
+    Base class for folding engines, that fold similar labels and error messages together.
+    Folding starts when set is quarter full and gets more aggressive while it approaches the limit.
+    Folder is shared between underlings of ConsolidatingAggregator, that can be read in parallel.
     """
 
     def __init__(self):
-        super(ResultsProvider, self).__init__()
-        self.cumulative = {}
-        self.track_percentiles = [0.0, 50.0, 90.0, 95.0, 99.0, 99.9, 100.0]
-        self.listeners = []
-        self.buffer_len = 2
-        self.min_buffer_len = 2
-        self.max_buffer_len = float('inf')
-        self.buffer_multiplier = 2
-        self.buffer_scale_idx = None
-        self.histogram_max = 1.0
-        self.known_errors = fuzzyset.FuzzySet(use_levenshtein=True)
-        self.max_error_count = 100
-        self.known_labels = fuzzyset.FuzzySet(use_levenshtein=True)
-        self.generalize_labels = 100
+        self._lock = threading.Lock()
 
-    @staticmethod
-    def _fuzzy_fold(key, dataset, limit):
+    def fold(self, key, limit):
         """
         :type key: str
-        :type dataset: fuzzyset.FuzzySet
         :type limit: int
         :rtype: str
         """
@@ -531,13 +836,48 @@ class ResultsProvider(object):
         if not isinstance(key, str):
             key = key.decode('utf-8')
 
+        with self._lock:
+            return self._fold(key, limit)
+
+    @abstractmethod
+    def _fold(self, key, limit):
+        pass
+
+    @abstractmethod
+    def __len__(self):
+        pass
+
+    @staticmethod
+    def _get_threshold(size, limit):
+        """
+        :return: similarity threshold and tolerance or None if no folding is needed yet
+        """
+        if size < limit / 4:  # TODO: parameterize it
+            return None, None
+
+        tolerance = (float(size) / float(limit)) ** 2
+        return 1 - tolerance, tolerance
+
+
+class FuzzySetFolder(KeysFolder):
+    """
+    Folding based on Levenshtein distance, accurate but slow for big amount of unique keys
+    """
+
+    def __init__(self):
+        super(FuzzySetFolder, self).__init__()
+        self.dataset = fuzzyset.FuzzySet(use_levenshtein=True)
+
+    def __len__(self):
+        return len(self.dataset)
+
+    def _fold(self, key, limit):
+        dataset = self.dataset
         if key.lower() in dataset.exact_set:
             return key
 
-        size = len(dataset)
-        if size >= limit / 4:  # TODO: parameterize it
-            tolerance = (float(size) / float(limit)) ** 2
-            threshold = 1 - tolerance
+        threshold, tolerance = self._get_threshold(len(dataset), limit)
+        if threshold is not None:
             matches = dataset.get(key)
             if matches:
                 for score, result in matches:
@@ -549,11 +889,143 @@ class ResultsProvider(object):
         dataset.add(key)
         return key
 
+
+class TrigramFolder(KeysFolder):
+    """
+    Folding based on normalized keys: numbers, UUIDs and hex ids are masked,
+    then key is compared with limited set of candidates that share most trigrams with it.
+    Results of folding are memoized in LRU cache.
+    """
+    MASKS = (
+        (re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'), '<uuid>'),
+        (re.compile(r'(?:0x)?(?=[0-9a-f]*[0-9])[0-9a-f]{8,}'), '<hex>'),
+        (re.compile(r'[0-9]+'), '<n>'),
+    )
+
+    def __init__(self, candidates=10, memo_size=10000):
+        super(TrigramFolder, self).__init__()
+        self.candidates = candidates
+        self.memo_size = memo_size
+        self.memo = OrderedDict()
+        self.exact = {}  # lowercased key -> key
+        self.normalized = {}  # normalized key -> key
+        self.grams = {}  # key -> set of trigrams
+        self.index = collections.defaultdict(list)  # trigram -> keys
+
+    def __len__(self):
+        return len(self.exact)
+
+    @classmethod
+    def normalize(cls, key):
+        key = key.lower()
+        for regexp, mask in cls.MASKS:
+            key = regexp.sub(mask, key)
+        return key
+
+    @staticmethod
+    def trigrams(key):
+        key = "  %s " % key
+        return set(key[idx:idx + 3] for idx in range(len(key) - 2))
+
+    def _fold(self, key, limit):
+        lowered = key.lower()
+        if lowered in self.exact:
+            return key
+
+        if key in self.memo:
+            self.memo.move_to_end(key)
+            return self.memo[key]
+
+        folded = self.__find_similar(key, limit)
+        if folded is None:
+            self.__add(key, lowered)
+            return key
+
+        self.memo[key] = folded
+        if len(self.memo) > self.memo_size:
+            self.memo.popitem(last=False)
+        return folded
+
+    def __find_similar(self, key, limit):
+        threshold, tolerance = self._get_threshold(len(self.exact), limit)
+        if threshold is None:
+            return None
+
+        normalized = self.normalize(key)
+        if normalized in self.normalized:
+            return self.normalized[normalized]
+
+        grams = self.trigrams(normalized)
+        hits = Counter()
+        for gram in grams:
+            hits.update(self.index.get(gram, ()))
+
+        for candidate, _ in hits.most_common(self.candidates):
+            cand_grams = self.grams[candidate]
+            score = 2.0 * len(grams & cand_grams) / (len(grams) + len(cand_grams))  # Sorensen-Dice coefficient
+            if score >= threshold:
+                return candidate
+
+        if tolerance >= 1.0:
+            return next(iter(self.exact.values()))  # last resort for capping
+
+        return None
+
+    def __add(self, key, lowered):
+        normalized = self.normalize(key)
+        grams = self.trigrams(normalized)
+        self.exact[lowered] = key
+        self.normalized.setdefault(normalized, key)
+        self.grams[key] = grams
+        for gram in grams:
+            self.index[gram].append(key)
+
+
+FOLDING_ENGINES = {
+    "trigram": TrigramFolder,
+    "fuzzy": FuzzySetFolder,
+}
+
+
+class ResultsProvider(object):
+    """
+    :type listeners: list[AggregatorListener]
+    """
+
+    def __init__(self):
+        super(ResultsProvider, self).__init__()
+        self.cumulative = {}
+        self._cumulative_snapshot = {}
+        self.track_percentiles = [0.0, 50.0, 90.0, 95.0, 99.0, 99.9, 100.0]
+        self.listeners = []
+        self.buffer_len = 2
+        self.min_buffer_len = 2
+        self.max_buffer_len = float('inf')
+        self.buffer_multiplier = 2
+        self.buffer_scale_idx = None
+        self.histogram_max = 1.0
+        self.folding_engine = "trigram"
+        self.known_errors = TrigramFolder()
+        self.max_error_count = 100
+        self.known_labels = TrigramFolder()
+        self.generalize_labels = 100
+
+    def set_folding_engine(self, name):
+        """
+        :param name: key of FOLDING_ENGINES
+        """
+        if name not in FOLDING_ENGINES:
+            raise TaurusConfigError("Unknown folding engine '%s', use one of: %s" % (name, list(FOLDING_ENGINES)))
+
+        self.folding_engine = name
+        self.known_errors = FOLDING_ENGINES[name]()
+        self.known_labels = FOLDING_ENGINES[name]()
+
     def _generalize_label(self, label):
-        return self._fuzzy_fold(label, self.known_labels, self.generalize_labels)
+        return self.known_labels.fold(label, self.generalize_labels)
 
     def _fold_error(self, error):
-        return self._fuzzy_fold(error, self.known_errors, self.max_error_count)
+        return self.known_errors.fold(error, self.max_error_count)
 
     def add_listener(self, listener):
         """
@@ -573,6 +1045,19 @@ class ResultsProvider(object):
             cumul.merge_kpis(data)
             cumul.recalculate()
 
+            # only labels that got new data this second are materialized again
+            self._cumulative_snapshot[label] = copy.deepcopy(cumul)
+
+    def _get_cumulative_snapshot(self):
+        """
+        Snapshot of cumulative results for a datapoint. KPISets of labels that
+        didn't change since previous snapshot are shared between datapoints,
+        so listeners must treat them as read-only.
+
+        :rtype: dict[str,KPISet]
+        """
+        return dict(self._cumulative_snapshot)
+
     def datapoints(self, final_pass=False):
         """
         Generator object that returns datapoints from the reader
@@ -583,7 +1068,7 @@ class ResultsProvider(object):
             current = datapoint[DataPoint.CURRENT]
             if datapoint[DataPoint.CUMULATIVE] or not self._ramp_up_exclude():
                 self.__merge_to_cumulative(current)
-                datapoint[DataPoint.CUMULATIVE] = copy.deepcopy(self.cumulative)  # FIXME: this line eats RAM like hell!
+                datapoint[DataPoint.CUMULATIVE] = self._get_cumulative_snapshot()
                 datapoint.recalculate()
 
             for listener in self.listeners:
@@ -610,29 +1095,103 @@ class ResultsReader(ResultsProvider):
     Aggregator that reads samples one by one,
     supposed to be attached to every executor
     """
+    EXTENDED_GROUPS = ('success', 'jmeter_errors', 'http_errors')
 
     def __init__(self, perc_levels=None):
         super(ResultsReader, self).__init__()
         self.extend_aggregation = False
         self.ignored_labels = []
         self.log = logging.getLogger(self.__class__.__name__)
-        self.buffer = {}
+        self.sample_values = SampleValues(fold_label=self.__fold_label, fold_error=self._fold_error)
+        self.buffer = {}  # second -> SamplesBatch
+        self.partials = {}  # second -> {label: KPISet}, for seconds collapsed to save memory
+        self.buffered_samples = 0
+        self.max_buffer_samples = 1000000
+        self.__timestamps = []  # heap of buffered seconds
+        self.__max_timestamp = None
+        self.__paused_reader = None
         self.min_timestamp = 0
         if perc_levels is not None:
             self.track_percentiles = perc_levels
 
+    @staticmethod
+    def _get_group(error):
+        if error is None:
+            return 0  # no errors
+        elif error == 'OK':
+            return 1  # jmeter error - assert, timeout, etc.
+        else:
+            return 2  # other errors, usually RC != 200
+
     @staticmethod
     def get_label(label, kpis):
         # it is used for generation of extended label.
         # each label data is splitted according to sample state (success/error/assert)
-        if kpis[5] is None:
-            group = 'success'   # no errors
-        elif kpis[5] == 'OK':
-            group = 'jmeter_errors'   # jmeter error - assert, timeout, etc.
-        else:
-            group = 'http_errors'   # other errors, usually RC != 200
+        group = ResultsReader.EXTENDED_GROUPS[ResultsReader._get_group(kpis[5])]
+        return '-'.join((label, group))
 
-        return '-'.join((label, str(group)))
+    def get_result_files(self):
+        """
+        Names of files consumed by reader, aggregator is woken up when they are changed
+
+        :rtype: list[str]
+        """
+        reader = getattr(self, "file", None)
+        filename = getattr(reader, "name", None)
+        return [filename] if filename else []
+
+    def new_samples_batch(self):
+        """
+        Readers may yield batches of samples from _read() instead of single sample tuples
+
+        :rtype: SamplesBatch
+        """
+        return SamplesBatch(self.sample_values)
+
+    def __is_ignored(self, label):
+        return any([label.startswith(ignore) for ignore in self.ignored_labels])
+
+    def __fold_label(self, label):
+        if self.__is_ignored(label):
+            return None
+
+        # empty means overall
+        if label == '':
+            label = '[empty]'
+
+        if self.generalize_labels:
+            label = self._generalize_label(label)
+
+        return label
+
+    def __get_second(self, t_stamp):
+        if t_stamp not in self.buffer:
+            self.buffer[t_stamp] = SamplesBatch(self.sample_values)
+            heapq.heappush(self.__timestamps, t_stamp)
+            if self.__max_timestamp is None or t_stamp > self.__max_timestamp:
+                self.__max_timestamp = t_stamp
+        return self.buffer[t_stamp]
+
+    def __collapse_buffer(self, final_pass):
+        """
+        Aggregate buffered samples into partial KPISets of their seconds, oldest seconds first,
+        so amount of samples kept in memory stays under max_buffer_samples.
+        Latest second is considered incomplete and is kept until final pass.
+        """
+        for t_stamp in sorted(self.buffer.keys()):
+            if self.buffered_samples <= self.max_buffer_samples / 2:
+                break
+
+            if t_stamp == self.__max_timestamp and not final_pass:
+                continue
+
+            samples = self.buffer[t_stamp]
+            if len(samples):
+                self.__aggregate_samples(self.partials.setdefault(t_stamp, {}), samples)
+                self.buffer[t_stamp] = SamplesBatch(self.sample_values)
+                self.buffered_samples -= len(samples)
+
+        self.log.debug("Collapsed buffered samples, %s left", self.buffered_samples)
 
     def __process_readers(self, final_pass=False):
         """
@@ -640,51 +1199,94 @@ class ResultsReader(ResultsProvider):
         :param final_pass: True if in post-process stage
         :return:
         """
-        for result in self._read(final_pass):
+        if self.__paused_reader is not None:
+            reader, self.__paused_reader = self.__paused_reader, None
+            if not self.__consume(reader, final_pass):
+                return
+
+        self.__consume(self._read(final_pass), final_pass)
+
+    def __consume(self, reader, final_pass):
+        """
+        Put results of reader into buffer, reader is paused (to be continued on next call)
+        when too many samples are buffered and they can't be collapsed yet
+
+        :return: False if reader was paused
+        """
+        for result in reader:
             if result is None:
                 self.log.debug("No data from reader")
                 break
+            elif isinstance(result, SamplesBatch):
+                self.__process_batch(result)
             elif isinstance(result, list) or isinstance(result, tuple):
-                t_stamp, label, conc, r_time, con_time, latency, r_code, error, trname, byte_count = result
+                self.__process_sample(result)
+            else:
+                raise TaurusInternalException("Unsupported results from %s reader: %s" % (self, result))
+
+            if self.max_buffer_samples and self.buffered_samples > self.max_buffer_samples:
+                self.__collapse_buffer(final_pass)
+                if self.buffered_samples > self.max_buffer_samples and not final_pass:
+                    self.log.debug("Pausing reader, %s samples in buffer", self.buffered_samples)
+                    self.__paused_reader = reader
+                    return False
 
-                if any([label.startswith(ignore) for ignore in self.ignored_labels]):
-                    continue
+        return True
 
-                if t_stamp < self.min_timestamp:
-                    self.log.debug("Putting sample %s into %s", t_stamp, self.min_timestamp)
-                    t_stamp = self.min_timestamp
+    def __process_sample(self, sample):
+        t_stamp, label, conc, r_time, con_time, latency, r_code, error, trname, byte_count = sample
 
-                if r_time < 0:
-                    self.log.warning("Negative response time reported by tool, resetting it to zero")
-                    r_time = 0
+        if self.__is_ignored(label):
+            return
 
-                if t_stamp not in self.buffer:
-                    self.buffer[t_stamp] = []
+        if t_stamp < self.min_timestamp:
+            self.log.debug("Putting sample %s into %s", t_stamp, self.min_timestamp)
+            t_stamp = self.min_timestamp
 
-                error = self._fold_error(error)
-                self.buffer[t_stamp].append((label, conc, r_time, con_time, latency, r_code, error, trname, byte_count))
-            else:
-                raise TaurusInternalException("Unsupported results from %s reader: %s" % (self, result))
+        if r_time < 0:
+            self.log.warning("Negative response time reported by tool, resetting it to zero")
+            r_time = 0
 
-    def __aggregate_current(self, datapoint, samples):
+        # labels and errors are folded by sample_values
+        self.__get_second(t_stamp).append(t_stamp, label, conc, r_time, con_time, latency, r_code, error,
+                                          trname, byte_count)
+        self.buffered_samples += 1
+
+    def __process_batch(self, batch):
         """
-        :param datapoint: DataPoint
-        :param samples: list of samples
-        :return:
+        :type batch: SamplesBatch
         """
-        current = datapoint[DataPoint.CURRENT]
-        for sample in samples:
-            # sample format: label, conc, r_time, con_time, latency, r_code, error, trname, byte_count
-            base_label = sample[0]
+        if batch.values is not self.sample_values:
+            raise TaurusInternalException("Samples batch must be created with new_samples_batch() of %s" % self)
 
-            # empty means overall
-            if base_label == '':
-                base_label = '[empty]'
+        labels = batch.column('label')
+        if not labels.all():  # ignored labels are folded into None
+            batch = batch.take(numpy.nonzero(labels)[0])
 
-            if self.generalize_labels:
-                base_label = self._generalize_label(base_label)
+        t_stamps = batch.column('ts')
+        if (t_stamps < self.min_timestamp).any():
+            self.log.debug("Putting samples from %s into %s", t_stamps.min(), self.min_timestamp)
+            t_stamps = batch.columns['ts'] = numpy.maximum(t_stamps, self.min_timestamp)
 
-            self.__add_sample(current, base_label, sample[1:])
+        r_times = batch.column('rt')
+        if (r_times < 0).any():
+            self.log.warning("Negative response time reported by tool, resetting it to zero")
+            batch.columns['rt'] = numpy.maximum(r_times, 0)
+
+        for t_stamp in numpy.unique(t_stamps):
+            self.__get_second(int(t_stamp)).extend(batch.take(t_stamps == t_stamp))
+        self.buffered_samples += len(batch)
+
+    def __aggregate_current(self, datapoint, samples, partial):
+        """
+        :param datapoint: DataPoint
+        :param samples: SamplesBatch
+        :param partial: KPISets of samples of this second collapsed before
+        :return:
+        """
+        current = datapoint[DataPoint.CURRENT]
+        current.update(partial)
+        self.__aggregate_samples(current, samples)
 
         overall = KPISet(self.track_percentiles, self.__get_rtimes_max(''))
 
@@ -694,6 +1296,34 @@ class ResultsReader(ResultsProvider):
 
         return current
 
+    def __aggregate_samples(self, current, samples):
+        """
+        :param current: dict of label -> KPISet to add samples to
+        :param samples: SamplesBatch
+        """
+        if not len(samples):
+            return
+
+        values = self.sample_values
+
+        keys = samples.column('label')
+        if self.extend_aggregation:
+            groups = numpy.array([self._get_group(error) for error in values.errors.values])
+            keys = keys * len(self.EXTENDED_GROUPS) + groups[samples.column('error')]
+
+        # group sample indexes by key, keeping order of first appearance
+        uniq_keys, first_idx, inverse = numpy.unique(keys, return_index=True, return_inverse=True)
+        order = numpy.argsort(inverse, kind='stable')
+        key_samples = numpy.split(order, numpy.cumsum(numpy.bincount(inverse))[:-1])
+
+        for pos in numpy.argsort(first_idx):
+            if self.extend_aggregation:
+                label_id, group = divmod(int(uniq_keys[pos]), len(self.EXTENDED_GROUPS))
+            else:
+                label_id, group = int(uniq_keys[pos]), None
+
+            self.__add_samples(current, values.labels[label_id], group, samples.take(key_samples[pos]))
+
     def _get_suffix(self, label):
         # to collect kpisets to overall sets according to rules result we need to split base label and suffix
         # the suffixes replace '' label in meaning of 'summary result'
@@ -701,14 +1331,14 @@ class ResultsReader(ResultsProvider):
             return label[label.rfind('-'):]
         return ''
 
-    def __add_sample(self, current, label, kpis):
-        if self.extend_aggregation:
-            label = self.get_label(label, kpis)
+    def __add_samples(self, current, label, group, samples):
+        if group is not None:
+            label = '-'.join((label, self.EXTENDED_GROUPS[group]))
 
         if label not in current:
             current[label] = KPISet(self.track_percentiles, self.__get_rtimes_max(label))
 
-        current[label].add_sample(kpis)
+        current[label].add_samples(samples)
 
     def __get_rtimes_max(self, label):
         if label in self.cumulative:
@@ -729,7 +1359,8 @@ class ResultsReader(ResultsProvider):
         else:
             self.log.debug("Skipped reading new data, we have enough in the buffer")
 
-        self.log.debug("Buffer len: %s; Known errors count: %s", len(self.buffer), len(self.known_errors))
+        self.log.debug("Buffer len: %s, %s samples; Known errors count: %s",
+                       len(self.buffer), self.buffered_samples, len(self.known_errors))
         if not self.buffer:
             return
 
@@ -743,19 +1374,17 @@ class ResultsReader(ResultsProvider):
             if self.buffer_len != old_len:
                 self.log.info("Changed data analysis delay to %ds", self.buffer_len)
 
-        timestamps = sorted(self.buffer.keys())
-        while final_pass or (timestamps[-1] >= (timestamps[0] + self.buffer_len)):
-            timestamp = timestamps.pop(0)
+        timestamps = self.__timestamps
+        while timestamps and (final_pass or (self.__max_timestamp >= (timestamps[0] + self.buffer_len))):
+            timestamp = heapq.heappop(timestamps)
             self.min_timestamp = timestamp + 1
             self.log.debug("Aggregating: %s, %s in buffer", timestamp, len(self.buffer))
             samples = self.buffer.pop(timestamp)
+            self.buffered_samples -= len(samples)
             datapoint = self.__get_new_datapoint(timestamp)
-            self.__aggregate_current(datapoint, samples)
+            self.__aggregate_current(datapoint, samples, self.partials.pop(timestamp, {}))
             yield datapoint
 
-            if not timestamps:
-                break
-
     def __get_new_datapoint(self, timestamp):
         """
         :rtype: DataPoint
@@ -772,6 +1401,7 @@ class ResultsReader(ResultsProvider):
             should report possible rests of results
         :rtype: list
         :return: timestamp, label, concurrency, rt, latency, rc, error
+            or SamplesBatch from new_samples_batch() with many of them
         """
         yield
 
@@ -794,6 +1424,10 @@ class ConsolidatingAggregator(Aggregator, ResultsProvider):
         self._sticky_concurrencies = {}
         self.min_timestamp = None
         self.extend_aggregation = False
+        self.reader_threads = 0
+        self.reader_pool = None
+        self.max_buffer_samples = 1000000
+        self.underlings_lag = {}  # source id -> seconds between now and last datapoint from it
 
     def converter(self, data):
         if data and self.extend_aggregation:
@@ -865,6 +1499,9 @@ class ConsolidatingAggregator(Aggregator, ResultsProvider):
         self.log.debug(debug_str, self.buffer_scale_idx, self.track_percentiles)
         self.histogram_max = dehumanize_time(self.settings.get("histogram-initial", self.histogram_max))
         self.max_error_count = self.settings.get("max-error-variety", self.max_error_count)
+        self.set_folding_engine(self.settings.get("folding-engine", self.folding_engine))
+        self.reader_threads = int(self.settings.get("reader-threads", self.reader_threads))
+        self.max_buffer_samples = int(self.settings.get("max-buffer-samples", self.max_buffer_samples))
 
     def startup(self):
         super(Aggregator, self).startup()
@@ -872,6 +1509,18 @@ class ConsolidatingAggregator(Aggregator, ResultsProvider):
         # send rules to underlings
         for underling in self.underlings:
             underling.extend_aggregation = self.extend_aggregation
+            self._watch_underling(underling)
+
+    def _watch_underling(self, underling):
+        """
+        Ask engine to check aggregator as soon as underling gets new results
+        """
+        scheduler = getattr(self.engine, "scheduler", None)
+        if scheduler is None or scheduler.closed or not isinstance(underling, ResultsReader):
+            return
+
+        for filename in underling.get_result_files():
+            scheduler.watch_file(filename, self)
 
     def add_underling(self, underling):
         """
@@ -886,6 +1535,7 @@ class ConsolidatingAggregator(Aggregator, ResultsProvider):
         underling.buffer_multiplier = self.buffer_multiplier
         underling.buffer_scale_idx = self.buffer_scale_idx
         underling.histogram_max = self.histogram_max
+        underling.max_buffer_samples = self.max_buffer_samples
 
         underling.max_error_count = self.max_error_count
         underling.generalize_labels = self.generalize_labels
@@ -895,6 +1545,7 @@ class ConsolidatingAggregator(Aggregator, ResultsProvider):
         underling.known_labels = self.known_labels
 
         self.underlings.append(underling)
+        self._watch_underling(underling)  # scheduler exists only if engine is started
 
     def check(self):
         """
@@ -915,19 +1566,46 @@ class ConsolidatingAggregator(Aggregator, ResultsProvider):
         for point in self.datapoints(True):
             self.log.debug("Processed datapoint: %s/%s", point[DataPoint.TIMESTAMP], point[DataPoint.SOURCE_ID])
 
+        if self.reader_pool:
+            self.reader_pool.shutdown()
+            self.reader_pool = None
+
     def _process_underlings(self, final_pass):
         time_start = time.time()
         has_some_time = lambda x: time.time() - x < self.engine.check_interval
         while final_pass or has_some_time(time_start):
             had_data = False
-            for underling in self.underlings:
-                for point in underling.datapoints(final_pass):
+            for points in self._read_underlings(final_pass):
+                for point in points:
                     had_data = True
+                    self.underlings_lag[point[DataPoint.SOURCE_ID]] = time.time() - point[DataPoint.TIMESTAMP]
                     self._put_into_buffer(point)
 
             if not had_data:
                 break
 
+        if self.underlings_lag:
+            self.log.debug("Underlings lag: %s", self.underlings_lag)
+
+    def _read_underlings(self, final_pass):
+        """
+        Read datapoints of underlings one by one or in pool of threads, if 'reader-threads' is set.
+        Each underling parses files and aggregates datapoints on its own, only finished points are returned.
+
+        :rtype: collections.Iterable[collections.Iterable[DataPoint]]
+        """
+        if self.reader_threads <= 1 or len(self.underlings) <= 1:
+            for underling in self.underlings:
+                yield underling.datapoints(final_pass)
+            return
+
+        if not self.reader_pool:
+            self.reader_pool = ThreadPoolExecutor(self.reader_threads, thread_name_prefix="reader")
+
+        read = lambda underling: list(underling.datapoints(final_pass))
+        for future in [self.reader_pool.submit(read, underling) for underling in self.underlings]:
+            yield future.result()
+
     def _put_into_buffer(self, point):
         tstamp = point[DataPoint.TIMESTAMP]
         if self.buffer:
@@ -330,12 +330,17 @@ class BlazeMeterUploader(Reporter, AggregatorListener, MonitoringListener, Singl
         if note:
             self._master.set({'note': note[:NOTE_SIZE_LIMIT]})
 
+    def get_check_interval(self):
+        interval = super(BlazeMeterUploader, self).get_check_interval()
+        return self.send_interval if interval is None else interval
+
     def check(self):
         """
         Send data if any in buffer
         """
         self.log.debug("KPI bulk buffer len: %s", len(self.kpi_buffer))
-        if self.last_dispatch < (time.time() - self.send_interval):
+        # engine calls check every send_interval, so tolerate scheduling jitter
+        if self.last_dispatch < (time.time() - self.send_interval + self.engine.min_check_interval):
             self.last_dispatch = time.time()
             if self.send_data and len(self.kpi_buffer):
                 self.__send_data(self.kpi_buffer)
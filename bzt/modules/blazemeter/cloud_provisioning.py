@@ -40,7 +40,8 @@ from bzt.modules.monitoring import LocalClient
 from bzt.modules._selenium import SeleniumExecutor
 from bzt.modules.services import Unpacker
 from bzt.requests_model import has_variable_pattern
-from bzt.utils import iteritems, open_browser, BetterDict, ExceptionalDownloader, ProgressBarContext
+from bzt.ui_helpers import ProgressBarContext
+from bzt.utils import iteritems, open_browser, BetterDict, ExceptionalDownloader
 from bzt.utils import to_json, dehumanize_time, get_full_path, get_files_recursive, replace_in_config
 from bzt.modules.blazemeter.blazemeter_reporter import BlazeMeterUploader
 from bzt.modules.blazemeter.cloud_test import FUNC_API_TEST_TYPE, FUNC_GUI_TEST_TYPE, TAURUS_TEST_TYPE
@@ -40,7 +40,8 @@ from urwid.widget import Divider
 from bzt.engine import Reporter, Singletone
 from bzt.modules.aggregator import DataPoint, KPISet, AggregatorListener, ResultsProvider
 from bzt.modules.provisioning import Local
-from bzt.utils import humanize_time, is_windows, DummyScreen
+from bzt.ui_helpers import DummyScreen
+from bzt.utils import humanize_time, is_windows
 from bzt.resources.version import VERSION
 
 try:
@@ -60,6 +61,8 @@ class ConsoleStatusReporter(Reporter, AggregatorListener, Singletone):
     :type logger_handlers: list[StreamHandler]
     """
 
+    REFRESH_INTERVAL = 0.25
+
     # NOTE: maybe should use separate thread for screen re-painting
     def __init__(self):
         super(ConsoleStatusReporter, self).__init__()
@@ -140,6 +143,12 @@ class ConsoleStatusReporter(Reporter, AggregatorListener, Singletone):
         self.console = TaurusConsole(widgets)
         self.screen.register_palette(self.console.palette)
 
+    def get_check_interval(self):
+        interval = super(ConsoleStatusReporter, self).get_check_interval()
+        if interval is None and not self.disabled and not isinstance(self.screen, DummyScreen):
+            return self.REFRESH_INTERVAL
+        return interval
+
     def check(self):
         """
         Repaint the screen
@@ -250,11 +250,8 @@ class FuncSamplesReader(FunctionalResultsReader):
                 continue
             contents = sample_extras.pop(file_field)
             if contents:
-                filename = "sample-%s" % file_field
-                artifact = self.engine.create_artifact(filename, ".bin")
-                with open(artifact, 'wb') as fds:
-                    fds.write(contents.encode('utf-8'))
-                sample_extras[file_field] = artifact
+                prefix = "sample-%s" % file_field
+                sample_extras[file_field] = self.engine.store_artifact_data(prefix, ".bin", contents.encode('utf-8'))
 
     def _samples_from_row(self, row):
         result = []
@@ -28,7 +28,7 @@ from bzt.modules.aggregator import ConsolidatingAggregator, ResultsReader
 from bzt.modules.console import WidgetProvider, ExecutorWidget
 from bzt.requests_model import HTTPRequest, SetVariables, HierarchicRequestParser
 from bzt.utils import TclLibrary, EXE_SUFFIX, dehumanize_time, get_full_path, FileReader, RESOURCES_DIR, BetterDict
-from bzt.utils import simple_body_dict, CALL_PROBLEMS, numeric_types
+from bzt.utils import simple_body_dict, CALL_PROBLEMS, numeric_types, read_file_tail
 from bzt.utils import unzip, RequiredTool, JavaVM, shutdown_process, ensure_is_dict, is_windows
 
 
@@ -497,25 +497,24 @@ class GatlingExecutor(ScenarioExecutor, WidgetProvider, FileLister, HavingInstal
     def get_error_diagnostics(self):
         diagnostics = []
         if self.stdout is not None:
-            with open(self.stdout.name) as fds:
-                contents = fds.read().strip()
-                if contents.strip():
-                    diagnostics.append("Gatling STDOUT:\n" + contents)
+            contents = read_file_tail(self.stdout.name).strip()
+            if contents.strip():
+                diagnostics.append("Gatling STDOUT:\n" + contents)
         if self.stderr is not None:
-            with open(self.stderr.name) as fds:
-                contents = fds.read().strip()
-                if contents.strip():
-                    diagnostics.append("Gatling STDERR:\n" + contents)
+            contents = read_file_tail(self.stderr.name).strip()
+            if contents.strip():
+                diagnostics.append("Gatling STDERR:\n" + contents)
         if self.reader and self.reader.file and self.reader.file.name:
-            with open(self.reader.file.name) as fds:
-                contents = fds.read().strip()
-                if contents.strip():
-                    diagnostics.append("Simulation log:\n" + contents)
+            contents = read_file_tail(self.reader.file.name).strip()
+            if contents.strip():
+                diagnostics.append("Simulation log:\n" + contents)
         return diagnostics
 
 
 class DataLogReader(ResultsReader):
     """ Class to read KPI from data log """
+    CACHE_LIMIT = 10000
+    RECORDS = (b"USER", b"GROUP", b"REQUEST")
 
     def __init__(self, basedir, parent_logger, dir_prefix):
         super(DataLogReader, self).__init__()
@@ -523,106 +522,121 @@ class DataLogReader(ResultsReader):
         self.log = parent_logger.getChild(self.__class__.__name__)
         self.basedir = basedir
         self.file = FileReader(file_opener=self.open_fds, parent_logger=self.log)
-        self.partial_buffer = ""
-        self.delimiter = "\t"
+        self.delimiter = b"\t"
         self.dir_prefix = dir_prefix
         self.guessed_gatling_version = None
+        self._handlers = {}
+        self._user_id_shift = 0
         self._group_errors = defaultdict(set)
+        self._strings = {}
+        self._codes = {}
 
-    def _extract_log(self, fields):
+    def _read(self, last_pass=False):
+        """
+        Generator method that returns next portion of data
+
+        :param last_pass:
+        """
+        for t_stamp, label, r_time, r_code, error in self._read_records(last_pass):
+            yield t_stamp, label, self.concurrency, r_time, 0.0, 0.0, r_code, error, '', None
+
+    def _read_records(self, last_pass):
+        for line in self.file.get_complete_byte_lines(last_pass=last_pass):
+            fields = line.split(self.delimiter)
+            handler = self._handlers.get(fields[0])
+            if handler:
+                data = handler(fields)
+                if data is not None:
+                    yield data
+            elif fields[0] == b"RUN":
+                self._set_version(fields[-1].strip().decode())
+            elif not self._handlers and fields[0] in self.RECORDS:  # no RUN record, let's take recent layout
+                self._set_version("")
+                data = self._handlers[fields[0]](fields)
+                if data is not None:
+                    yield data
+
+    def _set_version(self, version):
         """
-        Extract stats from Gatling format of version 3.1 and after
-        :param fields:
-        :return:
+        Gatling 3.4 dropped userId field from USER, GROUP and REQUEST records,
+        parse functions are bound for layout of detected version
         """
-        # 0 ${RequestRecordHeader.value}
-        # 1 $scenario
-        # -|2 $userId, absent in Gatling 3.4+
-        # 2 ${serializeGroups(groupHierarchy)}
-        # 3 $label
-        # 4 $startTimestamp
-        # 5 $endTimestamp
-        # 6 $status
-        # [7] ${serializeMessage(message)}${serializeExtraInfo(extraInfo)}
-
-        if fields[0].strip() == "USER":
-            if self.guessed_gatling_version < "3.4+":
-                del fields[2]  # ignore obsolete $userId
-            if fields[2].strip() == "START":
+        self.guessed_gatling_version = self._guess_gatling_version(version)
+        self._user_id_shift = 1 if self.guessed_gatling_version == "3.3.X" else 0
+        self._handlers = {b"USER": self.__parse_user, b"GROUP": self.__parse_group, b"REQUEST": self.__parse_request}
+
+    @staticmethod
+    def _guess_gatling_version(version):
+        parts = re.match(r"(\d+)\.(\d+)", version)
+        if parts and (int(parts.group(1)), int(parts.group(2))) < (3, 4):
+            return "3.3.X"
+        return "3.4+"
+
+    def __parse_user(self, fields):
+        # USER $scenario [$userId, absent in Gatling 3.4+] START|END $timestamp...
+        if len(fields) > 2 + self._user_id_shift:
+            event = fields[2 + self._user_id_shift].strip()
+            if event == b"START":
                 self.concurrency += 1
-            elif fields[2].strip() == "END":
+            elif event == b"END":
                 self.concurrency -= 1
 
-        elif fields[0].strip() == "GROUP":
-            del fields[0]
-            return self.__parse_group(fields)
-        elif fields[0].strip() == "REQUEST":
-            del fields[0]
-            return self.__parse_request(fields)
-        else:
-            return None
-
     def __parse_group(self, fields):
-        latency = 0.0
-        con_time = 0.0
-
-        if len(fields) < 3:
-            label = ""
-            t_stamp = int(fields[1]) / 1000.0
-            r_time = 0
-            error = fields[0]
-            r_code = "N/A"
-        else:
-            if self.guessed_gatling_version < "3.4+":
-                del fields[0]  # ignore obsolete $userId
-            label = fields[0]
-            if ',' in label:
-                return None  # skip nested groups for now
-            t_stamp = int(fields[2]) / 1000.0
-            r_time = int(fields[3]) / 1000.0
-
-            if label in self._group_errors:
-                error = ';'.join(self._group_errors.pop(label))
-            else:
-                error = None
+        # GROUP [$userId] $groupHierarchy $startTimestamp $endTimestamp $cumulatedResponseTime $status
+        if len(fields) < 4:
+            return 0 if len(fields) < 3 else int(fields[2]) // 1000, "", 0, "N/A", self.__string(fields[1])
 
-            if fields[4] == 'OK':
-                r_code = '200'
-            else:
-                r_code = self.__rc_from_msg(fields[-1])
+        shift = self._user_id_shift
+        label = self.__string(fields[1 + shift])
+        if ',' in label:
+            return None  # skip nested groups for now
 
-        return int(t_stamp), label, r_time, con_time, latency, r_code, error
+        t_stamp = int(fields[3 + shift]) // 1000
+        r_time = int(fields[4 + shift]) / 1000.0
+        error = ';'.join(self._group_errors.pop(label)) if label in self._group_errors else None
+        r_code = '200' if fields[5 + shift] == b"OK" else self.__rc_from_msg(fields[-1])
+        return t_stamp, label, r_time, r_code, error
 
     def __parse_request(self, fields):
+        # REQUEST [$userId] $groupHierarchy $label $startTimestamp $endTimestamp $status [$message$extraInfo]
         # see LogFileDataWriter.ResponseMessageSerializer in gatling-core
+        shift = self._user_id_shift
+        message = fields[6 + shift].strip() if len(fields) > 6 + shift else b""
+        error = self.__string(message) if message else None
 
-        if self.guessed_gatling_version < "3.4+":
-            del fields[0]  # ignore obsolete $userId
-
-        if len(fields) >= 6 and fields[5]:
-            error = fields[5]
-        else:
-            error = None
-
-        req_hierarchy = fields[0].split(',')[0]
-        if req_hierarchy:
+        groups = fields[1 + shift]
+        if groups:
             if error:
-                self._group_errors[req_hierarchy].add(error)
+                self._group_errors[self.__string(groups.split(b",")[0])].add(error)
             return None
 
-        label = fields[1]
-        t_stamp = int(fields[3]) / 1000.0
-        r_time = (int(fields[3]) - int(fields[2])) / 1000.0
-        latency = 0.0
-        con_time = 0.0
-        if fields[4] == 'OK':
-            r_code = '200'
-        else:
-            r_code = self.__rc_from_msg(fields[-1])
+        end = int(fields[4 + shift])
+        r_time = (end - int(fields[3 + shift])) / 1000.0
+        r_code = '200' if fields[5 + shift] == b"OK" else self.__rc_from_msg(fields[-1].strip())
+        return end // 1000, self.__string(fields[2 + shift]), r_time, r_code, error
 
-        return int(t_stamp), label, r_time, con_time, latency, r_code, error
+    def __string(self, value):
+        """ Decodes repeating values of log once """
+        string = self._strings.get(value)
+        if string is None:
+            if len(self._strings) >= self.CACHE_LIMIT:
+                self._strings.clear()
+            string = self._strings[value] = value.decode("utf-8", errors="replace")
+        return string
 
     def __rc_from_msg(self, msg):
+        if isinstance(msg, bytes):
+            msg = self.__string(msg)
+
+        r_code = self._codes.get(msg)
+        if r_code is None:
+            if len(self._codes) >= self.CACHE_LIMIT:
+                self._codes.clear()
+            r_code = self._codes[msg] = self._parse_rc(msg)
+        return r_code
+
+    @staticmethod
+    def _parse_rc(msg):
         _tmp_rc = msg.split("but actually ")[-1]  # gatling-core/src/main/scala/io/gatling/core/check/Validator.scala
 
         if _tmp_rc.startswith("unexpectedly "):
@@ -636,47 +650,6 @@ class DataLogReader(ResultsReader):
 
         return _tmp_rc if _tmp_rc.isdigit() else 'N/A'
 
-    def _guess_gatling_version(self, fields):
-        if fields and fields[-1].strip() < "3.4":
-            return "3.3.X"
-        elif fields[-1].strip() >= "3.4":
-            return "3.4+"
-        else:
-            return ""
-
-    def _extract_log_data(self, fields):
-        if self.guessed_gatling_version is None:
-            self.guessed_gatling_version = self._guess_gatling_version(fields)
-
-        return self._extract_log(fields) if self.guessed_gatling_version else None
-
-    def _read(self, last_pass=False):
-        """
-        Generator method that returns next portion of data
-
-        :param last_pass:
-        """
-        lines = self.file.get_lines(size=1024 * 1024, last_pass=last_pass)
-
-        for line in lines:
-            if not line.endswith("\n"):
-                self.partial_buffer += line
-                continue
-
-            line = "%s%s" % (self.partial_buffer, line)
-            self.partial_buffer = ""
-
-            line = line.strip()
-            fields = line.split(self.delimiter)
-
-            data = self._extract_log_data(fields)
-            if data is None:
-                continue
-
-            t_stamp, label, r_time, con_time, latency, r_code, error = data
-            bytes_count = None
-            yield t_stamp, label, self.concurrency, r_time, con_time, latency, r_code, error, '', bytes_count
-
     def open_fds(self, filename):
         """
         open gatling simulation.log
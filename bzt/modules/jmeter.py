@@ -15,10 +15,10 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
-import codecs
 import copy
 import csv
 import fnmatch
+import heapq
 import os
 import re
 import socket
@@ -27,9 +27,10 @@ import time
 import traceback
 from collections import Counter, namedtuple
 from distutils.version import LooseVersion
-from itertools import dropwhile
 from io import StringIO
+from itertools import dropwhile
 
+import numpy
 from cssselect import GenericTranslator
 from lxml import etree
 
@@ -37,14 +38,15 @@ from bzt import TaurusConfigError, ToolError, TaurusInternalException, TaurusNet
 from bzt.engine import Scenario, FileLister, HavingInstallableTools, ScenarioExecutor
 from bzt.engine import SelfDiagnosable, SETTINGS
 from bzt.jmx import JMX, JMeterScenarioBuilder, LoadSettingsProcessor, try_convert
-from bzt.modules.aggregator import ResultsReader, DataPoint, KPISet
+from bzt.modules.aggregator import ResultsReader, DataPoint, KPISet, ErrorsList
 from bzt.modules.console import WidgetProvider, ExecutorWidget
 from bzt.modules.functional import FunctionalResultsReader, FunctionalSample
 from bzt.requests_model import ResourceFilesCollector, has_variable_pattern, HierarchicRequestParser
-from bzt.utils import iteritems, numeric_types, unicode_decode
+from bzt.utils import iteritems, numeric_types
 from bzt.utils import get_full_path, EXE_SUFFIX, MirrorsManager, ExceptionalDownloader, get_uniq_name, is_windows
-from bzt.utils import BetterDict, guess_csv_dialect, dehumanize_time, CALL_PROBLEMS
-from bzt.utils import unzip, RequiredTool, JavaVM, shutdown_process, ProgressBarContext, TclLibrary, FileReader
+from bzt.utils import BetterDict, guess_csv_dialect, dehumanize_time, CALL_PROBLEMS, get_bytes_count
+from bzt.ui_helpers import ProgressBarContext
+from bzt.utils import unzip, RequiredTool, JavaVM, shutdown_process, TclLibrary, FileReader, read_file_tail
 
 
 def get_child_assertion(element):
@@ -53,7 +55,7 @@ def get_child_assertion(element):
 
     :rtype lxml.etree.Element
     """
-    for child in element.iterchildren():
+    for child in element.iterchildren("assertionResult"):
         msg, name = parse_assertion(child)
         if msg:
             return msg, name
@@ -260,7 +262,10 @@ class JMeterExecutor(ScenarioExecutor, WidgetProvider, FileLister, HavingInstall
             self.engine.aggregator.add_underling(self.reader)
         else:
             err_msg_separator = self.settings.get("error-message-separator")
-            self.reader = JTLReader(self.kpi_jtl, self.log, self.log_jtl, err_msg_separator)
+            max_response_size = self.settings.get("max-error-response-size", None)
+            if max_response_size is not None:
+                max_response_size = int(get_bytes_count(max_response_size))
+            self.reader = JTLReader(self.kpi_jtl, self.log, self.log_jtl, err_msg_separator, max_response_size)
             self.reader.is_distributed = len(self.distributed_servers) > 0
             assert isinstance(self.reader, JTLReader)
             self.engine.aggregator.add_underling(self.reader)
@@ -804,21 +809,18 @@ class JMeterExecutor(ScenarioExecutor, WidgetProvider, FileLister, HavingInstall
     def get_error_diagnostics(self):
         diagnostics = []
         if self.stdout is not None:
-            with codecs.open(self.stdout.name, encoding='utf-8') as fds:
-                contents = fds.read().strip()
-                if contents.strip():
-                    diagnostics.append("JMeter STDOUT:\n" + contents)
+            contents = read_file_tail(self.stdout.name).strip()
+            if contents.strip():
+                diagnostics.append("JMeter STDOUT:\n" + contents)
         if self.stderr is not None:
-            with codecs.open(self.stderr.name, encoding='utf-8') as fds:
-                contents = fds.read().strip()
-                if contents.strip():
-                    diagnostics.append("JMeter STDERR:\n" + contents)
+            contents = read_file_tail(self.stderr.name).strip()
+            if contents.strip():
+                diagnostics.append("JMeter STDERR:\n" + contents)
         if self.jmeter_log is not None and os.path.exists(self.jmeter_log):
-            with codecs.open(self.jmeter_log, encoding='utf-8') as fds:
-                log_contents = fds.read().strip()
-                trimmed_log = self.__trim_jmeter_log(log_contents)
-                if trimmed_log:
-                    diagnostics.append("JMeter log:\n" + trimmed_log)
+            log_contents = read_file_tail(self.jmeter_log).strip()
+            trimmed_log = self.__trim_jmeter_log(log_contents)
+            if trimmed_log:
+                diagnostics.append("JMeter log:\n" + trimmed_log)
         return diagnostics
 
 
@@ -828,17 +830,20 @@ class JTLReader(ResultsReader):
     :type errors_reader: JTLErrorsReader
     """
 
-    def __init__(self, filename, parent_logger, errors_filename=None, err_msg_separator=None):
+    def __init__(self, filename, parent_logger, errors_filename=None, err_msg_separator=None, max_response_size=None):
         super(JTLReader, self).__init__()
         self.is_distributed = False
         self.log = parent_logger.getChild(self.__class__.__name__)
         self.csvreader = IncrementalCSVReader(self.log, filename)
         self.read_records = 0
         if errors_filename:
-            self.errors_reader = JTLErrorsReader(errors_filename, parent_logger, err_msg_separator)
+            self.errors_reader = JTLErrorsReader(errors_filename, parent_logger, err_msg_separator, max_response_size)
         else:
             self.errors_reader = None
 
+    def get_result_files(self):
+        return [self.csvreader.file.name]
+
     def _read(self, last_pass=False):
         """
         Generator method that returns next portion of data
@@ -848,36 +853,70 @@ class JTLReader(ResultsReader):
         if self.errors_reader:
             self.errors_reader.read_file(last_pass)
 
-        for row in self.csvreader.read(last_pass):
-            label = unicode_decode(row["label"])
-            if self.is_distributed:
-                concur = int(row["grpThreads"])
-                trname = row["Hostname"] + row["threadName"][:row["threadName"].rfind('-')]
-            else:
-                concur = int(row["allThreads"])
-                trname = ''
+        if last_pass:  # rest of file is parsed block by block, to keep memory usage bounded
+            batch = self.__read_batch()
+            while batch is not None:
+                yield batch
+                batch = self.__read_batch()
 
-            rtm = int(row["elapsed"]) / 1000.0
-            ltc = int(row["Latency"]) / 1000.0
-            if "Connect" in row:
-                cnn = int(row["Connect"]) / 1000.0
-            else:
-                cnn = None
+        batch = self.__read_batch(last_pass)
+        if batch is not None:
+            yield batch
 
-            rcd = row["responseCode"]
-            if rcd.endswith('Exception'):
-                rcd = rcd.split('.')[-1]
+    def __read_batch(self, last_pass=False):
+        """
+        :rtype: SamplesBatch
+        """
+        rows = list(self.csvreader.read(last_pass))
+        if not rows:
+            return None
+
+        fields = self.csvreader.indexes
+        columns = list(zip(*rows))
+
+        def ints(name):
+            return numpy.fromiter(map(int, columns[fields[name]]), dtype=numpy.int64, count=len(rows))
+
+        labels = columns[fields["label"]]
+        if self.is_distributed:
+            concur = ints("grpThreads")
+            hosts = columns[fields["Hostname"]]
+            threads = columns[fields["threadName"]]
+            trnames = [host + thread[:thread.rfind('-')] for host, thread in zip(hosts, threads)]
+        else:
+            concur = ints("allThreads")
+            trnames = [''] * len(rows)
 
-            if row["success"] != "true":
-                error = row["responseMessage"]
-            else:
-                error = None
+        rtm = ints("elapsed") / 1000.0
+        ltc = ints("Latency") / 1000.0
+        if "Connect" in fields:
+            cnn = ints("Connect") / 1000.0
+        else:
+            cnn = [None] * len(rows)
+
+        r_codes = columns[fields["responseCode"]]
+        fixed_rc = {r_code: self.__fix_rc(r_code) for r_code in set(r_codes)}
+        rcd = [fixed_rc[r_code] for r_code in r_codes]
+        errors = [None if success == "true" else message
+                  for success, message in zip(columns[fields["success"]], columns[fields["responseMessage"]])]
 
-            byte_count = int(row.get("bytes", 0))
+        if "bytes" in fields:
+            byte_count = ints("bytes")
+        else:
+            byte_count = [0] * len(rows)
 
-            tstmp = int(int(row["timeStamp"]) / 1000.0)
-            self.read_records += 1
-            yield tstmp, label, concur, rtm, cnn, ltc, rcd, error, trname, byte_count
+        tstmp = ints("timeStamp") // 1000
+        self.read_records += len(rows)
+
+        batch = self.new_samples_batch()
+        batch.add_columns(tstmp, labels, concur, rtm, cnn, ltc, rcd, errors, trnames, byte_count)
+        return batch
+
+    @staticmethod
+    def __fix_rc(r_code):
+        if r_code.endswith('Exception'):
+            return r_code.split('.')[-1]
+        return r_code
 
     def _calculate_datapoints(self, final_pass=False):
         for point in super(JTLReader, self)._calculate_datapoints(final_pass):
@@ -957,10 +996,7 @@ class FuncJTLReader(FunctionalResultsReader):
                 break
 
     def _write_sample_data(self, filename, contents):
-        artifact = self.engine.create_artifact(filename, ".bin")
-        with open(artifact, 'wb') as fds:
-            fds.write(contents.encode('utf-8'))
-        return artifact
+        return self.engine.store_artifact_data(filename, ".bin", contents.encode('utf-8'))
 
     @staticmethod
     def _extract_sample_assertions(sample_elem):
@@ -1109,12 +1145,13 @@ class FuncJTLReader(FunctionalResultsReader):
 
 class IncrementalCSVReader(object):
     """
-    JTL csv reader
+    JTL csv reader, yields rows as lists of values.
+    Column positions are available via `indexes` once header is read.
     """
 
     def __init__(self, parent_logger, filename):
-        self.buffer = StringIO()
-        self.csv_reader = None
+        self.dialect = None
+        self.fieldnames = None
         self.log = parent_logger.getChild(self.__class__.__name__)
         self.indexes = {}
         self.partial_buffer = ""
@@ -1127,47 +1164,70 @@ class IncrementalCSVReader(object):
         yield csv row
         :type last_pass: bool
         """
-        lines = self.file.get_lines(size=self.read_speed, last_pass=last_pass)
-
-        lines_read = 0
-        bytes_read = 0
-
-        for line in lines:
-            if not line.endswith("\n"):
-                self.partial_buffer += line
-                continue
-
-            line = "%s%s" % (self.partial_buffer, line)
-            self.partial_buffer = ""
-
-            lines_read += 1
-            bytes_read += len(line)
-
-            if self.csv_reader is None:
-                dialect = guess_csv_dialect(line, force_doublequote=True)  # TODO: configurable doublequoting?
-                self.csv_reader = csv.DictReader(self.buffer, [], dialect=dialect)
-                self.csv_reader.fieldnames += line.strip().split(self.csv_reader.dialect.delimiter)
-                self.log.debug("Analyzed header line: %s", self.csv_reader.fieldnames)
-                continue
+        chunk = self.file.get_complete_text(size=self.read_speed, last_pass=last_pass)
+        if not chunk:
+            return
 
-            self.buffer.write(line)
+        data = self.partial_buffer + chunk if self.partial_buffer else chunk
+        eol = data.rfind("\n") + 1
+        if self.dialect is None and eol:
+            header_eol = data.find("\n") + 1
+            self.__read_header(data[:header_eol])
+            data = data[header_eol:]
+            eol -= header_eol
+
+        block = data[:eol]
+        quotechar = self.dialect.quotechar if self.dialect else None
+        if quotechar and block.count(quotechar) % 2:
+            block = self.__cut_open_record(block, quotechar)
+
+        self.partial_buffer = data[len(block):]
+        if not block:
+            return
 
-        if lines_read:
-            self.log.debug("Read: %s lines / %s bytes (at speed %s)", lines_read, bytes_read, self.read_speed)
-            self._tune_speed(bytes_read)
+        self.log.debug("Read: %s bytes (at speed %s)", len(block), self.read_speed)
+        self._tune_speed(len(chunk))
 
-            self.buffer.seek(0)
-            for row in self.csv_reader:
+        if quotechar in block:
+            # quoted fields may contain delimiters and line breaks, leave it to csv module
+            rows = [row for row in csv.reader(StringIO(block), dialect=self.dialect) if row]
+        else:
+            if "\r" in block:
+                block = block.replace("\r\n", "\n")
+            delimiter = self.dialect.delimiter
+            rows = [line.split(delimiter) for line in block.split("\n") if line]
+
+        width = len(self.fieldnames)
+        for row in rows:
+            if len(row) >= width:
                 yield row
+            else:
+                self.log.warning("Skipped malformed JTL line: %s", row)
 
-            self.buffer.seek(0)
-            self.buffer.truncate(0)
+    @staticmethod
+    def __cut_open_record(block, quotechar):
+        """ leave out the record with quoted field that isn't closed yet """
+        complete = 0
+        quotes = 0
+        pos = 0
+        for line in block.split("\n"):
+            pos += len(line) + 1
+            quotes += line.count(quotechar)
+            if not quotes % 2:
+                complete = pos
+        return block[:complete]
+
+    def __read_header(self, line):
+        self.dialect = guess_csv_dialect(line, force_doublequote=True)  # TODO: configurable doublequoting?
+        self.fieldnames = line.strip().split(self.dialect.delimiter)
+        self.indexes = {name: idx for idx, name in enumerate(self.fieldnames)}
+        self.log.debug("Analyzed header line: %s", self.fieldnames)
 
     def _tune_speed(self, bytes_read):
         if bytes_read >= self.read_speed:
             self.read_speed = min(8 * 1024 * 1024, self.read_speed * 2)
         elif bytes_read < self.read_speed / 2:
-            self.read_speed = max(self.read_speed / 2, 1024 * 1024)
+            self.read_speed = max(self.read_speed // 2, 1024 * 1024)
 
 
 class JTLErrorsReader(object):
@@ -1177,17 +1237,27 @@ class JTLErrorsReader(object):
     :type filename: str
     :type parent_logger: logging.Logger
     """
-    url_xpath = GenericTranslator().css_to_xpath("java\\.net\\.URL")
+    URL_TAG = "java.net.URL"
+    RESPONSE_OPEN = b"<responseData"
+    RESPONSE_CLOSE = b"</responseData>"
 
-    def __init__(self, filename, parent_logger, err_msg_separator=None):
+    def __init__(self, filename, parent_logger, err_msg_separator=None, max_response_size=None):
+        """
+        :param max_response_size: bigger responseData bodies are cut off before parsing
+        """
         # http://stackoverflow.com/questions/9809469/python-sax-to-lxml-for-80gb-xml/9814580#9814580
         super(JTLErrorsReader, self).__init__()
         self.log = parent_logger.getChild(self.__class__.__name__)
         self.parser = etree.XMLPullParser(events=('end',))
         self.file = FileReader(filename=filename, parent_logger=self.log)
-        self.buffer = BetterDict()
+        self.buffer = {}  # second -> {label: ErrorsList}
         self.failed_processing = False
         self.err_msg_separator = err_msg_separator
+        self.max_response_size = max_response_size
+        self.__seconds = []  # heap of buffered seconds
+        self.__unfiltered = b''
+        self.__response = None  # beginning of current responseData body, while it fits into max_response_size
+        self.__skip_response = False
 
     def read_file(self, final_pass=False):
         """
@@ -1201,6 +1271,8 @@ class JTLErrorsReader(object):
                 break
 
             self.log.debug("Read bytes from error file: %s", len(read))
+            if self.max_response_size is not None:
+                read = self._cut_responses(read)
 
             try:
                 self.parser.feed(read)
@@ -1210,11 +1282,12 @@ class JTLErrorsReader(object):
                 self.log.warning("Failed to parse errors XML: %s", exc)
 
             for _, elem in self.parser.read_events():
-                if elem.getparent() is not None and elem.getparent().tag == 'testResults':
+                parent = elem.getparent()
+                if parent is not None and parent.tag == 'testResults':
                     self._parse_element(elem)
                     elem.clear()  # cleanup processed from the memory
                     while elem.getprevious() is not None:
-                        del elem.getparent()[0]
+                        del parent[0]
 
             if not final_pass:
                 break
@@ -1223,11 +1296,69 @@ class JTLErrorsReader(object):
                                start_size, os.path.getsize(self.file.name), self.file.offset)
                 break
 
+    def _cut_responses(self, data):
+        """
+        Drop bodies of responseData elements bigger than max_response_size from raw XML chunk.
+        Incomplete tags at the end of chunk and beginning of body are kept till next chunk.
+        """
+        data = self.__unfiltered + data
+        self.__unfiltered = b''
+        result = []
+        pos = 0
+        while pos < len(data):
+            if self.__response is None and not self.__skip_response:  # outside of responseData
+                start = data.find(self.RESPONSE_OPEN, pos)
+                if start < 0:
+                    end = len(data) - self.__partial_tag_len(data, self.RESPONSE_OPEN)
+                    result.append(data[pos:end])
+                    self.__unfiltered = data[end:]
+                    break
+
+                tag_end = data.find(b'>', start)
+                if tag_end < 0:
+                    result.append(data[pos:start])
+                    self.__unfiltered = data[start:]
+                    break
+
+                result.append(data[pos:tag_end + 1])
+                pos = tag_end + 1
+                if data[tag_end - 1:tag_end] != b'/':
+                    self.__response = []
+            else:
+                end = data.find(self.RESPONSE_CLOSE, pos)
+                body_end = end if end >= 0 else len(data) - self.__partial_tag_len(data, self.RESPONSE_CLOSE)
+                if not self.__skip_response:
+                    self.__response.append(data[pos:body_end])
+                    if sum(len(part) for part in self.__response) > self.max_response_size:
+                        self.__response = None
+                        self.__skip_response = True
+
+                if end < 0:
+                    self.__unfiltered = data[body_end:]
+                    break
+
+                if self.__response:
+                    result.extend(self.__response)
+                result.append(self.RESPONSE_CLOSE)
+                self.__response = None
+                self.__skip_response = False
+                pos = end + len(self.RESPONSE_CLOSE)
+
+        return b''.join(result)
+
+    @staticmethod
+    def __partial_tag_len(data, tag):
+        """ length of tag beginning at the end of data """
+        for size in range(min(len(tag) - 1, len(data)), 0, -1):
+            if data.endswith(tag[:size]):
+                return size
+        return 0
+
     def _parse_element(self, elem):
         if elem.get('s'):
             result = elem.get('s')
         else:
-            result = elem.xpath('success')[0].text
+            result = elem.findtext('success')
         if result == 'false':
             if elem.items():
                 self._extract_standard(elem)
@@ -1239,12 +1370,10 @@ class JTLErrorsReader(object):
         Get accumulated errors data up to specified timestamp
         """
         result = BetterDict()
-        for t_stamp in sorted(self.buffer.keys()):
-            if t_stamp >= max_ts + 1:
-                break
-            labels = self.buffer.pop(t_stamp)
+        while self.__seconds and self.__seconds[0] <= max_ts:
+            labels = self.buffer.pop(heapq.heappop(self.__seconds))
             for label, label_data in iteritems(labels):
-                res = result.get(label, [], force_set=True)
+                res = result.get(label, ErrorsList(), force_set=True)
                 for err_item in label_data:
                     KPISet.inc_list(res, ('msg', err_item['msg']), err_item)
 
@@ -1253,7 +1382,7 @@ class JTLErrorsReader(object):
         return result
 
     def _extract_standard(self, elem):
-        t_stamp = int(elem.get("ts")) / 1000.0
+        t_stamp = int(elem.get("ts")) // 1000
         label = elem.get("lb")
         message = elem.get('rm')
         r_code = elem.get("rc")
@@ -1266,19 +1395,29 @@ class JTLErrorsReader(object):
         if f_type == KPISet.ERRTYPE_SUBSAMPLE:
             url_counts = Counter({f_url: 1})
         else:
-            urls = elem.xpath(self.url_xpath)
-            if urls:
-                url_counts = Counter({urls[0].text: 1})
+            url = self._find_url(elem)
+            if url is not None:
+                url_counts = Counter({url.text: 1})
             else:
                 url_counts = Counter()
 
         err_item = KPISet.error_item_skel(f_msg, f_rc, 1, f_type, url_counts, f_tag)
-        buf = self.buffer.get(t_stamp, force_set=True)
-        KPISet.inc_list(buf.get(label, [], force_set=True), ("msg", f_msg), err_item)
-        KPISet.inc_list(buf.get('', [], force_set=True), ("msg", f_msg), err_item)
+        buf = self.buffer.get(t_stamp)
+        if buf is None:
+            buf = self.buffer[t_stamp] = {}
+            heapq.heappush(self.__seconds, t_stamp)
+
+        for key in (label, ''):
+            if key not in buf:
+                buf[key] = ErrorsList()
+            KPISet.inc_list(buf[key], ("msg", f_msg), err_item)
+
+    def _find_url(self, elem):
+        """ first URL element in document order, same as 'descendant-or-self' XPath """
+        return next(elem.iter(self.URL_TAG), None)
 
     def _extract_nonstandard(self, elem):
-        t_stamp = int(elem.findtext("timeStamp")) / 1000.0  # NOTE: will it be sometimes EndTime?
+        t_stamp = int(elem.findtext("timeStamp")) // 1000  # NOTE: will it be sometimes EndTime?
         label = elem.findtext("label")
         message = elem.findtext("responseMessage")
         r_code = elem.findtext("responseCode")
@@ -1297,8 +1436,8 @@ class JTLErrorsReader(object):
 
         if not rc.startswith("2"):  # this sample is failed
             e_msg = element.get("rm", default="")
-            url = element.xpath(self.url_xpath)
-            url = url[0].text if url else element.get("lb")
+            url = self._find_url(element)
+            url = url.text if url is not None else element.get("lb")
         elif a_msg:
             err_type = KPISet.ERRTYPE_ASSERT
         elif element.get("s") == "false":  # has failed sub element, we should look deeper...
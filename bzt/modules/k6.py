@@ -13,6 +13,13 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
+import calendar
+import csv
+import json
+import time
+from collections import deque
+from operator import itemgetter
+
 from bzt import TaurusConfigError, ToolError
 from bzt.engine import HavingInstallableTools
 from bzt.modules import ScenarioExecutor, FileLister, SelfDiagnosable
@@ -30,6 +37,7 @@ class K6Executor(ScenarioExecutor, FileLister, WidgetProvider, HavingInstallable
         self.process = None
         self.k6 = None
         self.kpi_file = None
+        self.output_format = None
 
     def prepare(self):
         super(K6Executor, self).prepare()
@@ -42,13 +50,14 @@ class K6Executor(ScenarioExecutor, FileLister, WidgetProvider, HavingInstallable
         self.stdout = open(self.engine.create_artifact("k6", ".out"), "w")
         self.stderr = open(self.engine.create_artifact("k6", ".err"), "w")
 
-        self.kpi_file = self.engine.create_artifact("kpi", ".csv")
-        self.reader = K6LogReader(self.kpi_file, self.log)
+        self.output_format = self.settings.get("output-format", "csv")
+        self.kpi_file = self.engine.create_artifact("kpi", "." + self.output_format)
+        self.reader = K6LogReader(self.kpi_file, self.log, self.output_format)
         if isinstance(self.engine.aggregator, ConsolidatingAggregator):
             self.engine.aggregator.add_underling(self.reader)
 
     def startup(self):
-        cmdline = [self.k6.tool_name, "run", "--out", f"csv={self.kpi_file}"]
+        cmdline = [self.k6.tool_name, "run", "--out", f"{self.output_format}={self.kpi_file}"]
 
         load = self.get_load()
         if load.concurrency:
@@ -99,58 +108,170 @@ class K6Executor(ScenarioExecutor, FileLister, WidgetProvider, HavingInstallable
 
 
 class K6LogReader(ResultsReader):
-    def __init__(self, filename, parent_logger):
+    """
+    Reads k6 CSV or JSON metrics output and joins per-request metric rows into samples.
+
+    Metric rows of one request share timestamp and tags, so timing rows are matched
+    to their 'http_reqs' row by that key. Completed requests wait for 'data_received'
+    of their iteration (same group, scenario and vu/iter tags) and share its bytes.
+    """
+    TIMINGS = {"http_req_duration": 4, "http_req_connecting": 5, "http_req_tls_handshaking": 6, "http_req_waiting": 7}
+    METRICS = set(TIMINGS) | {"http_reqs", "data_received", "vus"}
+    ITERATION_TAGS = ("group", "scenario", "extra_tags", "vu", "iter")
+
+    def __init__(self, filename, parent_logger, output_format="csv"):
         super(K6LogReader, self).__init__()
         self.log = parent_logger.getChild(self.__class__.__name__)
         self.file = FileReader(filename=filename, parent_logger=self.log)
-        self.data = {'timestamp': [], 'label': [], 'r_code': [], 'error_msg': [], 'http_req_duration': [],
-                     'http_req_connecting': [], 'http_req_tls_handshaking': [], 'http_req_waiting': [], 'vus': [],
-                     'data_received': []}
+        if output_format not in ("csv", "json"):
+            raise TaurusConfigError("Unsupported k6 output format: %s" % output_format)
+        self.output_format = output_format
+        self.concurrency = 0
+        self.requests = {}  # request key -> deque of samples waiting for timings
+        self.iterations = {}  # iteration key -> deque of samples waiting for data_received
+        self.columns = None
+        self._request_key = None
+        self._iteration_key = None
+        self._request_info = None
+        self._last_time = (None, None)
 
     def _read(self, last_pass=False):
-        self.lines = list(self.file.get_lines(size=1024 * 1024, last_pass=last_pass))
-
-        for line in self.lines:
-            if line.startswith("http_reqs"):
-                self.data['timestamp'].append(int(line.split(',')[1]))
-                self.data['label'].append(line.split(',')[8])
-                self.data['r_code'].append(line.split(',')[12])
-                self.data['error_msg'].append(line.split(',')[4])
-            elif line.startswith("http_req_duration"):
-                self.data['http_req_duration'].append(float(line.split(',')[2]))
-            elif line.startswith("http_req_connecting"):
-                self.data['http_req_connecting'].append(float(line.split(',')[2]))
-            elif line.startswith("http_req_tls_handshaking"):
-                self.data['http_req_tls_handshaking'].append(float(line.split(',')[2]))
-            elif line.startswith("http_req_waiting"):
-                self.data['http_req_waiting'].append(float(line.split(',')[2]))
-            elif line.startswith("vus") and not line.startswith("vus_max"):
-                self.data['vus'].append(int(float(line.split(',')[2])))
-            elif line.startswith("data_received"):
-                self.data['data_received'].append(float(line.split(',')[2]))
-
-            if self.data['vus'] and len(self.data['data_received']) >= self.data['vus'][0] and \
-                    len(self.data['http_req_waiting']) >= self.data['vus'][0]:
-                for i in range(self.data['vus'][0]):
-                    kpi_set = (
-                        self.data['timestamp'][0],
-                        self.data['label'][0],
-                        self.data['vus'][0],
-                        self.data['http_req_duration'][0] / 1000,
-                        (self.data['http_req_connecting'][0] + self.data['http_req_tls_handshaking'][0]) / 1000,
-                        self.data['http_req_waiting'][0] / 1000,
-                        self.data['r_code'][0],
-                        None if not self.data['error_msg'][0] else self.data['error_msg'][0],
-                        '',
-                        self.data['data_received'][0])
-
-                    for key in self.data.keys():
-                        if key != 'vus':
-                            self.data[key].pop(0)
-
+        lines = self.file.get_complete_lines(last_pass=last_pass)
+        if self.output_format == "json":
+            rows = self._parse_json(lines)
+        else:
+            rows = self._parse_csv(lines)
+
+        for metric, tstamp, value, tags in rows:
+            if metric == "vus":
+                self.concurrency = int(value)
+            elif metric == "data_received":
+                for kpi_set in self._flush_iteration(self._iteration_key(tags), tstamp, value):
                     yield kpi_set
-
-                self.data['vus'].pop(0)
+            elif metric == "http_reqs":
+                label, r_code, error = self._request_info(tags)
+                sample = [tstamp, label, r_code, error or None, None, None, None, None]
+                self.requests.setdefault(self._request_key(tags), deque()).append(sample)
+            else:
+                self._add_timing(tags, self.TIMINGS[metric], value)
+
+        if last_pass:
+            for kpi_set in self._flush_all():
+                yield kpi_set
+
+    def _add_timing(self, tags, slot, value):
+        request_key = self._request_key(tags)
+        pending = self.requests.get(request_key)
+        if not pending:
+            self.log.debug("No 'http_reqs' row found for timing: %s", request_key)
+            return
+
+        for sample in pending:
+            if sample[slot] is None:
+                sample[slot] = value
+                break
+
+        while pending and None not in pending[0][4:]:
+            self.iterations.setdefault(self._iteration_key(tags), deque()).append(pending.popleft())
+
+        if not pending:
+            del self.requests[request_key]
+
+    def _flush_iteration(self, iteration_key, tstamp, byte_count):
+        waiting = self.iterations.get(iteration_key)
+        samples = []
+        while waiting and waiting[0][0] <= tstamp:
+            samples.append(waiting.popleft())
+
+        if waiting is not None and not waiting:
+            del self.iterations[iteration_key]
+
+        for sample in samples:
+            yield self._kpi_set(sample, byte_count / len(samples))
+
+    def _flush_all(self):
+        for pending in list(self.requests.values()) + list(self.iterations.values()):
+            for sample in pending:
+                yield self._kpi_set(sample, 0)
+
+        self.requests.clear()
+        self.iterations.clear()
+
+    def _kpi_set(self, sample, byte_count):
+        tstamp, label, r_code, error = sample[:4]
+        duration, connecting, tls_handshaking, waiting = [val or 0 for val in sample[4:]]
+        return (tstamp, label, self.concurrency, duration / 1000, (connecting + tls_handshaking) / 1000,
+                waiting / 1000, r_code, error, '', byte_count)
+
+    def _parse_csv(self, lines):
+        wanted = self.METRICS | {"metric_name"}
+        for row in csv.reader(line for line in lines if line[:line.find(",")] in wanted):
+            if row[0] == "metric_name":
+                self._read_header(row)
+            elif not self.columns:
+                self.log.warning("Skipping k6 CSV row without header: %s", row)
+            else:
+                tstamp = self._parse_csv_time(row[self.columns["timestamp"]])
+                yield row[0], tstamp, float(row[self.columns["metric_value"]]), row
+
+    def _read_header(self, row):
+        self.columns = {name: idx for idx, name in enumerate(row)}
+        key_columns = [idx for name, idx in self.columns.items() if name not in ("metric_name", "metric_value")]
+        iteration_columns = [self.columns.get(name) for name in self.ITERATION_TAGS if name in self.columns]
+        self._request_key = itemgetter(*key_columns)
+        self._iteration_key = itemgetter(*iteration_columns) if iteration_columns else lambda row: None
+        self._request_info = itemgetter(*[self.columns[name] for name in ("name", "status", "error")])
+
+    def _parse_json(self, lines):
+        self._request_key = self._json_request_key
+        self._iteration_key = self._json_iteration_key
+        self._request_info = self._json_request_info
+        for line in lines:
+            if not line.startswith('{"type":"Point"'):
+                continue
+
+            point = json.loads(line)
+            if point["metric"] not in self.METRICS:
+                continue
+
+            data = point["data"]
+            tags = data.get("tags") or {}
+            tags["_time"] = data["time"]  # keeps rows of one request together when tags repeat
+            yield point["metric"], self._parse_time(data["time"]), data["value"], tags
+
+    @staticmethod
+    def _json_request_key(tags):
+        return tuple(tags.items())
+
+    def _json_iteration_key(self, tags):
+        return tuple(tags.get(name) for name in self.ITERATION_TAGS)
+
+    @staticmethod
+    def _json_request_info(tags):
+        return tags.get("name"), tags.get("status"), tags.get("error")
+
+    def _parse_csv_time(self, value):
+        try:
+            return int(value)
+        except ValueError:  # k6 time format option may be set to rfc3339
+            return self._parse_time(value)
+
+    def _parse_time(self, value):
+        """ Converts RFC3339 time with optional fraction and zone into epoch seconds """
+        zone_start = 19
+        while zone_start < len(value) and value[zone_start] not in "Z+-":
+            zone_start += 1
+
+        key = value[:19] + value[zone_start:]
+        if key != self._last_time[0]:
+            tstamp = calendar.timegm(time.strptime(value[:19], "%Y-%m-%dT%H:%M:%S"))
+            zone = value[zone_start:]
+            if zone and zone != "Z":
+                offset = int(zone[1:3]) * 3600 + int(zone[4:6]) * 60
+                tstamp += -offset if zone[0] == "+" else offset
+            self._last_time = (key, tstamp)
+
+        return self._last_time[1]
 
 
 class K6(RequiredTool):
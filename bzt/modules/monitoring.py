@@ -124,7 +124,7 @@ class LocalClient(MonitoringClient):
     :type monitor: LocalMonitor
     """
     AVAILABLE_METRICS = ['cpu', 'mem', 'disk-space', 'engine-loop', 'bytes-recv',
-                         'bytes-sent', 'disk-read', 'disk-write', 'conn-all']
+                         'bytes-sent', 'disk-read', 'disk-write', 'conn-all', 'reader-lag']
 
     def __init__(self, parent_log, label, config, engine=None):
         super(LocalClient, self).__init__(parent_log, engine)
@@ -258,6 +258,10 @@ class LocalMonitor(object):
         if 'engine-loop' in self.metrics:
             result['engine-loop'] = self.engine.engine_loop_utilization
 
+        if 'reader-lag' in self.metrics:
+            lags = getattr(self.engine.aggregator, 'underlings_lag', None)
+            result['reader-lag'] = max(lags.values()) if lags else 0
+
         if 'conn-all' in self.metrics:
             try:
                 # take all connections without address resolution
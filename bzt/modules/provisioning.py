@@ -17,12 +17,15 @@ limitations under the License.
 """
 
 import datetime
+import heapq
+import os
 import sys
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 from bzt import ToolError
-from bzt.engine import Provisioning, SelfDiagnosable
+from bzt.engine import Provisioning, SelfDiagnosable, ScenarioExecutor, SETTINGS
 from bzt.utils import dehumanize_time, reraise
 
 
@@ -38,6 +41,8 @@ class Local(Provisioning):
         self.available_slots = None
         self.finished_modules = []
         self.started_modules = []
+        self._pending = None  # heap of (start time, config index, executor) for not started executors
+        self._running = None  # started executors that aren't finished yet
 
     def _get_start_shift(self, shift):
         if not shift:
@@ -67,10 +72,45 @@ class Local(Provisioning):
 
     def prepare(self):
         super(Local, self).prepare()
+        parallel = self.engine.config.get(SETTINGS).get("parallel-prepare", False)
+        if parallel and len(self.executors) > 1:
+            self._prepare_in_parallel(parallel)
+            return
+
+        for executor in self.executors:
+            self.log.debug("Preparing executor: %s", executor)
+            executor.prepare()
+
+    def _prepare_in_parallel(self, parallel):
+        """
+        Prepare executors in thread pool, `parallel` is either `true` or number of threads.
+        Shared tools are installed once thanks to RequiredTool install locks.
+        Inline scenarios are extracted into config serially beforehand, so labels are assigned
+        in config order and executors don't race on shared `scenarios` section.
+        """
         for executor in self.executors:
+            if isinstance(executor, ScenarioExecutor) and "scenario" in executor.execution:
+                executor.get_scenario()
+
+        if parallel is True:
+            threads = os.cpu_count() or 1
+        else:
+            threads = int(parallel)
+        threads = max(1, min(threads, len(self.executors)))
+        self.log.debug("Preparing %s executors with %s threads", len(self.executors), threads)
+
+        def prepare(executor):
             self.log.debug("Preparing executor: %s", executor)
             executor.prepare()
 
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="prepare") as pool:
+            futures = [pool.submit(prepare, executor) for executor in self.executors]
+
+        for future in futures:  # report first failed executor in config order
+            exc = future.exception()
+            if exc is not None:
+                raise exc
+
     def startup(self):
         self.start_time = time.time()
 
@@ -89,45 +129,57 @@ class Local(Provisioning):
             msg = "Delay setup for %s: %s(start-at) + %s(delay) = %s"
             self.log.debug(msg, executor, start_shift, delay, executor.delay)
 
+        self._pending = None  # executors are scheduled on first check
+
+    def _schedule_executors(self):
+        started = set(self.started_modules)
+        finished = set(self.finished_modules)
+        self._pending = [(self.start_time + executor.delay, index, executor)
+                         for index, executor in enumerate(self.executors) if executor not in started]
+        heapq.heapify(self._pending)
+        self._running = [executor for executor in self.started_modules if executor not in finished]
+
     def _start_modules(self):
-        if self.available_slots:
-            non_started_executors = [e for e in self.executors if e not in self.started_modules]
-            for executor in non_started_executors:
-                self.engine.logging_level_up()
-                if time.time() >= self.start_time + executor.delay:
-                    executor.startup()
-                    self.started_modules.append(executor)
-                    self.available_slots -= 1
-                    msg = "Starting execution: %s, rest of available slots: %s"
-                    self.log.debug(msg, executor, self.available_slots)
-                    if not self.available_slots:
-                        break
+        if self._pending is None:
+            self._schedule_executors()
 
+        now = time.time()
+        while self._pending and self.available_slots and self._pending[0][0] <= now:
+            _, _, executor = heapq.heappop(self._pending)
+            self.engine.logging_level_up()
+            try:
+                with self.engine.profiler.measure("startup", executor):
+                    executor.startup()
+            finally:
                 self.engine.logging_level_down()
 
+            self.started_modules.append(executor)
+            self._running.append(executor)
+            self.available_slots -= 1
+            msg = "Starting execution: %s, rest of available slots: %s"
+            self.log.debug(msg, executor, self.available_slots)
+
+        if self._pending and self.available_slots and self.engine.scheduler:
+            self.engine.scheduler.wake_up_at(self, self._pending[0][0])  # start next executor on time
+
     def check(self):
         """
         Check executors for finish. Return True if all of them has finished.
         """
-        finished = True
-
         self._start_modules()
-        for executor in self.executors:
-            if executor in self.finished_modules:
-                continue
-
-            if executor not in self.started_modules:
-                finished = False
-                continue
+        for executor in list(self._running):
+            with self.engine.profiler.measure("check", executor):
+                executor_finished = executor.check()
 
-            if executor.check():
+            if executor_finished:
+                self._running.remove(executor)
                 self.finished_modules.append(executor)
                 self.available_slots += 1
                 self.log.debug("%s finished", executor)
-            else:
-                finished = False
+                if self._pending and self.engine.scheduler:
+                    self.engine.scheduler.wake_up(self)  # slot is freed for pending executor
 
-        return finished
+        return not self._running and not self._pending
 
     def shutdown(self):
         """
@@ -137,7 +189,8 @@ class Local(Provisioning):
         for executor in self.started_modules:
             self.log.debug("Shutdown %s", executor)
             try:
-                executor.shutdown()
+                with self.engine.profiler.measure("shutdown", executor):
+                    executor.shutdown()
             except BaseException as exc:
                 msg = "Exception in shutdown of %s: %s %s"
                 self.log.debug(msg, executor.__class__.__name__, exc, traceback.format_exc())
@@ -156,7 +209,8 @@ class Local(Provisioning):
         for executor in self.executors:
             self.log.debug("Post-process %s", executor)
             try:
-                executor.post_process()
+                with self.engine.profiler.measure("post_process", executor):
+                    executor.post_process()
                 if executor in self.started_modules and not executor.has_results():
                     msg = "Empty results, most likely %s (%s) failed. " \
                           "Actual reason for this can be found in logs under %s"
@@ -23,6 +23,7 @@ import time
 import zipfile
 import sys
 import shutil
+import site
 
 from urllib.request import urlopen
 from urllib.error import URLError
@@ -31,7 +32,7 @@ from bzt import NormalShutdown, ToolError, TaurusConfigError, TaurusInternalExce
 from bzt.engine import Service, HavingInstallableTools, Singletone
 from bzt.utils import get_stacktrace, communicate, BetterDict, TaurusCalledProcessError
 from bzt.utils import get_full_path, shutdown_process, shell_exec, RequiredTool, is_windows
-from bzt.utils import replace_in_config, JavaVM, Node, CALL_PROBLEMS, exec_and_communicate
+from bzt.utils import replace_in_config, JavaVM, Node, CALL_PROBLEMS, exec_and_communicate, ToolsCheckCache
 
 if not is_windows():
     try:
@@ -142,6 +143,24 @@ class PythonTool(RequiredTool):
         self.tool_path = self.installer.engine.temp_pythonpath
         super(PythonTool, self).__init__(tool_path=self.tool_path, **kwargs)
 
+    def _get_check_key(self):
+        engine = self.installer.engine
+        if engine.temp_pythonpath and os.path.isdir(engine.temp_pythonpath) and os.listdir(engine.temp_pythonpath):
+            return None  # package may be taken from temp dir, which is removed after run
+
+        packages = self.installer.parameters.get('packages')
+        paths = [sys.executable, engine.user_pythonpath] + self._get_site_dirs()
+        stats = [ToolsCheckCache.get_stat(path) for path in paths]
+        return json.dumps([self.__class__.__name__, paths, packages, self.installer.versions, stats])
+
+    @staticmethod
+    def _get_site_dirs():
+        site_dirs = site.getsitepackages() if hasattr(site, "getsitepackages") else []
+        return site_dirs + [site.getusersitepackages()]
+
+    def _get_check_stat_path(self):
+        return sys.executable
+
     def check_if_installed(self):
         self.log.debug(f"Checking {self.tool_name}.")
         try:
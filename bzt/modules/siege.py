@@ -26,6 +26,7 @@ from bzt.modules.aggregator import ConsolidatingAggregator, ResultsReader
 from bzt.modules.console import WidgetProvider, ExecutorWidget
 from bzt.requests_model import HTTPRequest
 from bzt.utils import iteritems, CALL_PROBLEMS, shutdown_process, RequiredTool, dehumanize_time, FileReader
+from bzt.utils import read_file_tail
 
 
 class SiegeExecutor(ScenarioExecutor, WidgetProvider, HavingInstallableTools, FileLister, SelfDiagnosable):
@@ -162,15 +163,13 @@ class SiegeExecutor(ScenarioExecutor, WidgetProvider, HavingInstallableTools, Fi
     def get_error_diagnostics(self):
         diagnostics = []
         if self.stdout is not None:
-            with open(self.stdout.name) as fds:
-                contents = fds.read().strip()
-                if contents:
-                    diagnostics.append("Siege STDOUT:\n" + contents)
+            contents = read_file_tail(self.stdout.name).strip()
+            if contents:
+                diagnostics.append("Siege STDOUT:\n" + contents)
         if self.stderr is not None:
-            with open(self.stderr.name) as fds:
-                contents = fds.read().strip()
-                if contents:
-                    diagnostics.append("Siege STDERR:\n" + contents)
+            contents = read_file_tail(self.stderr.name).strip()
+            if contents:
+                diagnostics.append("Siege STDERR:\n" + contents)
         return diagnostics
 
 
@@ -182,7 +181,7 @@ class DataLogReader(ResultsReader):
         self.concurrency = None
 
     def _read(self, last_pass=False):
-        lines = self.file.get_lines(size=1024 * 1024, last_pass=last_pass)
+        lines = self.file.get_complete_lines(last_pass=last_pass)
 
         for line in lines:
             if line.count(chr(0x1b)) != 2:  # skip garbage
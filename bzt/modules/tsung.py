@@ -29,6 +29,7 @@ from bzt.modules.aggregator import ConsolidatingAggregator, ResultsReader
 from bzt.modules.console import WidgetProvider, ExecutorWidget
 from bzt.requests_model import HTTPRequest
 from bzt.utils import CALL_PROBLEMS, shutdown_process, RequiredTool, dehumanize_time, FileReader, etree, iteritems
+from bzt.utils import read_file_tail
 
 
 class TsungExecutor(ScenarioExecutor, WidgetProvider, FileLister, HavingInstallableTools, SelfDiagnosable):
@@ -142,15 +143,13 @@ class TsungExecutor(ScenarioExecutor, WidgetProvider, FileLister, HavingInstalla
     def get_error_diagnostics(self):
         diagnostics = []
         if self.stdout is not None:
-            with open(self.stdout.name) as fds:
-                contents = fds.read().strip()
-                if contents.strip():
-                    diagnostics.append("Tsung STDOUT:\n" + contents)
+            contents = read_file_tail(self.stdout.name).strip()
+            if contents.strip():
+                diagnostics.append("Tsung STDOUT:\n" + contents)
         if self.stderr is not None:
-            with open(self.stderr.name) as fds:
-                contents = fds.read().strip()
-                if contents.strip():
-                    diagnostics.append("Tsung STDERR:\n" + contents)
+            contents = read_file_tail(self.stderr.name).strip()
+            if contents.strip():
+                diagnostics.append("Tsung STDERR:\n" + contents)
         return diagnostics
 
 
@@ -162,7 +161,6 @@ class TsungStatsReader(ResultsReader):
         self.stats_file = FileReader(parent_logger=self.log, file_opener=self.open_stats)
         self.log_file = FileReader(parent_logger=self.log, file_opener=self.open_log)
         self.delimiter = ";"
-        self.partial_buffer = ""
         self.skipped_header = False
         self.concurrency = 0
 
@@ -196,7 +194,7 @@ class TsungStatsReader(ResultsReader):
         return open(filename, mode='rb')
 
     def _read_concurrency(self, last_pass):
-        lines = self.log_file.get_lines(size=1024 * 1024, last_pass=last_pass)
+        lines = self.log_file.get_complete_lines(last_pass=last_pass)
         extractor = re.compile(r'^stats: users (\d+) (\d+)$')
 
         for line in lines:
@@ -210,20 +208,13 @@ class TsungStatsReader(ResultsReader):
         self.log.debug("Reading Tsung results")
 
         self._read_concurrency(last_pass)
-        lines = self.stats_file.get_lines(size=1024 * 1024, last_pass=last_pass)
+        lines = self.stats_file.get_complete_lines(last_pass=last_pass)
 
         for line in lines:
-            if not line.endswith("\n"):
-                self.partial_buffer += line
-                continue
-
             if not self.skipped_header and line.startswith("#"):
                 self.skipped_header = True
                 continue
 
-            line = "%s%s" % (self.partial_buffer, line)
-            self.partial_buffer = ""
-
             line = line.strip()
             fields = line.split(self.delimiter)
 
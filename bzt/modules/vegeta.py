@@ -132,7 +132,7 @@ class VegetaLogReader(ResultsReader):
         self.file = FileReader(filename=filename, parent_logger=self.log)
 
     def _read(self, last_pass=False):
-        lines = self.file.get_lines(size=1024 * 1024, last_pass=last_pass)
+        lines = self.file.get_complete_lines(last_pass=last_pass)
 
         for line in lines:
             log_vals = [val.strip() for val in line.split(',')]
@@ -4,8 +4,8 @@ import json
 import os
 import sys
 import time
-from collections import OrderedDict
 
+import gevent
 from locust import main, events
 from locust.exception import StopUser
 from requests.exceptions import HTTPError
@@ -13,11 +13,57 @@ from requests.exceptions import HTTPError
 from bzt.utils import guess_csv_dialect
 
 
+class ResultsWriter(object):
+    """
+    Keeps written data in memory and puts it into file by size or time budget,
+    so load generating greenlets don't make syscall on every request
+    """
+    FLUSH_INTERVAL = 0.25
+    FLUSH_SIZE = 64 * 1024
+
+    def __init__(self, fhd):
+        self.fhd = fhd
+        self.chunks = []
+        self.size = 0
+        self.flusher = None
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.size += len(data)
+        if self.size >= self.FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.chunks:
+            self.fhd.write("".join(self.chunks))
+            self.chunks = []
+            self.size = 0
+            self.fhd.flush()
+
+    def start(self):
+        self.flusher = gevent.spawn(self.__flush_loop)
+
+    def stop(self):
+        if self.flusher is not None:
+            self.flusher.kill()
+            self.flusher = None
+        self.flush()
+
+    def __flush_loop(self):
+        while True:
+            gevent.sleep(self.FLUSH_INTERVAL)
+            self.flush()
+
+
 class LocustStarter(object):
+    FIELDS = ('allThreads', 'timeStamp', 'label', 'method', 'elapsed', 'bytes', 'responseCode', 'responseMessage',
+              'success', 'Latency')
+
     def __init__(self):
         super(LocustStarter, self).__init__()
         self.fhd = None
         self.writer = None
+        self.csv_writer = None
         self.runner = None
         self.locust_start_time = None
         self.locust_stop_time = None
@@ -44,49 +90,36 @@ class LocustStarter(object):
                 raise StopUser('Request limit reached')
 
     def __getrec(self, request_type, name, response_time, response_length, exc=None):
-        rcode = '200' if exc is None else '500'
-        rmsg = 'OK' if exc is None else '%s' % exc
-        if isinstance(exc, HTTPError):
-            exc_message = str(exc)
-            rcode = exc_message[:exc_message.index(' ')]
-            rmsg = exc_message[exc_message.index(':') + 2:]
+        """ Returns row values in order of FIELDS """
+        if exc is None:
+            rcode, rmsg, success = '200', 'OK', 'true'
+        else:
+            rcode, rmsg, success = '500', '%s' % exc, 'false'
+            if isinstance(exc, HTTPError):
+                exc_message = str(exc)
+                rcode = exc_message[:exc_message.index(' ')]
+                rmsg = exc_message[exc_message.index(':') + 2:]
+
         if isinstance(response_time, float):
             response_time = int(round(response_time))
 
-        return OrderedDict([
-            ('allThreads', self.runner.user_count if self.runner else 0),
-            ('timeStamp', "%d" % (time.time() * 1000)),
-            ('label', name),
-            ('method', request_type),
-            ('elapsed', response_time),
-            ('bytes', response_length),
-            ('responseCode', rcode),
-            ('responseMessage', rmsg),
-            ('success', 'true' if exc is None else 'false'),
-
-            # NOTE: might be resource-consuming
-            ('Latency', 0),
-        ])
+        user_count = self.runner.user_count if self.runner else 0
+        # NOTE: latency might be resource-consuming
+        return user_count, int(time.time() * 1000), name, request_type, response_time, response_length, rcode, rmsg, \
+            success, 0
 
     def __on_init(self, **args):
         if 'runner' in args:
             self.runner = args['runner']
 
-    def __on_request_success(self, request_type, name, response_time, response_length, **args):
+    def __on_request(self, request_type, name, response_time, response_length, exception=None, **args):
         self.num_requests -= 1
-        self.writer.writerow(self.__getrec(request_type, name, response_time, response_length))
-        self.fhd.flush()
-        self.__check_limits()
-
-    def __on_request_failure(self, request_type, name, response_time, exception, response_length=0, **args):
-        self.num_requests -= 1
-        self.writer.writerow(self.__getrec(request_type, name, response_time, response_length, exception))
-        self.fhd.flush()
+        self.csv_writer.writerow(self.__getrec(request_type, name, response_time, response_length, exception))
         self.__check_limits()
 
     def __on_exception(self, locust_instance, exception, tb, **args):
         del locust_instance, tb
-        self.__on_request_failure('', '', 0, exception)
+        self.__on_request('', '', 0, 0, exception)
 
     def __on_worker_report(self, client_id, data, **args):
         if data['stats'] or data['errors']:
@@ -94,12 +127,12 @@ class LocustStarter(object):
                 self.num_requests -= item['num_requests']
 
             data['client_id'] = client_id
-            self.fhd.write("%s\n" % json.dumps(data))
-            self.fhd.flush()
+            self.writer.write("%s\n" % json.dumps(data))
         self.__check_limits()
 
     def __on_quit(self, **args):
         self.locust_stop_time = time.time()
+        self.writer.flush()
 
     def execute(self):
         if os.getenv("WORKERS_LDJSON"):
@@ -112,24 +145,24 @@ class LocustStarter(object):
             raise ValueError("Please specify JTL or WORKERS_LDJSON environment variable")
 
         with open(fname, 'wt') as self.fhd:
+            self.writer = ResultsWriter(self.fhd)
             if is_csv:
-                fieldnames = list(self.__getrec(None, None, None, None).keys())
-                dialect = guess_csv_dialect(",".join(fieldnames))
-                self.writer = csv.DictWriter(self.fhd, fieldnames=fieldnames, dialect=dialect)
-                self.writer.writeheader()
-                self.fhd.flush()
-            else:
-                self.writer = None  # FIXME: bad code design, have zero object for it
+                dialect = guess_csv_dialect(",".join(self.FIELDS))
+                self.csv_writer = csv.writer(self.writer, dialect=dialect)
+                self.csv_writer.writerow(self.FIELDS)
+                self.writer.flush()
 
             events.init.add_listener(self.__on_init)
-            events.request.add_listener(self.__on_request_success)
-            events.request.add_listener(self.__on_request_failure)
+            events.request.add_listener(self.__on_request)
             events.user_error.add_listener(self.__on_exception)
             events.worker_report.add_listener(self.__on_worker_report)
             events.quitting.add_listener(self.__on_quit)
 
-            main.main()
-            self.fhd.flush()
+            self.writer.start()
+            try:
+                main.main()
+            finally:
+                self.writer.stop()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,106 @@
+"""
+Console UI helpers that depend on `progressbar` and `urwid`, kept apart from bzt.utils to import them lazily
+
+Copyright 2015 BlazeMeter Inc.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import re
+import sys
+
+from progressbar import ProgressBar, Percentage, Bar, ETA
+from urwid import BaseScreen
+
+from bzt.utils import LOG
+
+
+class ProgressBarContext(ProgressBar):
+    def __init__(self, maxval=0):
+        widgets = [Percentage(), ' ', Bar(marker='=', left='[', right=']'), ' ', ETA()]
+        super(ProgressBarContext, self).__init__(widgets=widgets, maxval=maxval, fd=sys.stdout)
+
+    def __enter__(self):
+        if not (sys.stdout and sys.stdout.isatty()):
+            LOG.debug("No progressbar for non-tty output: %s", sys.stdout)
+
+        self.start()
+        return self
+
+    def update(self, value=None):
+        if sys.stdout and sys.stdout.isatty():
+            super(ProgressBarContext, self).update(value)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        del exc_type, exc_val, exc_tb
+        if sys.stdout and sys.stdout.isatty():
+            self.finish()
+
+    def download_callback(self, block_count, blocksize, totalsize):
+        if totalsize > 0:
+            self.maxval = totalsize
+            progress = block_count * blocksize
+            self.update(progress if progress <= totalsize else totalsize)
+
+
+class IncrementableProgressBar(ProgressBarContext):
+    def __init__(self, maxval):
+        super(IncrementableProgressBar, self).__init__(maxval=maxval)
+
+    def increment(self):
+        incremented = self.currval + 1
+        if incremented < self.maxval:
+            super(IncrementableProgressBar, self).update(incremented)
+
+    def catchup(self, started_time=None, current_value=None):
+        super(IncrementableProgressBar, self).start()
+        if started_time:
+            self.start_time = started_time
+        if current_value and current_value < self.maxval:
+            self.update(current_value)
+
+
+class DummyScreen(BaseScreen):
+    """
+    Null-object for Screen on non-tty output
+    """
+
+    def __init__(self, rows=120, cols=40):
+        super(DummyScreen, self).__init__()
+        self.size = (rows, cols)
+        self.ansi_escape = re.compile(r'\x1b[^m]*m')
+
+    def get_cols_rows(self):
+        """
+        Dummy cols and rows
+
+        :return:
+        """
+        return self.size
+
+    def draw_screen(self, size, canvas):
+        """
+
+        :param size:
+        :type canvas: urwid.Canvas
+        """
+        data = ""
+        for char in canvas.content():
+            line = ""
+            for part in char:
+                if isinstance(part[2], str):
+                    line += part[2]
+                else:
+                    line += part[2].decode()
+            data += "%s│\n" % line
+        data = self.ansi_escape.sub('', data)
+        LOG.info("Screen %sx%s chars:\n%s", size[0], size[1], data)
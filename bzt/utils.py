@@ -20,6 +20,8 @@ import codecs
 import copy
 import csv
 import fnmatch
+import functools
+import importlib
 import ipaddress
 import itertools
 import json
@@ -39,40 +41,69 @@ import subprocess
 import sys
 import tarfile
 import tempfile
+import threading
 import time
 import traceback
-import webbrowser
 import zipfile
 from abc import abstractmethod
 from collections import defaultdict, Counter
 from contextlib import contextmanager
-from distutils.version import LooseVersion
 from io import IOBase
 from ssl import SSLError
 from subprocess import CalledProcessError, PIPE, check_output, STDOUT
 from urllib import parse
 from urllib.error import URLError
-from urllib.request import url2pathname
-from webbrowser import GenericBrowser
-
-import psutil
-import requests
-import requests.adapters
-import selenium
-from lxml import etree
-from progressbar import ProgressBar, Percentage, Bar, ETA
-from requests.exceptions import ReadTimeout
-from urwid import BaseScreen
 
 from bzt import TaurusInternalException, TaurusNetworkError, ToolError, TaurusConfigError
 
 LOG = logging.getLogger("")
 CALL_PROBLEMS = (CalledProcessError, OSError)
-NETWORK_PROBLEMS = (IOError, URLError, SSLError, ReadTimeout, TaurusNetworkError)
+NETWORK_PROBLEMS = (IOError, URLError, SSLError, TaurusNetworkError)  # requests' ReadTimeout is an IOError
 numeric_types = (int, float, complex)
 viewvalues = operator.methodcaller("values")
 
 
+class LazyModule(object):
+    """
+    Stand-in for heavy module, imports it on first attribute access
+    """
+
+    def __init__(self, module_name):
+        self._module_name = module_name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._module_name)
+        return getattr(self._module, attr)
+
+
+# heavy third-party modules are imported on first use to keep `bzt` startup fast
+etree = LazyModule("lxml.etree")
+psutil = LazyModule("psutil")
+requests = LazyModule("requests")
+
+# classes built on heavy bases live in helper modules, still available as `bzt.utils` attributes for compatibility
+LAZY_ATTRS = {
+    "LocalFileAdapter": ("bzt.http_helpers", "LocalFileAdapter"),
+    "ProgressBarContext": ("bzt.ui_helpers", "ProgressBarContext"),
+    "IncrementableProgressBar": ("bzt.ui_helpers", "IncrementableProgressBar"),
+    "DummyScreen": ("bzt.ui_helpers", "DummyScreen"),
+}
+
+
+def __getattr__(name):
+    if name not in LAZY_ATTRS:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+    module_name, attr = LAZY_ATTRS[name]
+    value = importlib.import_module(module_name)
+    if attr:
+        value = getattr(value, attr)
+    globals()[name] = value
+    return value
+
+
 def unicode_decode(string, errors="strict"):
     if isinstance(string, bytes):
         return string.decode("utf-8", errors)
@@ -168,6 +199,7 @@ def get_files_recursive(dir_name, exclude_mask=''):
 
 def parse_java_version(versions):
     if versions:
+        from distutils.version import LooseVersion
         version = versions[0]
 
         if LooseVersion(version) > LooseVersion("6"):  # start of openjdk naming
@@ -289,6 +321,8 @@ def get_bytes_count(str_bytes):
 
 
 def is_selenium_4():
+    import selenium
+    from distutils.version import LooseVersion
     return LooseVersion(selenium.__version__) >= LooseVersion('4')
 
 
@@ -466,6 +500,96 @@ def get_uniq_name(directory, prefix, suffix="", forbidden_names=()):
     return base + diff + suffix
 
 
+class UniqueNames(object):
+    """
+    Gives names in the same way as get_uniq_name() but remembers given names and
+    last used number for every prefix, so new name usually costs single existence check
+    """
+
+    def __init__(self):
+        self.names = set()
+        self.counters = {}  # (base, suffix) -> number to start from
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def add(self, name):
+        self.names.add(name)
+
+    def get(self, directory, prefix, suffix=""):
+        base = os.path.join(directory, prefix)
+        num = self.counters.get((base, suffix), 0)
+        while True:
+            name = base + ("-%s" % num if num else "") + suffix
+            if name not in self.names and not os.path.exists(name):
+                break
+            num += 1
+
+        self.counters[(base, suffix)] = num + 1
+        self.names.add(name)
+        return name
+
+
+class BlobStore(object):
+    """
+    Content-addressed storage for lots of small blobs: data is appended to single pack file,
+    index file has 'sha1 offset length' line for every blob. Duplicated data is stored once.
+    """
+
+    def __init__(self, pack_filename, index_filename):
+        self.pack_filename = pack_filename
+        self.index_filename = index_filename
+        self.index = {}  # sha1 -> (offset, length)
+        self.lock = threading.Lock()
+        self._pack = None
+        self._index_fds = None
+
+        if os.path.exists(index_filename):
+            with open(index_filename) as fds:
+                for line in fds:
+                    digest, offset, length = line.split()
+                    self.index[digest] = (int(offset), int(length))
+
+    def put(self, data):
+        """
+        :type data: bytes
+        :return: blob reference in form 'pack_file_name#sha1'
+        """
+        import hashlib
+
+        digest = hashlib.sha1(data).hexdigest()
+        with self.lock:
+            if digest not in self.index:
+                if self._pack is None:
+                    self._pack = open(self.pack_filename, "ab")
+                    self._index_fds = open(self.index_filename, "a")
+
+                offset = self._pack.tell()
+                self._pack.write(data)
+                self._index_fds.write("%s %d %d\n" % (digest, offset, len(data)))
+                self.index[digest] = (offset, len(data))
+
+        return "%s#%s" % (os.path.basename(self.pack_filename), digest)
+
+    def get(self, reference):
+        digest = reference.rsplit("#", 1)[-1]
+        offset, length = self.index[digest]
+        with self.lock:
+            if self._pack:
+                self._pack.flush()
+
+        with open(self.pack_filename, "rb") as fds:
+            fds.seek(offset)
+            return fds.read(length)
+
+    def close(self):
+        with self.lock:
+            if self._pack:
+                self._pack.close()
+                self._index_fds.close()
+                self._pack = self._index_fds = None
+
+
 class TaurusCalledProcessError(CalledProcessError):
     def __init__(self, *args, **kwargs):
         """ join output and stderr for compatibility """
@@ -642,8 +766,12 @@ class Environment(object):
             method(*args, **kwargs)
 
 
+TAIL_SIZE = 64 * 1024  # enough for diagnostics, logs of tools can be huge
+
+
 class FileReader(object):
     SYS_ENCODING = locale.getpreferredencoding()
+    BLOCK_SIZE = 256 * 1024
 
     def __init__(self, filename="", file_opener=None, parent_logger=None):
         self.fds = None
@@ -664,6 +792,7 @@ class FileReader(object):
         self.decoder = codecs.lookup(self.cp).incrementaldecoder()
         self.fallback_decoder = codecs.lookup(self.SYS_ENCODING).incrementaldecoder(errors='ignore')
         self.offset = 0
+        self.partial_line = b""
 
     def _readlines(self, hint=None):
         # get generator instead of list (in regular readlines())
@@ -714,6 +843,111 @@ class FileReader(object):
                 self.offset += len(line)
                 yield self._decode(line, last_pass)
 
+    def _read_complete(self, size, last_pass):
+        """
+        :return: data read after previous partial line and end position of its complete lines
+        """
+        if not self.is_ready():
+            return b"", 0
+
+        if last_pass:
+            size = -1
+        elif size is None:
+            size = self.BLOCK_SIZE
+        self.fds.seek(self.offset)
+        data = self.fds.read(size)
+        self.offset += len(data)
+        if self.partial_line:
+            data = self.partial_line + data
+            self.partial_line = b""
+
+        eol = len(data)
+        if not last_pass:
+            eol = data.rfind(b"\n") + 1
+            if eol < len(data):
+                self.partial_line = data[eol:]
+
+        return data, eol
+
+    def get_complete_bytes(self, size=None, last_pass=False):
+        """
+        Read next block of complete lines as is. Incomplete last line
+        is kept until next call, unless it's last pass.
+
+        :rtype: memoryview
+        """
+        data, eol = self._read_complete(size, last_pass)
+        block = memoryview(data)
+        if eol < len(data):
+            block = block[:eol]  # no copy of block
+        return block
+
+    def _iter_complete(self, read, size, last_pass):
+        """
+        Single block of complete lines, last pass goes through the rest of file block by block,
+        so lines are processed while they're still in cache and memory usage is bounded
+        """
+        if last_pass:
+            block = read(size, False)
+            while block:
+                yield block
+                block = read(size, False)
+        yield read(size, last_pass)
+
+    def _read_byte_lines(self, size, last_pass):
+        data, eol = self._read_complete(size, last_pass)
+        has_partial = eol < len(data)
+        if b"\r" in data:
+            data = data.replace(b"\r\n", b"\n")
+        lines = data.split(b"\n")
+        if has_partial or not lines[-1]:  # incomplete line or empty tail after last line terminator
+            lines.pop()
+        return lines
+
+    def _read_lines(self, size, last_pass):
+        text = self.get_complete_text(size, last_pass)
+        if not text:
+            return []
+
+        if "\r" in text:
+            text = text.replace("\r\n", "\n")
+        lines = text.split("\n")
+        if not lines[-1]:
+            lines.pop()
+        return lines
+
+    def get_complete_byte_lines(self, size=None, last_pass=False):
+        """
+        Same as get_complete_bytes() but splitted into lines, line terminators (LF or CRLF) are dropped
+
+        :rtype: collections.Iterable[bytes]
+        """
+        for lines in self._iter_complete(self._read_byte_lines, size, last_pass):
+            yield from lines
+
+    def get_complete_text(self, size=None, last_pass=False):
+        """
+        Same as get_complete_bytes() but decoded at once
+        """
+        block = self.get_complete_bytes(size, last_pass)
+        if not block:
+            return ""
+        if self.decoder is not self.fallback_decoder:
+            try:
+                return str(block, self.cp)  # complete lines don't break multibyte chars, decoder state isn't needed
+            except UnicodeDecodeError:
+                pass
+        return self._decode(block, last_pass)
+
+    def get_complete_lines(self, size=None, last_pass=False):
+        """
+        Same as get_complete_byte_lines() but decoded block by block
+
+        :rtype: collections.Iterable[str]
+        """
+        for lines in self._iter_complete(self._read_lines, size, last_pass):
+            yield from lines
+
     def get_line(self):
         line = ""
         if self.is_ready():
@@ -743,6 +977,25 @@ class FileReader(object):
             self.fds.close()
 
 
+def read_file_tail(filename, size=TAIL_SIZE, encoding="utf-8"):
+    """
+    Read last `size` bytes of file, starting from line boundary. Cost doesn't depend on file size.
+
+    :return: decoded tail, prefixed with '...' line if file is truncated
+    """
+    with open(filename, "rb") as fds:
+        fds.seek(0, os.SEEK_END)
+        offset = max(0, fds.tell() - size)
+        fds.seek(offset)
+        contents = fds.read(size)
+
+    if offset:
+        newline = contents.find(b"\n")
+        contents = b"...\n" + (contents[newline + 1:] if newline >= 0 else contents)
+
+    return contents.decode(encoding, errors="replace")
+
+
 def ensure_is_dict(container, key, sub_key):
     """
     Ensure that dict item is dict, convert if needed
@@ -1110,57 +1363,10 @@ def shutdown_process(process_obj, log_obj, send_sigterm=True):
             log_obj.debug("Failed to terminate process: %s", exc)
 
 
-class LocalFileAdapter(requests.adapters.BaseAdapter):
-    """
-    Protocol Adapter to allow HTTPClient to GET file:// URLs
-    """
-
-    @staticmethod
-    def _chkpath(method, path):
-        """Return an HTTP status for the given filesystem path."""
-        if method.lower() in ('put', 'delete'):
-            return 501, "Not Implemented"  # TODO
-        elif method.lower() not in ('get', 'head'):
-            return 405, "Method Not Allowed"
-        elif os.path.isdir(path):
-            return 400, "Path Not A File"
-        elif not os.path.isfile(path):
-            return 404, "File Not Found"
-        elif not os.access(path, os.R_OK):
-            return 403, "Access Denied"
-        else:
-            return 200, "OK"
-
-    def send(self, req, **kwargs):  # pylint: disable=unused-argument
-        """Return the file specified by the given request
-        """
-        path = os.path.normcase(os.path.normpath(url2pathname(req.path_url)))
-        response = requests.Response()
-
-        response.status_code, response.reason = self._chkpath(req.method, path)
-        if response.status_code == 200 and req.method.lower() != 'head':
-            try:
-                response.raw = open(path, 'rb')
-            except (OSError, IOError) as err:
-                response.status_code = 500
-                response.reason = str(err)
-
-        if isinstance(req.url, bytes):
-            response.url = req.url.decode('utf-8')
-        else:
-            response.url = req.url
-
-        response.request = req
-        response.connection = self
-
-        return response
-
-    def close(self):
-        pass
-
-
 class HTTPClient(object):
     def __init__(self):
+        from bzt.http_helpers import LocalFileAdapter
+
         self.session = requests.Session()
         self.session.mount('file://', LocalFileAdapter())
         self.log = logging.getLogger(self.__class__.__name__)
@@ -1274,14 +1480,186 @@ class ExceptionalDownloader(object):
         return result
 
 
+def locked_install(install):
+    """
+    Decorator for RequiredTool.install: the same tool (class, path and version) is installed
+    by one thread at a time, others wait and reuse its result instead of installing again
+    """
+
+    @functools.wraps(install)
+    def wrapper(self):
+        key = (self.__class__.__name__, self.tool_path, self.version)
+        installing = RequiredTool.INSTALL_STATE.__dict__.setdefault("installing", set())
+        if key in installing:  # nested call from subclass via super()
+            return install(self)
+
+        with RequiredTool.INSTALL_LOCKS_GUARD:
+            lock = RequiredTool.INSTALL_LOCKS.setdefault(key, threading.Lock())
+
+        with lock:
+            if key in RequiredTool.INSTALLED and self.check_if_installed():
+                self.log.debug("%s has been installed already by another thread", self.tool_name)
+                return self.tool_path
+
+            installing.add(key)
+            try:
+                result = install(self)
+            finally:
+                installing.discard(key)
+
+            RequiredTool.INSTALLED.add(key)
+            return result
+
+    return wrapper
+
+
+def cached_check(check_if_installed):
+    """
+    Decorator for RequiredTool.check_if_installed: successful checks are remembered in
+    tool's check_cache (if given) to skip spawning tool processes on next runs
+    """
+
+    @functools.wraps(check_if_installed)
+    def wrapper(self):
+        cache = self.check_cache
+        checking = RequiredTool.INSTALL_STATE.__dict__.setdefault("checking", set())
+        if cache is None or id(self) in checking:  # disabled or nested call from subclass via super()
+            return check_if_installed(self)
+
+        key = self._get_check_key()
+        if key is None:  # result of this check can't be reused
+            return check_if_installed(self)
+
+        cached = cache.get(key)
+        if cached is not None:
+            tool_path, self.version = cached
+            if tool_path is not None:
+                self.tool_path = tool_path
+            self.log.debug("%s check result is taken from cache: %s", self.tool_name, self.tool_path)
+            return True
+
+        checking.add(id(self))
+        try:
+            result = check_if_installed(self)
+        finally:
+            checking.discard(id(self))
+
+        if result:
+            cache.put(key, self.tool_path, self.version, self._get_check_stat_path())
+        return result
+
+    return wrapper
+
+
+class ToolsCheckCache(object):
+    """
+    Persistent storage of successful tool checks. Entry is valid during TTL while
+    the checked tool binary (or other file given as stat path) keeps its mtime and size.
+    Expired entries are dropped, only MAX_ENTRIES most recent checks are kept.
+    """
+    MAX_ENTRIES = 200
+
+    def __init__(self, filename, ttl, recheck=False):
+        self.filename = filename
+        self.ttl = ttl
+        self.recheck = recheck
+        self.lock = threading.Lock()
+        self.entries = None
+
+    @staticmethod
+    def get_stat(path):
+        """
+        :return: mtime and size of file or dir, resolving command names with PATH
+        """
+        if not path:
+            return None
+
+        if not os.path.exists(path):
+            path = shutil.which(path)
+            if not path:
+                return None
+
+        stat = os.stat(path)
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _load(self):
+        if self.entries is None:
+            try:
+                with open(self.filename) as fds:
+                    self.entries = json.load(fds)
+            except (OSError, ValueError) as exc:
+                LOG.debug("Can't read tools check cache %s: %s", self.filename, exc)
+                self.entries = {}
+
+            now = time.time()
+            self.entries = {key: entry for key, entry in self.entries.items() if now - entry["time"] <= self.ttl}
+
+        return self.entries
+
+    def get(self, key):
+        """
+        :return: (tool_path, version) of checked tool or None
+        """
+        if self.recheck:
+            return None
+
+        with self.lock:
+            entry = self._load().get(key)
+
+        if not entry or time.time() - entry["time"] > self.ttl:
+            return None
+
+        if self.get_stat(entry.get("stat_path") or entry["tool_path"]) != entry["stat"]:
+            return None
+
+        return entry["tool_path"], entry["version"]
+
+    def put(self, key, tool_path, version, stat_path=None):
+        """
+        :param stat_path: file to watch instead of tool_path, tool_path isn't stored then
+        """
+        stat = self.get_stat(stat_path or tool_path)
+        if stat is None:  # removal of tool couldn't be noticed
+            return
+
+        if stat_path:
+            tool_path = None
+        entry = {"tool_path": tool_path, "stat_path": stat_path, "version": version, "stat": stat, "time": time.time()}
+        with self.lock:
+            entries = self._load()
+            entries[key] = entry
+            if len(entries) > self.MAX_ENTRIES:
+                recent = sorted(entries.items(), key=lambda item: item[1]["time"])[-self.MAX_ENTRIES:]
+                self.entries = dict(recent)
+            try:
+                os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+                with open(self.filename + ".tmp", "w") as fds:
+                    json.dump(self.entries, fds)
+                os.replace(self.filename + ".tmp", self.filename)
+            except OSError as exc:
+                LOG.debug("Can't write tools check cache %s: %s", self.filename, exc)
+
+
 class RequiredTool(object):
     """
     Abstract required tool
     """
+    INSTALL_LOCKS = {}
+    INSTALL_LOCKS_GUARD = threading.Lock()
+    INSTALL_STATE = threading.local()
+    INSTALLED = set()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "install" in cls.__dict__:
+            cls.install = locked_install(cls.__dict__["install"])
+        if "check_if_installed" in cls.__dict__:
+            cls.check_if_installed = cached_check(cls.__dict__["check_if_installed"])
 
     def __init__(self, log=None, tool_path="", download_link="", http_client=None,
-                 env=None, version=None, installable=True, mandatory=True):
+                 env=None, version=None, installable=True, mandatory=True, check_cache=None):
         self.http_client = http_client
+        self.check_cache = check_cache  # type: ToolsCheckCache
         self.tool_path = os.path.expanduser(tool_path)
         self.download_link = download_link
         self.mirror_manager = None
@@ -1313,12 +1691,27 @@ class RequiredTool(object):
         kwargs["env"] = mixed_env
         return exec_and_communicate(*args, **kwargs)
 
+    def _get_check_key(self):
+        """
+        Key of tool check in check_cache, the tool is identified by what was requested before check.
+        None means check result can't be reused.
+        """
+        stat = ToolsCheckCache.get_stat(self.tool_path)
+        return json.dumps([self.__class__.__name__, self.tool_path, self.version, stat])
+
+    def _get_check_stat_path(self):
+        """
+        File which change invalidates cached check, tool_path is used if None
+        """
+        return None
+
     def check_if_installed(self):
         if os.path.exists(self.tool_path):
             return True
         self.log.debug("File not exists: %s", self.tool_path)
         return False
 
+    @locked_install
     def install(self):
         if not self.installable:
             msg = "%s isn't found, automatic installation isn't implemented" % self.tool_name
@@ -1328,6 +1721,8 @@ class RequiredTool(object):
                 self.log.warning(msg)
                 return
 
+        from bzt.ui_helpers import ProgressBarContext
+
         with ProgressBarContext() as pbar:
             if not os.path.exists(os.path.dirname(self.tool_path)):
                 os.makedirs(os.path.dirname(self.tool_path))
@@ -1341,6 +1736,8 @@ class RequiredTool(object):
                 raise ToolError("Unable to run %s after installation!" % self.tool_name)
 
     def _download(self, suffix=".zip", use_link=False):
+        from bzt.ui_helpers import ProgressBarContext
+
         if use_link:
             links = [self.download_link]
         else:
@@ -1391,51 +1788,6 @@ class JavaVM(RequiredTool):
         return True
 
 
-class ProgressBarContext(ProgressBar):
-    def __init__(self, maxval=0):
-        widgets = [Percentage(), ' ', Bar(marker='=', left='[', right=']'), ' ', ETA()]
-        super(ProgressBarContext, self).__init__(widgets=widgets, maxval=maxval, fd=sys.stdout)
-
-    def __enter__(self):
-        if not (sys.stdout and sys.stdout.isatty()):
-            LOG.debug("No progressbar for non-tty output: %s", sys.stdout)
-
-        self.start()
-        return self
-
-    def update(self, value=None):
-        if sys.stdout and sys.stdout.isatty():
-            super(ProgressBarContext, self).update(value)
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        del exc_type, exc_val, exc_tb
-        if sys.stdout and sys.stdout.isatty():
-            self.finish()
-
-    def download_callback(self, block_count, blocksize, totalsize):
-        if totalsize > 0:
-            self.maxval = totalsize
-            progress = block_count * blocksize
-            self.update(progress if progress <= totalsize else totalsize)
-
-
-class IncrementableProgressBar(ProgressBarContext):
-    def __init__(self, maxval):
-        super(IncrementableProgressBar, self).__init__(maxval=maxval)
-
-    def increment(self):
-        incremented = self.currval + 1
-        if incremented < self.maxval:
-            super(IncrementableProgressBar, self).update(incremented)
-
-    def catchup(self, started_time=None, current_value=None):
-        super(IncrementableProgressBar, self).start()
-        if started_time:
-            self.start_time = started_time
-        if current_value and current_value < self.maxval:
-            self.update(current_value)
-
-
 class TclLibrary(RequiredTool):
     ENV_NAME = "TCL_LIBRARY"
     INIT_TCL = "init.tcl"
@@ -1573,9 +1925,11 @@ def log_std_streams(logger=None, stdout_level=logging.DEBUG, stderr_level=loggin
 
 
 def open_browser(url):
+    import webbrowser
+
     try:
         browser = webbrowser.get()
-        if type(browser) != GenericBrowser:  # pylint: disable=unidiomatic-typecheck
+        if type(browser) != webbrowser.GenericBrowser:  # pylint: disable=unidiomatic-typecheck
             with log_std_streams(logger=LOG):
                 webbrowser.open(url)
     except BaseException as exc:
@@ -1601,43 +1955,6 @@ def platform_bitness():
 EXE_SUFFIX = ".bat" if is_windows() else ".sh"
 
 
-class DummyScreen(BaseScreen):
-    """
-    Null-object for Screen on non-tty output
-    """
-
-    def __init__(self, rows=120, cols=40):
-        super(DummyScreen, self).__init__()
-        self.size = (rows, cols)
-        self.ansi_escape = re.compile(r'\x1b[^m]*m')
-
-    def get_cols_rows(self):
-        """
-        Dummy cols and rows
-
-        :return:
-        """
-        return self.size
-
-    def draw_screen(self, size, canvas):
-        """
-
-        :param size:
-        :type canvas: urwid.Canvas
-        """
-        data = ""
-        for char in canvas.content():
-            line = ""
-            for part in char:
-                if isinstance(part[2], str):
-                    line += part[2]
-                else:
-                    line += part[2].decode()
-            data += "%s│\n" % line
-        data = self.ansi_escape.sub('', data)
-        LOG.info("Screen %sx%s chars:\n%s", size[0], size[1], data)
-
-
 class PythonGenerator(object):
     IMPORTS = ''
     INDENT_STEP = 4
@@ -1734,18 +2051,11 @@ class LDJSONReader(object):
         self.file = FileReader(filename=filename,
                                file_opener=lambda f: open(f, 'rb'),
                                parent_logger=self.log)
-        self.partial_buffer = ""
 
     def read(self, last_pass=False):
-        lines = self.file.get_lines(size=1024 * 1024, last_pass=last_pass)
-
-        for line in lines:
-            if not last_pass and not line.endswith("\n"):
-                self.partial_buffer += line
-                continue
-            line = "%s%s" % (self.partial_buffer, line)
-            self.partial_buffer = ""
-            yield json.loads(line)
+        for line in self.file.get_complete_lines(last_pass=last_pass):
+            if line.strip():
+                yield json.loads(line)
 
 
 def get_host_ips(filter_loopbacks=True):
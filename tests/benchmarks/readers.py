@@ -0,0 +1,169 @@
+"""
+Microbenchmark of line-oriented results readers: builds big results files from
+test resources and measures lines/sec of raw file tailing and of complete parsing.
+JTL aggregation is also compared to row-by-row csv.DictReader on file with failed samples.
+
+Usage: python -m tests.benchmarks.readers [lines]
+"""
+import csv
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from bzt.modules.ab import TSVDataReader
+from bzt.modules.aggregator import SamplesBatch
+from bzt.modules.gatling import DataLogReader as GatlingLogReader
+from bzt.modules.jmeter import JTLReader
+from bzt.modules.k6 import K6LogReader
+from bzt.modules.siege import DataLogReader as SiegeLogReader
+from bzt.modules.tsung import TsungStatsReader
+from bzt.modules.vegeta import VegetaLogReader
+from bzt.utils import FileReader, LDJSONReader
+
+RESOURCES_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "resources")
+LOG = logging.getLogger("readers-benchmark")
+
+
+class LegacyJTLReader(JTLReader):
+    """ row-by-row parsing with csv.DictReader, the way JTLReader used to do it """
+
+    def _read(self, last_pass=False):
+        if self.read_records:
+            return
+
+        with open(self.csvreader.file.name) as fds:
+            for row in csv.DictReader(fds):
+                rcd = row["responseCode"]
+                if rcd.endswith('Exception'):
+                    rcd = rcd.split('.')[-1]
+                error = row["responseMessage"] if row["success"] != "true" else None
+                self.read_records += 1
+                yield (int(int(row["timeStamp"]) / 1000.0), row["label"], int(row["allThreads"]),
+                       int(row["elapsed"]) / 1000.0, int(row["Connect"]) / 1000.0, int(row["Latency"]) / 1000.0,
+                       rcd, error, '', int(row.get("bytes", 0)))
+
+
+def make_file(template, filename, lines, header_lines=0):
+    with open(os.path.join(RESOURCES_DIR, template), "rb") as fds:
+        template_lines = fds.read().splitlines(True)
+
+    header, body = template_lines[:header_lines], template_lines[header_lines:]
+    with open(filename, "wb") as fds:
+        fds.writelines(header)
+        written = 0
+        while written < lines:
+            chunk = body[:lines - written]
+            fds.writelines(chunk)
+            written += len(chunk)
+
+
+def make_jtl(filename, rows):
+    """ every 20th sample is failed, with quoted failure message """
+    header = "timeStamp,elapsed,label,responseCode,responseMessage,threadName,dataType,success,failureMessage," \
+             "bytes,sentBytes,grpThreads,allThreads,Latency,IdleTime,Connect\n"
+    row = '%d,%d,http://blazedemo.com/label-%d,%s,%s,Thread Group 1-%d,text,%s,,%d,125,%d,%d,%d,0,%d\n'
+    with open(filename, "w") as fds:
+        fds.write(header)
+        for idx in range(rows):
+            failed = not idx % 20
+            msg = '"Not Found, really"' if failed else "OK"
+            fds.write(row % (1500000000000 + idx, idx % 500, idx % 100, 404 if failed else 200,
+                             msg, idx % 50, "false" if failed else "true", idx, 50, 50, idx % 300, 5))
+
+
+def tail_old(filename):
+    reader = FileReader(filename)
+    count = 0
+    for _ in reader.get_lines(size=1024 * 1024, last_pass=True):
+        count += 1
+    reader.close()
+    return count
+
+
+def tail_new(filename):
+    reader = FileReader(filename)
+    count = 0
+    while True:
+        lines = list(reader.get_complete_lines())
+        if not lines:
+            break
+        count += len(lines)
+    reader.close()
+    return count
+
+
+def parse(reader):
+    if isinstance(reader, LDJSONReader):
+        return sum(1 for _ in reader.read(last_pass=True))
+    return sum(len(item) if isinstance(item, SamplesBatch) else 1 for item in reader._read(last_pass=True))
+
+
+def get_formats(workdir):
+    tsung_dir = os.path.join(workdir, "tsung")
+    os.makedirs(os.path.join(tsung_dir, "run"))
+    ab_reader = TSVDataReader(os.path.join(workdir, "ab.tsv"), LOG)
+    ab_reader.setup(1, "label")
+
+    return [  # name, template, data file, header lines, reader factory
+        ("ab", "ab/ab.tsv", os.path.join(workdir, "ab.tsv"), 1, lambda: ab_reader),
+        ("siege", "siege/siege.out", os.path.join(workdir, "siege.out"), 0,
+         lambda: SiegeLogReader(os.path.join(workdir, "siege.out"), LOG)),
+        ("vegeta", "vegeta/vegeta_kpi.csv", os.path.join(workdir, "vegeta.csv"), 0,
+         lambda: VegetaLogReader(os.path.join(workdir, "vegeta.csv"), LOG)),
+        ("k6", "k6/k6_kpi.csv", os.path.join(workdir, "k6.csv"), 1,
+         lambda: K6LogReader(os.path.join(workdir, "k6.csv"), LOG)),
+        ("tsung", "tsung/stats/tsung-stats/tsung.dump", os.path.join(tsung_dir, "run", "tsung.dump"), 1,
+         lambda: TsungStatsReader(tsung_dir, LOG)),
+        ("gatling", "gatling/gatling-351-000/simulation.log", os.path.join(workdir, "simulation.log"), 1,
+         lambda: GatlingLogReader(os.path.join(workdir, "simulation.log"), LOG, "gatling-351")),
+        ("jtl", "jmeter/jtl/simple.kpi.jtl", os.path.join(workdir, "kpi.jtl"), 1,
+         lambda: JTLReader(os.path.join(workdir, "kpi.jtl"), LOG)),
+        ("ldjson", "functional/apiritif.ldjson", os.path.join(workdir, "samples.ldjson"), 0,
+         lambda: LDJSONReader(os.path.join(workdir, "samples.ldjson"), LOG)),
+    ]
+
+
+def aggregate(reader):
+    for _ in reader.datapoints(final_pass=True):
+        pass
+    reader.csvreader.file.close()
+    return reader.read_records
+
+
+def measure(func, *args):
+    start = time.time()
+    count = func(*args)
+    return count, time.time() - start
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    workdir = tempfile.mkdtemp()
+    try:
+        sys.stderr.write("%-8s %10s %10s %12s %12s %12s\n" % (
+            "format", "lines", "samples", "old tail/s", "new tail/s", "parsed/s"))
+        for name, template, filename, header_lines, factory in get_formats(workdir):
+            make_file(template, filename, lines, header_lines)
+            old_count, old_time = measure(tail_old, filename)
+            new_count, new_time = measure(tail_new, filename)
+            assert old_count == new_count, (name, old_count, new_count)
+            parsed, parse_time = measure(parse, factory())
+            sys.stderr.write("%-8s %10d %10d %12d %12d %12d\n" % (
+                name, new_count, parsed, old_count / old_time, new_count / new_time, new_count / parse_time))
+
+        jtl = os.path.join(workdir, "failures.jtl")
+        make_jtl(jtl, lines)
+        legacy_count, legacy_time = measure(aggregate, LegacyJTLReader(jtl, LOG))
+        count, aggregate_time = measure(aggregate, JTLReader(jtl, LOG))
+        assert legacy_count == count, (legacy_count, count)
+        sys.stderr.write("\nJTL with failures, aggregated/s: csv.DictReader %d, JTLReader %d\n" % (
+            legacy_count / legacy_time, count / aggregate_time))
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import logging
 import difflib
+import os
 import ast
 import astunparse
 import sys
@@ -26,6 +27,7 @@ class BZTestCase(TestCase):
         self.clean_log()
         self.stdout_backup = sys.stdout
         sys.stdout = DummyOut()
+        os.environ["TAURUS_DISABLE_CONFIG_CACHE"] = "true"  # don't touch caches in user's home
 
     def clean_log(self, logger=None):
         if not logger:
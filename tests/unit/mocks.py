@@ -110,6 +110,7 @@ class EngineEmul(Engine):
                 "local": ModuleMock.__module__ + "." + ModuleMock.__name__},
             "settings": {
                 "check-updates": False,
+                "tools-check-ttl": 0,
             }})
 
         if custom_configs:
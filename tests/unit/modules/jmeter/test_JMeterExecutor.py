@@ -2861,6 +2861,19 @@ class TestJMeterExecutor(ExecutorTestCase):
         self.obj.prepare()
         self.assertEquals('get-post', self.obj.reader.executor_label)
 
+    def test_max_error_response_size(self):
+        self.configure({
+            "execution": {"scenario": {"script": RESOURCES_DIR + "/jmeter/jmx/dummy.jmx"}},
+            "modules": {"jmeter": {"max-error-response-size": "64k"}}})
+        self.obj.prepare()
+        self.assertEqual(64 * 1024, self.obj.reader.errors_reader.max_response_size)
+
+    def test_max_error_response_size_wrong(self):
+        self.configure({
+            "execution": {"scenario": {"script": RESOURCES_DIR + "/jmeter/jmx/dummy.jmx"}},
+            "modules": {"jmeter": {"max-error-response-size": "64 parrots"}}})
+        self.assertRaises(TaurusConfigError, self.obj.prepare)
+
     def test_source_ips(self):
         self.configure({
             "execution": {
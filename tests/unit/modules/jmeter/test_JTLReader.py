@@ -6,8 +6,8 @@ import time
 import unittest
 
 from bzt.modules.aggregator import DataPoint, KPISet
-from bzt.modules.jmeter import JTLErrorsReader, JTLReader, FuncJTLReader
-from bzt.utils import to_json
+from bzt.modules.jmeter import JTLErrorsReader, JTLReader, FuncJTLReader, IncrementalCSVReader
+from bzt.utils import to_json, temp_file
 from tests.unit import BZTestCase, RESOURCES_DIR, close_reader_file, ROOT_LOGGER, EngineEmul
 
 
@@ -258,6 +258,37 @@ class TestJTLErrorsReader(BZTestCase):
         self.assertEquals(KPISet.ERRTYPE_ERROR, values[''][0]['type'])
         self.assertEquals('200', values[''][0]['rc'])
 
+    def test_max_response_size(self):
+        self.configure(RESOURCES_DIR + "/jmeter/jtl/standard-errors.jtl")
+        self.obj.read_file(final_pass=True)
+        expected = self.obj.get_data(sys.maxsize)
+        close_reader_file(self.obj)
+
+        self.obj = JTLErrorsReader(RESOURCES_DIR + "/jmeter/jtl/standard-errors.jtl", ROOT_LOGGER,
+                                   max_response_size=100)
+        self.obj.read_file(final_pass=True)
+        self.assertEqual(expected, self.obj.get_data(sys.maxsize))
+
+    def test_cut_responses(self):
+        self.obj = JTLErrorsReader(RESOURCES_DIR + "/jmeter/jtl/error-mix.jtl", ROOT_LOGGER, max_response_size=5)
+        xml = b'<a><responseData class="s">small</responseData><responseData/>' \
+              b'<responseData class="s">big &amp; long</responseData></a>'
+        expected = b'<a><responseData class="s">small</responseData><responseData/>' \
+                   b'<responseData class="s"></responseData></a>'
+        for size in range(1, len(xml) + 1):
+            parts = [xml[pos:pos + size] for pos in range(0, len(xml), size)]
+            self.assertEqual(expected, b''.join(self.obj._cut_responses(part) for part in parts))
+
+    def test_get_data_by_seconds(self):
+        self.configure(RESOURCES_DIR + "/jmeter/jtl/error-bug1.jtl")
+        self.obj.read_file()
+        seconds = sorted(self.obj.buffer.keys())
+        self.assertTrue(all(isinstance(second, int) for second in seconds))
+        self.assertTrue(self.obj.get_data(seconds[0]))
+        self.assertEqual(seconds[1:], sorted(self.obj.buffer.keys()))
+        self.assertTrue(self.obj.get_data(sys.maxsize))
+        self.assertFalse(self.obj.buffer)
+
     @unittest.skipUnless(sys.platform == "darwin", "MacOS-only")
     def test_macos_unicode_parsing_is_not_supported(self):
         self.configure(RESOURCES_DIR + "/jmeter/jtl/standard-errors.jtl")
@@ -360,3 +391,34 @@ class TestJTLReader(BZTestCase):
 
         self.assertEqual(exp, enc_dec_iter(new().items()))
         self.assertEqual('{"100.0": 0.1}', to_json(new().get(KPISet.PERCENTILES), indent=None))
+
+
+class TestIncrementalCSVReader(BZTestCase):
+    def setUp(self):
+        super(TestIncrementalCSVReader, self).setUp()
+        self.fname = temp_file(".jtl")
+        self.obj = IncrementalCSVReader(ROOT_LOGGER, self.fname)
+
+    def tearDown(self):
+        close_reader_file(self.obj)
+        os.remove(self.fname)
+        super(TestIncrementalCSVReader, self).tearDown()
+
+    def append(self, data):
+        with open(self.fname, "ab") as fds:
+            fds.write(data.encode("utf-8"))
+
+    def test_incremental_quoted(self):
+        self.append('timeStamp,label,responseMessage,success\n1,a,OK,true\n2,"b,c","multi\n')
+        self.assertEqual([["1", "a", "OK", "true"]], list(self.obj.read()))
+        self.assertEqual({"timeStamp": 0, "label": 1, "responseMessage": 2, "success": 3}, self.obj.indexes)
+
+        self.append('line ""quoted""",false\n3,d,Э,tr')
+        self.assertEqual([["2", "b,c", 'multi\nline "quoted"', "false"]], list(self.obj.read()))
+
+        self.append('ue\n\n')
+        self.assertEqual([["3", "d", "Э", "true"]], list(self.obj.read(last_pass=True)))
+
+    def test_malformed_line(self):
+        self.append('timeStamp,label,success\n1,a\n2,b,true\n')
+        self.assertEqual([["2", "b", "true"]], list(self.obj.read()))
@@ -654,3 +654,34 @@ class TestDataLogReader(BZTestCase):
         last_cumul = list_of_values[-1][DataPoint.CUMULATIVE]
         self.assertEqual(1, last_cumul[''][KPISet.RESP_CODES]['400'])
         self.assertEqual(1, last_cumul[''][KPISet.RESP_CODES]['401'])
+
+    def test_read_version_detection(self):
+        log_path = os.path.join(BUILD_DIR, "gatling-310-000")
+        os.makedirs(log_path, exist_ok=True)
+        with open(os.path.join(log_path, "simulation.log"), "w") as fds:
+            fds.write("RUN\tsimulation\tgatling-310\t1617110479263\t \t3.10.3\n")
+            fds.write("USER\tBasicSimulation\tSTART\t1617110480034\n")
+            fds.write("REQUEST\t\trequest_1\t1617110480075\t1617110480090\tOK\n")
+
+        obj = DataLogReader(BUILD_DIR, ROOT_LOGGER, 'gatling-310')
+        samples = list(obj._read(last_pass=True))
+        self.assertEqual("3.4+", obj.guessed_gatling_version)
+        self.assertEqual([(1617110480, 'request_1', 1, 0.015, 0.0, 0.0, '200', None, '', None)], samples)
+
+    def test_read_crlf(self):
+        log_path = os.path.join(BUILD_DIR, "gatling-crlf-000")
+        os.makedirs(log_path, exist_ok=True)
+        with open(os.path.join(log_path, "simulation.log"), "wb") as fds:
+            fds.write(b"RUN\tsimulation\tgatling-crlf\t1617110479263\t \t3.10.3\r\n")
+            fds.write(b"USER\tBasicSimulation\tSTART\t1617110480034\r\n")
+            fds.write(b"REQUEST\tgroup_1\trequest_1\t1617110480075\t1617110480090\tOK\t \r\n")
+            fds.write(b"GROUP\tgroup_1\t1617110480070\t1617110480095\t15\tOK\r\n")
+            fds.write(b"REQUEST\t\trequest_2\t1617110480075\t1617110480090\tOK\t \r\n")
+
+        obj = DataLogReader(BUILD_DIR, ROOT_LOGGER, 'gatling-crlf')
+        samples = list(obj._read(last_pass=True))
+        self.assertEqual("3.4+", obj.guessed_gatling_version)
+        self.assertEqual([
+            (1617110480, 'group_1', 1, 0.015, 0.0, 0.0, '200', None, '', None),
+            (1617110480, 'request_2', 1, 0.015, 0.0, 0.0, '200', None, '', None),
+        ], samples)
@@ -4,8 +4,9 @@ import datetime
 
 from bzt import ToolError
 from bzt.engine import EXEC
+from bzt.engine.scheduler import CheckScheduler
 from bzt.modules.provisioning import Local
-from tests.unit import BZTestCase, EngineEmul
+from tests.unit import BZTestCase, EngineEmul, RESOURCES_DIR
 
 
 class ScenarioExecutorEmul(object):
@@ -16,6 +17,18 @@ class ScenarioExecutorEmul(object):
         pass
 
 
+class ParallelExecutorEmul(ScenarioExecutorEmul):
+    def __init__(self, prepare_exc=None):
+        super(ParallelExecutorEmul, self).__init__()
+        self.prepare_exc = prepare_exc
+        self.was_prepared = False
+
+    def prepare(self):
+        self.was_prepared = True
+        if self.prepare_exc:
+            raise self.prepare_exc
+
+
 class LocalProvisioningEmul(Local):
     def __init__(self):
         super(LocalProvisioningEmul, self).__init__()
@@ -67,6 +80,27 @@ class LocalProvisioningTest(BZTestCase):
         self.assertTrue(self.check_slots(cur_time, 0, 1))  # 1 slot available
         self.assertTrue(self.check_slots(cur_time, 0, 3))  # some slots available
 
+    def test_start_order(self):
+        prov = LocalProvisioningEmul()
+        prov.engine.scheduler = CheckScheduler()
+        prov.start_time = time.time()
+        prov.available_slots = 10
+        prov.executors = [ScenarioExecutorEmul() for _ in range(4)]
+        for executor, delay in zip(prov.executors, (30, 0, 0.1, 0)):
+            executor.delay = delay
+
+        try:
+            prov._start_modules()
+            self.assertEqual([prov.executors[1], prov.executors[3]], prov.started_modules)
+            self.assertEqual(prov.start_time + 0.1, prov.engine.scheduler.timers[prov])  # wake up for next one
+
+            time.sleep(0.1)
+            prov._start_modules()
+            self.assertEqual(prov.executors[2], prov.started_modules[-1])
+            self.assertEqual(7, prov.available_slots)
+        finally:
+            prov.engine.scheduler.close()
+
     def test_start_shift(self):
         local = Local()
 
@@ -166,3 +200,49 @@ class LocalProvisioningTest(BZTestCase):
             self.assertEqual(exc.diagnostics, ['DIAGNOSTICS'])
         except BaseException as exc:
             self.fail("Was supposed to fail with ToolError, but crashed with %s" % exc)
+
+    def test_parallel_prepare(self):
+        local = Local()
+        local.engine = EngineEmul()
+        local.engine.config.merge({EXEC: [{}, {}, {}, {}], "settings": {"parallel-prepare": 3}})
+        local.engine.config.get("settings")["default-executor"] = "mock"
+        local.engine.unify_config()
+        local.prepare()
+
+        artifacts = [local.engine.create_artifact("same", ".txt") for _ in range(3)]
+        self.assertEqual(len(artifacts), len(set(artifacts)))
+
+        local.startup()
+        while not local.check():
+            pass
+        local.shutdown()
+
+    def test_parallel_prepare_same_script_name(self):
+        scripts = [RESOURCES_DIR + "selenium/invalid/dummy.py", RESOURCES_DIR + "plugins/bzt_plugin_dummy/dummy.py"]
+        local = Local()
+        local.engine = EngineEmul()
+        local.engine.config.merge({
+            EXEC: [{"scenario": {"script": script}} for script in scripts],
+            "settings": {"parallel-prepare": True, "default-executor": "mock"}})
+        local.engine.unify_config()
+        local.prepare()
+
+        labels = [executor.execution["scenario"] for executor in local.executors]
+        self.assertEqual("dummy.py", labels[0])
+        self.assertTrue(labels[1].startswith("autogenerated_"))
+        scenarios = local.engine.config["scenarios"]
+        self.assertEqual(scripts, [scenarios[label]["script"] for label in labels])
+        self.assertEqual(scripts, [executor.get_scenario()["script"] for executor in local.executors])
+
+    def test_parallel_prepare_exception(self):
+        local = Local()
+        local.engine = EngineEmul()
+        local.executors = [ParallelExecutorEmul(), ParallelExecutorEmul(ToolError("first")),
+                           ParallelExecutorEmul(ToolError("second"))]
+        try:
+            local._prepare_in_parallel(True)
+            self.fail("ToolError expected")
+        except ToolError as exc:
+            self.assertEqual("first", str(exc))
+
+        self.assertTrue(all(executor.was_prepared for executor in local.executors))
@@ -1,13 +1,76 @@
+import copy
 import json
+import math
 import time
+from collections import Counter
+
+from hdrpy import RecordedIterator
 
 from bzt.utils import to_json
 from tests.unit import BZTestCase, ROOT_LOGGER
 
-from bzt.modules.aggregator import ResultsReader, DataPoint, KPISet
+from bzt.modules.aggregator import ResultsReader, DataPoint, KPISet, RespTimesCounter
 from tests.unit.mocks import r, rc, err, MockReader
 
 
+class SinglePassIterator(RecordedIterator):
+    """
+    Reference implementation for RespTimesCounter: walks histogram once, the way aggregator did before.
+    Should do one pass and return:
+    - stddev
+    - percentiles
+    - histogram
+    """
+
+    def __init__(self, histogram, percentiles, mean):
+        super(SinglePassIterator, self).__init__(histogram)
+        assert mean is not None, "Known mean is required"
+        self.perc_levels = list(percentiles)
+        self.perc_levels.sort()
+        self._mean = mean
+        self._init()
+
+    def reset(self, histogram=None):
+        super(SinglePassIterator, self).reset(histogram)
+        self._init()
+
+    def _init(self):
+        self.percentiles = {}
+        self.stdev = 0
+        self.hist_values = {}
+        self._geometric_dev_total = 0.0
+        self._perc_indexes = list(self.perc_levels)
+
+    def __next__(self):
+        item = super(SinglePassIterator, self).__next__()
+
+        # histogram
+        self.hist_values[item.value_iterated_to] = item.count_at_value_iterated_to
+
+        # stddev FIXME: protected mt
+        dev = (self.histogram._hdr_median_equiv_value(item.value_iterated_to) * 1.0) - self._mean * 1000
+        self._geometric_dev_total += (dev * dev) * item.count_added_in_this_iter_step
+
+        # percentiles
+        self._fill_percentiles()
+
+        return item
+
+    def _fill_percentiles(self):
+        while self._perc_indexes and self._perc_indexes[0] <= self.get_percentile_iterated_to():
+            perc_level = self._perc_indexes.pop(0)
+            self.percentiles[perc_level] = self.value_at_index
+
+    next = __next__
+
+    def has_next(self):
+        has = super(SinglePassIterator, self).has_next()
+        if not has:
+            self.stdev = math.sqrt(self._geometric_dev_total / self.total_count)
+            assert set(self.perc_levels) == set(self.percentiles.keys()), 'Not all percentiles are generated'
+        return has
+
+
 class TestResultsReader(BZTestCase):
     def setUp(self):
         super(TestResultsReader, self).setUp()
@@ -94,6 +157,100 @@ class TestResultsReader(BZTestCase):
             self.assertNotIn("ignore1", point[DataPoint.CUMULATIVE].keys())
             self.assertNotIn("ignore2", point[DataPoint.CUMULATIVE].keys())
 
+    def test_cumulative_snapshot_sharing(self):
+        mock = MockReader()
+        mock.buffer_scale_idx = '100.0'
+        mock.data.append((1, "a", 1, 1, 1, 1, 200, None, '', 0))
+        mock.data.append((1, "b", 1, 2, 2, 2, 200, None, '', 0))
+        mock.data.append((2, "a", 1, 3, 3, 3, 200, None, '', 0))
+
+        first, second = list(mock.datapoints(True))
+        self.assertIs(first[DataPoint.CUMULATIVE]['b'], second[DataPoint.CUMULATIVE]['b'])
+        self.assertIsNot(first[DataPoint.CUMULATIVE]['a'], second[DataPoint.CUMULATIVE]['a'])
+        self.assertEqual(1, first[DataPoint.CUMULATIVE]['a'][KPISet.SAMPLE_COUNT])
+        self.assertEqual(2, second[DataPoint.CUMULATIVE]['a'][KPISet.SAMPLE_COUNT])
+        self.assertIsNot(mock.cumulative['a'], second[DataPoint.CUMULATIVE]['a'])
+
+    def test_samples_batch(self):
+        samples = [
+            (1, "a", 1, 1, 1, 1, 200, None, '', 10),
+            (1, "ignore-me", 1, 1, 1, 1, 200, None, '', 10),
+            (2, "b", 2, 2, 2, 2, 200, None, '', 20),
+            (2, "b", 3, 3, 3, 3, 404, "Not Found", '', 30),
+            (2, "", 1, 4, 4, 4, None, "OK", 'tr', None),
+            (3, "a", 1, -1, 5, 5, 200, None, '', 50),
+        ]
+
+        row_reader = MockReader()
+        row_reader.ignored_labels = ["ignore"]
+        row_reader.data.extend(samples)
+        list(row_reader.datapoints(True))
+
+        batch_reader = MockReader()
+        batch_reader.ignored_labels = ["ignore"]
+        batch = batch_reader.new_samples_batch()
+        batch.add_columns(*zip(*samples))
+        batch_reader.data.append(batch)
+        list(batch_reader.datapoints(True))
+
+        self.assertEqual(3, len(batch_reader.results))
+        for row_point, batch_point in zip(row_reader.results, batch_reader.results):
+            self.assertEqual(to_json(row_point[DataPoint.CUMULATIVE]), to_json(batch_point[DataPoint.CUMULATIVE]))
+
+        current = batch_reader.results[1][DataPoint.CURRENT]
+        self.assertEqual(['b', '[empty]', ''], list(current.keys()))
+        self.assertEqual(2, current['b'][KPISet.SAMPLE_COUNT])
+        self.assertEqual(3, current['b'][KPISet.CONCURRENCY])
+        self.assertEqual(1, current['b'][KPISet.FAILURES])
+        self.assertEqual(50, current['b'][KPISet.BYTE_COUNT])
+        self.assertEqual({200: 1, 404: 1}, dict(current['b'][KPISet.RESP_CODES]))
+        self.assertEqual("Not Found", current['b'][KPISet.ERRORS][0]['msg'])
+        self.assertEqual(404, current['b'][KPISet.ERRORS][0]['rc'])
+        self.assertEqual(0, current['[empty]'][KPISet.AVG_RESP_TIME])
+
+    def test_extend_aggregation(self):
+        mock = MockReader()
+        mock.extend_aggregation = True
+        mock.data.append((1, "a", 1, 1, 1, 1, 200, None, '', 0))
+        mock.data.append((1, "a", 1, 1, 1, 1, 200, "OK", '', 0))
+        mock.data.append((1, "a", 1, 1, 1, 1, 500, "Server Error", '', 0))
+        mock.data.append((1, "a", 1, 1, 1, 1, 200, None, '', 0))
+
+        point = list(mock.datapoints(True))[0]
+        current = point[DataPoint.CURRENT]
+        self.assertEqual(['a-success', 'a-jmeter_errors', 'a-http_errors', ''], list(current.keys()))
+        self.assertEqual(2, current['a-success'][KPISet.SAMPLE_COUNT])
+        self.assertEqual(4, current[''][KPISet.SAMPLE_COUNT])
+
+    def test_buffer_limit(self):
+        def get_reader(max_samples):
+            reader = MockReader()
+            reader.max_buffer_samples = max_samples
+            for idx in range(1000):
+                t_stamp = 1 + idx // 100
+                reader.data.append((t_stamp, "label%s" % (idx % 3), 1, idx / 1000.0, 0, 0, 200, None, '', 0))
+                if idx % 7 == 0:
+                    reader.data.append((t_stamp, "label0", 1, 0.5, 0, 0, 500, "Error %s" % (idx % 2), '', 0))
+            return reader
+
+        unlimited = get_reader(0)
+        limited = get_reader(20)
+        points = []
+        cycles = 0
+        while limited.data:
+            cycles += 1
+            points.extend(limited.datapoints())
+            self.assertLessEqual(limited.buffered_samples, 115)  # only latest second is kept as samples
+        points.extend(limited.datapoints(final_pass=True))
+        self.assertGreater(cycles, 1)  # reader was paused
+        expected = list(unlimited.datapoints(final_pass=True))
+
+        self.assertEqual([point[DataPoint.TIMESTAMP] for point in expected],
+                         [point[DataPoint.TIMESTAMP] for point in points])
+        for exp_point, point in zip(expected, points):
+            for kind in (DataPoint.CURRENT, DataPoint.CUMULATIVE):
+                self.assertEqual(json.loads(to_json(exp_point[kind])), json.loads(to_json(point[kind])))
+
     def test_speed(self):
         obj = self.obj
 
@@ -194,3 +351,103 @@ class TestResultsReader(BZTestCase):
                 rt = float(key)
                 self.assertGreaterEqual(rt, 1.0)
                 self.assertLessEqual(rt, 2.0)
+
+
+class TestKPISet(BZTestCase):
+    def test_errors_index(self):
+        kpiset = KPISet()
+        for idx in range(1000):
+            msg = "Error %s" % (idx % 100)
+            item = KPISet.error_item_skel(msg, "500", 1, KPISet.ERRTYPE_ERROR, Counter({"url%s" % idx: 1}), None)
+            KPISet.inc_list(kpiset[KPISet.ERRORS], ("msg", msg), item)
+
+        errors = kpiset[KPISet.ERRORS]
+        self.assertIsInstance(errors, list)
+        self.assertEqual(100, len(errors))
+        self.assertEqual(["Error %s" % idx for idx in range(100)], [item["msg"] for item in errors])
+        self.assertEqual({10}, set(item["cnt"] for item in errors))
+        self.assertEqual(10, len(errors[0]["urls"]))
+
+        errors.append(KPISet.error_item_skel("added", "404", 1, KPISet.ERRTYPE_ERROR, Counter(), None))
+        item = KPISet.error_item_skel("added", "404", 2, KPISet.ERRTYPE_ERROR, Counter(), None)
+        KPISet.inc_list(errors, ("msg", "added"), item)
+        self.assertEqual(101, len(errors))
+        self.assertEqual(3, errors[-1]["cnt"])
+
+        merged = KPISet()
+        merged.merge_kpis(kpiset)
+        merged.merge_kpis(copy.deepcopy(kpiset))
+        self.assertEqual(101, len(merged[KPISet.ERRORS]))
+        self.assertEqual(20, merged[KPISet.ERRORS][0]["cnt"])
+        self.assertEqual(10, kpiset[KPISet.ERRORS][0]["cnt"])
+        self.assertEqual(json.loads(to_json(kpiset[KPISet.ERRORS])), json.loads(to_json(list(errors))))
+
+    def test_derived_values_cached(self):
+        kpiset = KPISet(perc_levels=(50.0, 90.0, 100.0))
+        for rtm in (0.1, 0.2, 0.3, 0.4, 5.0):
+            kpiset.add_sample((1, rtm, 0, 0, 200, None, '', 0))
+        kpiset.recalculate()
+
+        percs = kpiset[KPISet.PERCENTILES]
+        self.assertIs(percs, kpiset[KPISet.PERCENTILES])  # not recalculated without changes
+        self.assertEqual({"50.0": 0.3, "90.0": 5.0, "100.0": 5.0}, percs)
+        stdev = kpiset[KPISet.STDEV_RESP_TIME]
+        self.assertAlmostEqual(1.9, stdev, delta=0.01)
+
+        kpiset.add_sample((1, 10.0, 0, 0, 200, None, '', 0))
+        kpiset.recalculate()
+        self.assertIsNot(percs, kpiset[KPISet.PERCENTILES])
+        self.assertEqual(10.0, kpiset[KPISet.PERCENTILES]["100.0"])
+        self.assertNotEqual(stdev, kpiset[KPISet.STDEV_RESP_TIME])
+
+    def test_stdev_follows_mean(self):
+        kpiset = KPISet()
+        kpiset.add_sample((1, 1.0, 0, 0, 200, None, '', 0))
+        kpiset.add_sample((1, 3.0, 0, 0, 200, None, '', 0))
+        self.assertGreater(kpiset[KPISet.STDEV_RESP_TIME], 2)  # read before averages are known
+        kpiset.recalculate()
+        self.assertAlmostEqual(1.0, kpiset[KPISet.STDEV_RESP_TIME], delta=0.01)
+
+    def test_resp_times_equivalence(self):
+        levels = [0.0, 50.0, 90.0, 95.0, 99.0, 99.9, 100.0]
+        counter = RespTimesCounter(1, 1000, 3, levels)
+        values = [(idx % 97) * 0.013 + (idx % 5) * 0.7 for idx in range(10000)]
+        for value in values:
+            counter.add(value)
+        counter.known_mean = sum(values) / len(values)
+
+        reference = SinglePassIterator(counter.histogram, levels, counter.known_mean)
+        for _ in reference:
+            pass
+
+        self.assertEqual(reference.percentiles, counter.get_percentiles_dict())
+        self.assertEqual(reference.hist_values, counter.get_counts())
+        self.assertAlmostEqual(reference.stdev / 1000.0, counter.get_stdev())
+        self.assertEqual({90.0: reference.percentiles[90.0]}, counter.get_percentiles_dict([90.0]))
+
+    def test_from_dict(self):
+        kpiset = KPISet(perc_levels=(50.0, 99.0))
+        for idx in range(100):
+            kpiset.add_sample((1, idx * 0.1, 0, 0, 200, None, '', 0))
+        kpiset.recalculate()
+
+        restored = KPISet.from_dict(json.loads(to_json(kpiset)))
+        self.assertEqual(kpiset[KPISet.PERCENTILES], restored[KPISet.PERCENTILES])
+        self.assertEqual(100, len(restored[KPISet.RESP_TIMES]))
+
+    def test_resp_times_merge_sizes(self):
+        big = RespTimesCounter(1, 60000, 3)
+        small = RespTimesCounter(1, 1000, 3)
+        for idx in range(1000):
+            small.add((idx % 97) * 0.01)
+            big.add(idx * 0.05)
+
+        expected = copy.deepcopy(big)
+        expected.histogram.add(small.histogram)  # hdrpy's bucket-by-bucket way
+        big.merge(small)
+        self.assertEqual(len(expected), len(big))
+        self.assertTrue((expected.histogram.counts == big.histogram.counts).all())
+
+        small.merge(big)  # grows
+        self.assertEqual(60000, small.high)
+        self.assertEqual(3000, len(small))
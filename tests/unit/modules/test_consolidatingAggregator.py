@@ -3,7 +3,9 @@ import json
 from random import random, choice
 
 from apiritif import random_string
-from bzt.modules.aggregator import ConsolidatingAggregator, DataPoint, KPISet, AggregatorListener
+from bzt import TaurusConfigError
+from bzt.modules.aggregator import ConsolidatingAggregator, DataPoint, KPISet, AggregatorListener, FuzzySetFolder, \
+    TrigramFolder
 from bzt.utils import to_json, BetterDict
 from tests.unit import BZTestCase, EngineEmul
 from tests.unit.mocks import r, MockReader
@@ -172,6 +174,19 @@ class TestConsolidatingAggregator(BZTestCase):
 
         self.assertEquals(2, cnt)
 
+    def test_reader_threads(self):
+        self.obj.settings['reader-threads'] = 4
+        self.obj.prepare()
+        for offset in range(4):
+            self.obj.add_underling(get_success_reader(offset))
+
+        points = list(self.obj.datapoints(final_pass=True))
+        self.obj.post_process()
+        self.assertIsNone(self.obj.reader_pool)
+        self.assertEqual(9, len(points))
+        self.assertEqual(44, points[-1][DataPoint.CUMULATIVE][''][KPISet.SAMPLE_COUNT])
+        self.assertEqual(4, len(self.obj.underlings_lag))
+
     def test_new_aggregator(self):
         # aggregator's config
         self.obj.extend_aggregation = True
@@ -311,6 +326,44 @@ class TestConsolidatingAggregator(BZTestCase):
         cum_dict = self.obj.cumulative
         self.assertEqual(len(cum_dict['']['errors']), 3)
 
+    def test_labels_masked_folding(self):
+        self.obj.track_percentiles = [50]
+        self.obj.prepare()
+        self.assertIsInstance(self.obj.known_labels, TrigramFolder)
+        mock = MockReader()
+        for x in range(2, 100):
+            mock.data.append((x, 'http://blazedemo.com/item/%s' % x, 1, r(), r(), r(), 200, '', '', 0))
+        self.obj.generalize_labels = 25
+        self.obj.add_underling(mock)
+        self.obj.shutdown()
+        self.obj.post_process()
+        labels = list(self.obj.cumulative.keys())
+        self.assertLessEqual(len(labels), self.obj.generalize_labels / 4 + 2)  # ids are folded since quarter is full
+
+    def test_small_labels_not_folded(self):
+        folder = TrigramFolder()
+        for x in range(5):
+            self.assertEqual('step %s' % x, folder.fold('step %s' % x, 100))
+        self.assertEqual('Step 1', folder.fold('Step 1', 100))
+        self.assertEqual(5, len(folder))
+
+    def test_fuzzy_folding_engine(self):
+        self.obj.track_percentiles = [50]
+        self.obj.settings['folding-engine'] = 'fuzzy'
+        self.obj.prepare()
+        self.assertIsInstance(self.obj.known_labels, FuzzySetFolder)
+        self.assertIsInstance(self.obj.known_errors, FuzzySetFolder)
+        reader = get_fail_reader()
+        self.obj.max_error_count = 9
+        self.obj.add_underling(reader)
+        self.obj.shutdown()
+        self.obj.post_process()
+        self.assertEqual(len(self.obj.cumulative['']['errors']), 3)
+
+    def test_unknown_folding_engine(self):
+        self.obj.settings['folding-engine'] = 'unknown'
+        self.assertRaises(TaurusConfigError, self.obj.prepare)
+
     def test_set_rtimes_len(self):
         self.obj.settings['histogram-initial'] = 10.0
         self.obj.prepare()
@@ -4,7 +4,7 @@ import bzt
 
 from bzt.modules.aggregator import DataPoint, KPISet
 from bzt.modules.k6 import K6Executor, K6LogReader
-from bzt.utils import EXE_SUFFIX
+from bzt.utils import EXE_SUFFIX, temp_file
 from tests.unit import BZTestCase, ExecutorTestCase, RESOURCES_DIR, ROOT_LOGGER
 
 TOOL_NAME = join(RESOURCES_DIR, "k6", "k6_mock" + EXE_SUFFIX)
@@ -62,6 +62,18 @@ class TestK6Executor(ExecutorTestCase):
         })
         self.assertIn(f"--out csv={self.obj.kpi_file}", self.CMD_LINE)
 
+    def test_json_output(self):
+        self.obj.settings.merge({"output-format": "json"})
+        self.simple_run({
+            "execution": {
+                "scenario": {"script": K6_SCRIPT},
+                "executor": "k6"
+            },
+        })
+        self.assertTrue(self.obj.kpi_file.endswith(".json"))
+        self.assertIn(f"--out json={self.obj.kpi_file}", self.CMD_LINE)
+        self.assertEqual("json", self.obj.reader.output_format)
+
     def test_concurrency(self):
         self.simple_run({
             "execution": {
@@ -105,3 +117,40 @@ class TestK6Reader(BZTestCase):
             self.assertTrue(datapoint['ts'] > 1500000000)
         self.assertEqual(points[-1][DataPoint.CUMULATIVE][''][KPISet.SUCCESSES], 2)
         self.assertEqual(points[-1][DataPoint.CUMULATIVE][''][KPISet.FAILURES], 2)
+
+    def test_read_json(self):
+        log_path = join(RESOURCES_DIR, "k6", "k6_kpi.json")
+        obj = K6LogReader(log_path, ROOT_LOGGER, "json")
+        samples = list(obj._read(last_pass=True))
+
+        self.assertEqual(4, len(samples))
+        tstamp, label, _, _, _, _, r_code, error, _, byte_count = samples[0]
+        self.assertEqual((1611843422, "https://blazedemo.com/", "200", None, 6295.0),
+                         (tstamp, label, r_code, error, byte_count))
+        self.assertEqual("lookup: no such host", samples[-1][7])
+
+    def test_read_interleaved(self):
+        tags = ",,,,GET,%s,HTTP/1.1,default,,200,,,%s,vu=%s"
+        rows = [
+            "metric_name,timestamp,metric_value,check,error,error_code,group,method,name,proto,scenario,service,status,"
+            "subproto,tls_version,url,extra_tags",
+            "http_reqs,10,1," + tags % ("/a", "/a", 1),
+            "http_reqs,10,1," + tags % ("/a", "/a", 2),
+            "http_req_duration,10,100," + tags % ("/a", "/a", 2),
+            "http_req_duration,10,200," + tags % ("/a", "/a", 1),
+        ]
+        for metric in ("http_req_connecting", "http_req_tls_handshaking", "http_req_waiting"):
+            rows.append(metric + ",10,50," + tags % ("/a", "/a", 1))
+            rows.append(metric + ",10,10," + tags % ("/a", "/a", 2))
+        rows.append("data_received,11,1000,,,,,,,,default,,,,,,vu=2")
+        rows.append("data_received,11,2000,,,,,,,,default,,,,,,vu=1")
+
+        log_path = temp_file()
+        with open(log_path, "w") as fds:
+            fds.write("\n".join(rows) + "\n")
+
+        obj = K6LogReader(log_path, ROOT_LOGGER)
+        samples = [(sample[3], sample[4], sample[9]) for sample in obj._read(last_pass=True)]
+        self.assertEqual([(0.1, 0.02, 1000.0), (0.2, 0.1, 2000.0)], samples)
+        self.assertEqual({}, obj.requests)
+        self.assertEqual({}, obj.iterations)
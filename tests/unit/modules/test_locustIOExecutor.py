@@ -1,3 +1,4 @@
+import json
 import os
 import sys
 import time
@@ -5,7 +6,7 @@ from unittest import mock
 
 import bzt
 from bzt import ToolError
-from bzt.utils import dehumanize_time, EXE_SUFFIX
+from bzt.utils import dehumanize_time, EXE_SUFFIX, temp_file
 from bzt.modules.jmeter import JTLReader
 from bzt.modules.aggregator import DataPoint, KPISet, ConsolidatingAggregator
 from bzt.modules._locustio import LocustIOExecutor, WorkersReader
@@ -130,10 +131,55 @@ class TestLocustIOExecutor(ExecutorTestCase):
     def test_locust_worker_results_errors(self):
         obj = WorkersReader(RESOURCES_DIR + "locust/locust-workers2.ldjson", 2, ROOT_LOGGER)
         points = [x for x in obj.datapoints(True)]
-        self.assertEquals(60, len(points))
+        self.assertEquals(61, len(points))  # one second has failures only
         for point in points:
             self.assertEquals(len(point[DataPoint.CURRENT][''][KPISet.ERRORS]), 1)
-            self.assertGreaterEqual(point[DataPoint.CURRENT][''][KPISet.FAILURES], 70)
+            self.assertGreater(point[DataPoint.CURRENT][''][KPISet.FAILURES], 0)
+
+        cumulative = points[-1][DataPoint.CUMULATIVE]['']
+        self.assertEqual(3985, cumulative[KPISet.FAILURES])  # sum of 'num_failures' of all reports
+        self.assertEqual(500, cumulative[KPISet.SUCCESSES])
+        self.assertEqual(3985, cumulative[KPISet.ERRORS][0]['cnt'])
+
+    def test_locust_worker_percentiles(self):
+        obj = WorkersReader(RESOURCES_DIR + "locust/locust-workers.ldjson", 2, ROOT_LOGGER)
+        points = list(obj.datapoints(True))
+        cumulative = points[-1][DataPoint.CUMULATIVE]['']
+        self.assertEqual(11145, cumulative[KPISet.SAMPLE_COUNT])
+        self.assertEqual(9962, len(cumulative[KPISet.RESP_TIMES]))  # old locust has no times of failures
+        self.assertEqual(5.0, cumulative[KPISet.PERCENTILES]['100.0'])
+        self.assertEqual(0.022, cumulative[KPISet.PERCENTILES]['50.0'])
+        self.assertEqual(sorted(point['ts'] for point in points), [point['ts'] for point in points])
+
+    def test_locust_worker_completeness(self):
+        def report(worker, per_sec):
+            stats = {"name": "/", "method": "GET", "num_requests": sum(per_sec.values()), "num_failures": 0,
+                     "num_reqs_per_sec": per_sec, "num_fail_per_sec": {}, "response_times": {"10": 2, "20": 2},
+                     "total_response_time": 60, "total_content_length": 100}
+            return json.dumps({"client_id": worker, "user_count": 1, "stats": [stats], "errors": {}}) + "\n"
+
+        filename = temp_file()
+        obj = WorkersReader(filename, 2, ROOT_LOGGER)
+        with open(filename, "w") as fds:
+            fds.write(report("first", {"10": 2, "11": 2}))
+            fds.flush()
+            self.assertEqual([], list(obj.datapoints()))  # second worker hasn't reported yet
+
+            fds.write(report("second", {"10": 1, "11": 1, "12": 2}))
+            fds.flush()
+            points = list(obj.datapoints())
+            self.assertEqual([10], [point['ts'] for point in points])  # first worker may add more to 11
+            self.assertEqual(3, points[0][DataPoint.CURRENT][''][KPISet.SAMPLE_COUNT])
+            self.assertEqual(2, points[0][DataPoint.CURRENT][''][KPISet.CONCURRENCY])
+
+            fds.write(report("first", {"11": 1, "13": 3}))
+            fds.flush()
+            points = list(obj.datapoints())
+            self.assertEqual([11], [point['ts'] for point in points])
+            self.assertEqual(4, points[0][DataPoint.CURRENT]['/'][KPISet.SAMPLE_COUNT])
+
+        points = list(obj.datapoints(True))
+        self.assertEqual([12, 13], [point['ts'] for point in points])
 
     def test_locust_delayed_worker(self):
         obj = WorkersReader(RESOURCES_DIR + "locust/locust-workers-none.ldjson", 2, ROOT_LOGGER)
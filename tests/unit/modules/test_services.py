@@ -8,7 +8,7 @@ from bzt import NormalShutdown, ToolError, TaurusConfigError
 from bzt.engine import Service, Provisioning, EngineModule
 from bzt.modules.blazemeter import CloudProvisioning
 from bzt.modules.services import Unpacker, InstallChecker, AndroidEmulatorLoader, AppiumLoader, PipInstaller, PythonTool
-from bzt.utils import get_files_recursive, EXE_SUFFIX, JavaVM, Node, is_windows
+from bzt.utils import get_files_recursive, EXE_SUFFIX, JavaVM, Node, is_windows, get_full_path, temp_file
 from tests.unit import BZTestCase, RESOURCES_DIR, EngineEmul
 from tests.unit.mocks import ModuleMock, BZMock
 
@@ -60,6 +60,17 @@ class TestPythonTool(BZTestCase):
         self.obj.check_if_installed()
         self.assertIn("PythonTool check failed.", self.log_recorder.warn_buff.getvalue())
 
+    def test_check_key(self):
+        self.engine.temp_pythonpath = get_full_path(temp_file()) + "-packages"
+        first_run = self.obj._get_check_key()
+        self.engine.temp_pythonpath = get_full_path(temp_file()) + "-packages"
+        self.assertEqual(first_run, self.obj._get_check_key())  # new artifacts dir of every run doesn't matter
+
+        os.makedirs(self.engine.temp_pythonpath)
+        with open(os.path.join(self.engine.temp_pythonpath, "module.py"), "w") as fds:
+            fds.write("")
+        self.assertIsNone(self.obj._get_check_key())  # installed into temp dir, can't be reused
+
 
 class TestZipFolder(BZTestCase):
     def test_pack_and_send_to_blazemeter(self):
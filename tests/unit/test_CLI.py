@@ -3,11 +3,13 @@ import logging
 import os
 import re
 import shutil
+import subprocess
+import sys
 
 from bzt import TaurusException
 from tests.unit import BZTestCase, RESOURCES_DIR, BUILD_DIR
 
-from bzt.cli import CLI, ConfigOverrider, get_option_parser
+from bzt.cli import CLI, ConfigOverrider, get_option_parser, get_import_profile
 from bzt.engine import Configuration
 from tests.unit import EngineEmul
 from tests.unit.mocks import ModuleMock
@@ -22,6 +24,7 @@ class TestCLI(BZTestCase):
         self.verbose = False
         self.quiet = True
         self.no_system_configs = True
+        self.recheck_tools = False
         self.option = []
 
         self.obj = CLI(self)
@@ -246,6 +249,27 @@ class TestCLI(BZTestCase):
         self.assertEquals(0, ret)
 
 
+class TestStartupImports(BZTestCase):
+    MAX_STARTUP_MODULES = 250  # ~190 at the time of writing, it was ~570 before lazy imports
+
+    def test_startup_modules_count(self):
+        cmd = [sys.executable, "-c", "import sys, bzt.cli; print(len(sys.modules)); print(' '.join(sys.modules))"]
+        out = subprocess.check_output(cmd, universal_newlines=True)
+        count, modules = out.splitlines()
+        self.assertLess(int(count), self.MAX_STARTUP_MODULES)
+
+        modules = set(modules.split())
+        for heavy in ("requests", "urwid", "psutil", "progressbar", "selenium", "lxml", "distutils.version"):
+            self.assertNotIn(heavy, modules)
+
+    def test_import_profile(self):
+        records = get_import_profile(limit=5)
+        self.assertEqual(5, len(records))
+        self.assertEqual("bzt.cli", records[0][2])
+        cumulative = [rec[1] for rec in records]
+        self.assertEqual(sorted(cumulative, reverse=True), cumulative)
+
+
 class TestConfigOverrider(BZTestCase):
     def setUp(self):
         super(TestConfigOverrider, self).setUp()
@@ -1,9 +1,11 @@
 # coding=utf-8
 import json
+import os
 
 from bzt.engine import Configuration
-from bzt.utils import BetterDict, dehumanize_time, temp_file
-from tests.unit import BZTestCase, RESOURCES_DIR, BASE_CONFIG, ROOT_LOGGER, EngineEmul
+from bzt.engine.dicts import ConfigCache
+from bzt.utils import BetterDict, dehumanize_time, temp_file, to_json, get_uniq_name
+from tests.unit import BZTestCase, RESOURCES_DIR, BASE_CONFIG, ROOT_LOGGER, EngineEmul, BUILD_DIR
 
 
 class TestConfiguration(BZTestCase):
@@ -199,6 +201,139 @@ class TestConfiguration(BZTestCase):
         self.assertEqual(dump["foo"], "inf")
         self.assertEqual(dehumanize_time(dump["foo"]), float("inf"))
 
+    def test_dump_sanitized(self):
+        obj = Configuration()
+        obj.merge({
+            "token": "my-precious",
+            "list": [{"secret": "s"}, float("-inf")],
+            "nested": {"my_password": "qweasdzxc", "nan": float("nan"), "timeout": 1.5},
+        })
+        for fmt in (Configuration.JSON, Configuration.YAML):
+            fname = temp_file()
+            obj.dump(fname, fmt)
+            checker = Configuration()
+            checker.load([fname])
+            self.assertEqual("*" * 8, checker["token"])
+            self.assertEqual("*" * 8, checker["list"][0]["secret"])
+            self.assertEqual("-inf", checker["list"][1])
+            self.assertEqual("*" * 8, checker["nested"]["my_password"])
+            self.assertEqual("nan", checker["nested"]["nan"])
+            self.assertEqual(1.5, checker["nested"]["timeout"])
+
+        self.assertEqual("my-precious", obj["token"])
+        self.assertEqual(float("-inf"), obj["list"][1])
+
+    def test_dump_same_as_to_json(self):
+        obj = Configuration()
+        obj.load([BASE_CONFIG, RESOURCES_DIR + "json/jmx.json"])
+        fname = temp_file()
+        obj.dump(fname, Configuration.JSON)
+        with open(fname) as fds:
+            self.assertEqual(to_json(obj) + "\n", fds.read())
+
+    def test_dump_unchanged(self):
+        obj = Configuration()
+        obj.merge({"key": "val"})
+        fname = temp_file()
+        obj.set_dump_file(fname)
+        obj.dump()
+        with open(fname + ".json", "w") as fds:
+            fds.write("{}")
+
+        obj.dump()  # nothing changed, file is not rewritten
+        with open(fname + ".json") as fds:
+            self.assertEqual("{}", fds.read())
+
+        obj["key"] = "other"
+        obj.dump()
+        checker = Configuration()
+        checker.load([fname + ".json", fname + ".yml"])
+        self.assertEqual("other", checker["key"])
+
+    def test_dump_in_background(self):
+        obj = Configuration()
+        obj.merge({"key": "val", "password": "pwd"})
+        fname = temp_file()
+        obj.set_dump_file(fname, background=True)
+        for idx in range(10):
+            obj["key"] = idx
+            obj.dump()
+        obj.wait_for_dump()
+        for ext in (".json", ".yml"):
+            checker = Configuration()
+            checker.load([fname + ext])
+            self.assertEqual(9, checker["key"])
+            self.assertEqual("*" * 8, checker["password"])
+
+    def test_dump_background_same_as_foreground(self):
+        obj = Configuration()
+        obj.load([BASE_CONFIG, RESOURCES_DIR + "json/jmx.json"])
+        obj.merge({"token": "my-precious", "inf": float("inf"), "tuple": (1, {"secret": "s"})})
+        fg_name = temp_file()
+        obj.set_dump_file(fg_name)
+        obj.dump()
+
+        bg_name = temp_file()
+        obj.set_dump_file(bg_name, background=True)
+        obj.dump()
+        obj.wait_for_dump()
+
+        for ext in (".json", ".yml"):
+            with open(fg_name + ext, "rb") as fg_fds, open(bg_name + ext, "rb") as bg_fds:
+                self.assertEqual(fg_fds.read(), bg_fds.read())
+
+    def test_cached_load(self):
+        fname = temp_file(".yml")
+        with open(fname, "w") as fds:
+            fds.write("key: val\nlist: [1, 2]\n")
+
+        cache = ConfigCache(get_uniq_name(BUILD_DIR, "config-cache"))
+        parsed = []
+
+        def parse(filename, contents):
+            parsed.append(filename)
+            return Configuration()._parse_contents(filename, contents)
+
+        self.assertEqual([{"key": "val", "list": [1, 2]}], cache.load(fname, parse))
+        self.assertEqual([{"key": "val", "list": [1, 2]}], cache.load(fname, parse))
+        self.assertEqual(1, len(parsed))
+
+        os.utime(fname, (0, 0))  # same content, different mtime
+        cache.load(fname, parse)
+        self.assertEqual(1, len(parsed))
+
+        with open(fname, "w") as fds:
+            fds.write("key: other\n")
+        self.assertEqual([{"key": "other"}], cache.load(fname, parse))
+        self.assertEqual(2, len(parsed))
+
+        obj = Configuration()
+        obj.set_cache_dir(cache.cache_dir)
+        obj.load([fname])
+        self.assertEqual("other", obj["key"])
+        self.assertEqual(2, len(parsed))
+
+    def test_cached_load_coarse_mtime(self):
+        fname = temp_file(".yml")
+        cache = ConfigCache(get_uniq_name(BUILD_DIR, "config-cache"))
+        parse = Configuration()._parse_contents
+        for value in ("val1", "val2"):  # same size, same whole-second mtime
+            with open(fname, "w") as fds:
+                fds.write("key: %s\n" % value)
+            os.utime(fname, (1000000000, 1000000000))
+            self.assertEqual([{"key": value}], cache.load(fname, parse))
+
+    def test_cache_eviction(self):
+        cache = ConfigCache(get_uniq_name(BUILD_DIR, "config-cache"))
+        cache.MAX_ENTRIES = 2
+        for idx in range(3):
+            fname = temp_file(".yml")
+            with open(fname, "w") as fds:
+                fds.write("key: %s\n" % idx)
+            cache.load(fname, Configuration()._parse_contents)
+
+        self.assertEqual(2, len([name for name in os.listdir(cache.cache_dir) if name.endswith(".pickle")]))
+
     def test_overwrite_execution_locations(self):
         obj = Configuration()
         obj.merge({
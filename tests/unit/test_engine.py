@@ -1,14 +1,20 @@
 """ unit test """
+import csv
 import os
 import sys
+import threading
+import time
 
 import yaml
 
 import bzt
 from bzt import TaurusConfigError
 from bzt.engine import Configuration, EXEC
-from bzt.utils import BetterDict, is_windows, get_full_path, get_uniq_name, communicate
+from bzt.engine.profiler import EngineProfiler
+from bzt.engine.scheduler import CheckScheduler
+from bzt.utils import BetterDict, is_windows, get_full_path, get_uniq_name, communicate, shell_exec, temp_file
 from tests.unit import local_paths_config, RESOURCES_DIR, BZTestCase, ExecutorTestCase, TEST_DIR, EngineEmul
+from tests.unit import BUILD_DIR
 
 
 class MockClient(object):
@@ -279,6 +285,33 @@ class TestEngine(BZTestCase):
         finally:
             sys.path.remove(RESOURCES_DIR + "plugins")
 
+    def test_cached_package_configs(self):
+        self.obj.config.set_cache_dir(get_uniq_name(BUILD_DIR, "config-cache"))
+        sys.path.append(RESOURCES_DIR + "plugins")
+        try:
+            first = self.obj._scan_package_configs()
+            self.obj._find_package_configs = None  # must not be called for warm cache
+            self.assertEqual(first, self.obj._scan_package_configs())
+            self.assertTrue(any(config.endswith("50-dummy.yml") for config in first))
+        finally:
+            sys.path.remove(RESOURCES_DIR + "plugins")
+
+    def test_cached_package_configs_new_artifacts(self):
+        self.obj.config.set_cache_dir(get_uniq_name(BUILD_DIR, "config-cache"))
+        curdir = os.getcwd()
+        workdir = get_uniq_name(BUILD_DIR, "workdir")
+        os.makedirs(workdir)
+        os.chdir(workdir)
+        sys.path.insert(0, os.path.curdir)
+        try:
+            first = self.obj._scan_package_configs()
+            os.makedirs(os.path.join(workdir, "2021-01-01_00-00-00.000000"))  # artifacts dir of next run
+            self.obj._find_package_configs = None  # must not be called for warm cache
+            self.assertEqual(first, self.obj._scan_package_configs())
+        finally:
+            sys.path.pop(0)
+            os.chdir(curdir)
+
 
 class TestScenarioExecutor(ExecutorTestCase):
     def test_timers(self):
@@ -484,3 +517,164 @@ class TestScenarioExecutor(ExecutorTestCase):
     def test_get_load_str_fail(self):
         self.configure({EXEC: {"concurrency": "2VU"}})
         self.assertRaises(TaurusConfigError, self.obj.get_load)
+
+
+class CheckCounter(object):
+    def __init__(self, interval=None, finish_after=None):
+        self.interval = interval
+        self.finish_after = finish_after
+        self.checks = []
+
+    def get_check_interval(self):
+        return self.interval
+
+    def check(self):
+        self.checks.append(time.time())
+        return self.finish_after is not None and len(self.checks) >= self.finish_after
+
+
+class TestCheckScheduler(BZTestCase):
+    def setUp(self):
+        super(TestCheckScheduler, self).setUp()
+        self.obj = CheckScheduler(min_interval=0.01)
+
+    def tearDown(self):
+        self.obj.close()
+        super(TestCheckScheduler, self).tearDown()
+
+    def run_loop(self, duration=None, iterations=None):
+        start = time.time()
+        while time.time() - start < duration if iterations is None else iterations:
+            for module in self.obj.wait():
+                self.obj.start_check(module)
+                module.check()
+            if iterations is not None:
+                iterations -= 1
+
+    def test_own_cadence(self):
+        fast, slow = CheckCounter(), CheckCounter()
+        self.obj.add_module(fast, 0.05)
+        self.obj.add_module(slow, 0.5)
+        self.run_loop(0.45)
+        self.assertEqual(1, len(slow.checks))
+        self.assertGreater(len(fast.checks), 5)
+
+    def test_wake_up(self):
+        module = CheckCounter()
+        self.obj.add_module(module, 10)
+        threading.Timer(0.1, self.obj.wake_up, args=(module,)).start()
+        self.run_loop(iterations=2)
+        self.assertLess(module.checks[1] - module.checks[0], 1)
+
+    def test_wake_up_at(self):
+        module = CheckCounter()
+        self.obj.add_module(module, 10)
+        self.run_loop(iterations=1)
+        self.obj.wake_up_at(module, time.time() + 0.1)
+        self.run_loop(iterations=1)
+        self.assertAlmostEqual(0.1, module.checks[1] - module.checks[0], delta=0.05)
+        self.assertEqual({}, self.obj.timers)
+
+    def test_watch_process(self):
+        module = CheckCounter()
+        self.obj.add_module(module, 10)
+        process = shell_exec([sys.executable, "-c", "import time; time.sleep(0.1)"])
+        if not self.obj.watch_process(process, module):
+            self.skipTest("pidfd is unavailable")
+
+        self.run_loop(iterations=2)
+        process.wait()
+        self.assertLess(module.checks[1] - module.checks[0], 1)
+        self.assertEqual({}, self.obj.sources)
+
+    def test_watch_file(self):
+        module = CheckCounter()
+        self.obj.add_module(module, 10, file_interval=0.1)
+        filename = get_full_path(temp_file())
+        if not self.obj.watch_file(filename, module):
+            self.skipTest("inotify is unavailable")
+
+        threading.Timer(0.1, lambda: open(filename, "a").write("data")).start()
+        self.run_loop(iterations=2)
+        self.assertLess(module.checks[1] - module.checks[0], 1)
+
+    def test_watch_file_coalesced(self):
+        module = CheckCounter()
+        self.obj.add_module(module, 10, file_interval=0.2)
+        filename = get_full_path(temp_file())
+        if not self.obj.watch_file(filename, module):
+            self.skipTest("inotify is unavailable")
+
+        stop = threading.Event()
+
+        def writer():
+            with open(filename, "a") as fds:
+                while not stop.wait(0.01):
+                    fds.write("data\n")
+                    fds.flush()
+
+        threading.Thread(target=writer).start()
+        try:
+            self.run_loop(duration=0.7)
+        finally:
+            stop.set()
+
+        intervals = [second - first for first, second in zip(module.checks, module.checks[1:])]
+        self.assertGreater(len(intervals), 1)
+        self.assertGreaterEqual(min(intervals), 0.19)
+
+    def test_no_modules(self):
+        self.obj.check_interval = 0.2
+        start = time.time()
+        self.assertEqual([], self.obj.wait())
+        self.assertGreaterEqual(time.time() - start, 0.19)
+
+
+class TestEngineLoop(BZTestCase):
+    def setUp(self):
+        super(TestEngineLoop, self).setUp()
+        self.obj = EngineEmul()
+
+    def test_modules_intervals(self):
+        self.obj.check_interval = 0.3
+        self.obj.provisioning = CheckCounter(finish_after=3)
+        self.obj.aggregator = CheckCounter()
+        self.obj.reporters = [CheckCounter(interval=0.05)]
+        self.obj.started = [self.obj.provisioning, self.obj.aggregator] + self.obj.reporters
+        try:
+            self.obj._wait()
+        finally:
+            self.obj.scheduler.close()
+
+        self.assertEqual(3, len(self.obj.provisioning.checks))
+        self.assertGreater(len(self.obj.reporters[0].checks), 3 * len(self.obj.aggregator.checks))
+        self.assertIn("CheckCounter", self.obj.modules_loop_utilization)
+
+    def test_profile(self):
+        self.obj.config.merge({"settings": {"profile": True, "profile-sampling-interval": "5ms"}})
+        self.obj.config.merge({EXEC: [{"executor": "mock"}]})
+        self.obj.prepare()
+        self.obj.run()
+        self.obj.post_process()
+
+        with open(os.path.join(self.obj.artifacts_dir, EngineProfiler.TIMINGS_FILE)) as fds:
+            rows = list(csv.DictReader(fds))
+        stages = {(row["stage"], row["module"]) for row in rows}
+        self.assertIn(("check", "ModuleMock"), stages)
+        self.assertIn(("post_process", "ModuleMock"), stages)
+
+        with open(os.path.join(self.obj.artifacts_dir, EngineProfiler.STACKS_FILE)) as fds:
+            stacks = fds.readlines()
+        self.assertTrue(any(line.startswith("MainThread;") for line in stacks))
+        self.assertTrue(all(line.rsplit(" ", 1)[1].strip().isdigit() for line in stacks))
+
+    def test_artifacts_blob_store(self):
+        self.obj.config.merge({"settings": {"artifacts-blob-store": True}})
+        self.obj.config.merge({EXEC: [{"executor": "mock"}]})
+        self.obj.prepare()
+        ref = self.obj.store_artifact_data("sample-responseBody", ".bin", b"body")
+        self.assertEqual(ref, self.obj.store_artifact_data("sample-responseBody", ".bin", b"body"))
+        self.assertEqual(b"body", self.obj.blob_store.get(ref))
+        self.assertFalse(os.path.exists(os.path.join(self.obj.artifacts_dir, "sample-responseBody.bin")))
+        self.obj.post_process()
+        self.assertTrue(os.path.exists(os.path.join(self.obj.artifacts_dir, "blobs.pack")))
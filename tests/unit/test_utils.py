@@ -3,13 +3,17 @@
 import os
 import sys
 import logging
+import tempfile
+import threading
+import time
 
 from psutil import Popen
 from os.path import join
 
 from bzt import TaurusNetworkError
 from bzt.utils import log_std_streams, get_uniq_name, JavaVM, ToolError, is_windows, HTTPClient, BetterDict
-from bzt.utils import ensure_is_dict, Environment, temp_file, communicate
+from bzt.utils import ensure_is_dict, Environment, temp_file, communicate, RequiredTool, ToolsCheckCache
+from bzt.utils import UniqueNames, BlobStore, read_file_tail
 from tests.unit import BZTestCase, RESOURCES_DIR
 from tests.unit.mocks import MockFileReader
 
@@ -192,6 +196,16 @@ class TestMisc(BZTestCase):
 
         self.assertEqual(output, ("output", "error"))
 
+    def test_lazy_attrs(self):
+        import bzt.utils
+        from lxml import etree
+        from bzt.ui_helpers import ProgressBarContext
+
+        self.assertIs(etree.Element, bzt.utils.etree.Element)
+        self.assertRaises(AttributeError, getattr, bzt.utils.psutil, "no_such_attr")
+        self.assertIs(ProgressBarContext, bzt.utils.ProgressBarContext)
+        self.assertRaises(AttributeError, getattr, bzt.utils, "no_such_attr")
+
 
 class TestJavaVM(BZTestCase):
     def test_missed_tool(self):
@@ -219,6 +233,149 @@ class TestJavaVM(BZTestCase):
         self.assertEqual("8", self.obj._get_version(out2))
 
 
+class TestRequiredToolInstall(BZTestCase):
+    def test_locked_install(self):
+        installs = []
+
+        class SlowTool(RequiredTool):
+            def check_if_installed(self):
+                return bool(installs)
+
+            def install(self):
+                time.sleep(0.1)
+                installs.append(self)
+                return self.tool_path
+
+        class NestedTool(SlowTool):
+            def install(self):  # nested install call for the same tool mustn't deadlock
+                return super(NestedTool, self).install()
+
+        tools = [NestedTool(tool_path="slow-tool", version="1") for _ in range(4)]
+        threads = [threading.Thread(target=tool.install) for tool in tools]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(installs))
+
+        other_version = NestedTool(tool_path="slow-tool", version="2")
+        other_version.install()
+        self.assertEqual(2, len(installs))
+
+
+class TestToolsCheckCache(BZTestCase):
+    def setUp(self):
+        super(TestToolsCheckCache, self).setUp()
+        self.checks = []
+        self.binary = temp_file()
+        with open(self.binary, "w") as fds:
+            fds.write("#!/bin/sh")
+
+    def get_tool(self, cache, tool_path=None):
+        checks = self.checks
+
+        class ProbedTool(RequiredTool):
+            def check_if_installed(self):
+                checks.append(self)
+                self.version = "1.2.3"
+                return True
+
+        return ProbedTool(tool_path=tool_path or self.binary, check_cache=cache)
+
+    def test_cached_check(self):
+        cache = ToolsCheckCache(temp_file(".json"), ttl=60)
+        self.assertTrue(self.get_tool(cache).check_if_installed())
+        tool = self.get_tool(cache)
+        self.assertTrue(tool.check_if_installed())
+        self.assertEqual(1, len(self.checks))
+        self.assertEqual("1.2.3", tool.version)
+
+        self.get_tool(None).check_if_installed()  # no cache given
+        self.assertEqual(2, len(self.checks))
+
+        cache = ToolsCheckCache(cache.filename, ttl=60)  # persistence
+        self.get_tool(cache).check_if_installed()
+        self.assertEqual(2, len(self.checks))
+
+        os.utime(self.binary, (0, 0))  # tool binary is changed
+        self.get_tool(cache).check_if_installed()
+        self.assertEqual(3, len(self.checks))
+
+        cache.recheck = True
+        self.get_tool(cache).check_if_installed()
+        self.assertEqual(4, len(self.checks))
+
+    def test_ttl(self):
+        cache = ToolsCheckCache(temp_file(".json"), ttl=0.01)
+        self.get_tool(cache).check_if_installed()
+        time.sleep(0.02)
+        self.get_tool(cache).check_if_installed()
+        self.assertEqual(2, len(self.checks))
+
+    def test_expired_and_extra_entries(self):
+        cache = ToolsCheckCache(temp_file(".json"), ttl=60)
+        cache.MAX_ENTRIES = 2
+        for idx in range(3):
+            cache.put("key%s" % idx, self.binary, "1.2.3")
+        self.assertEqual(["key1", "key2"], sorted(cache.entries.keys()))
+
+        cache.entries["key1"]["time"] -= 120
+        cache.put("key3", self.binary, "1.2.3")
+        reloaded = ToolsCheckCache(cache.filename, ttl=60)
+        self.assertEqual(["key2", "key3"], sorted(reloaded._load().keys()))
+
+    def test_stat_path(self):
+        cache = ToolsCheckCache(temp_file(".json"), ttl=60)
+        cache.put("key", "/run-specific/path", "1.2.3", stat_path=self.binary)
+        self.assertEqual((None, "1.2.3"), cache.get("key"))
+        os.utime(self.binary, (0, 0))
+        self.assertIsNone(cache.get("key"))
+
+    def test_missing_binary(self):
+        cache = ToolsCheckCache(temp_file(".json"), ttl=60)
+        for _ in range(2):
+            self.get_tool(cache, tool_path="no-such-tool-binary").check_if_installed()
+        self.assertEqual(2, len(self.checks))
+
+
+class TestUniqueNames(BZTestCase):
+    def test_names(self):
+        directory = tempfile.mkdtemp()
+        open(os.path.join(directory, "sample-1.bin"), "w").close()
+        names = UniqueNames()
+        got = [names.get(directory, "sample", ".bin") for _ in range(3)]
+        expected = [os.path.join(directory, name) for name in ("sample.bin", "sample-2.bin", "sample-3.bin")]
+        self.assertEqual(expected, got)
+        self.assertIn(got[0], names)
+
+        names.add(os.path.join(directory, "other.log"))
+        self.assertEqual(os.path.join(directory, "other-1.log"), names.get(directory, "other", ".log"))
+
+        # same names as get_uniq_name() gives
+        for name in got:
+            open(name, "w").close()
+        self.assertEqual(get_uniq_name(directory, "sample", ".bin"), names.get(directory, "sample", ".bin"))
+
+
+class TestBlobStore(BZTestCase):
+    def test_store(self):
+        pack, index = temp_file(".pack"), temp_file(".idx")
+        store = BlobStore(pack, index)
+        first = store.put(b"response")
+        second = store.put(b"other response")
+        self.assertEqual(first, store.put(b"response"))  # deduplicated
+        self.assertEqual(b"other response", store.get(second))
+        store.close()
+        self.assertEqual(len(b"response") + len(b"other response"), os.path.getsize(pack))
+
+        store = BlobStore(pack, index)  # index is loaded from file
+        self.assertEqual(b"response", store.get(first))
+        self.assertEqual(first, store.put(b"response"))
+        store.close()
+        self.assertEqual(2, len(open(index).readlines()))
+
+
 class TestLogStreams(BZTestCase):
     def test_streams(self):
         self.sniff_log()
@@ -312,6 +469,70 @@ class TestFileReader(BZTestCase):
         self.configure(join(RESOURCES_DIR, 'jmeter', 'jtl', 'unicode.jtl'))
         self.obj.get_bytes(size=180)  # shouldn't crash with UnicodeDecodeError
 
+    def test_complete_lines(self):
+        filename = temp_file()
+        with open(filename, "wb") as fds:
+            fds.write(b"first\nsec")
+        self.configure(filename)
+        self.assertEqual(["first"], list(self.obj.get_complete_lines()))
+
+        with open(filename, "ab") as fds:
+            fds.write("ond\nтретья\nfourth".encode("utf-8"))
+        self.assertEqual(["second"], list(self.obj.get_complete_lines(size=5)))  # partial line is kept
+        self.assertEqual(["третья"], list(self.obj.get_complete_lines()))
+        self.assertEqual("fourth", self.obj.get_complete_text(last_pass=True))
+
+    def test_complete_byte_lines(self):
+        filename = temp_file()
+        with open(filename, "wb") as fds:
+            fds.write(b"first\n\nsec")
+        self.configure(filename)
+        self.assertEqual([b"first", b""], list(self.obj.get_complete_byte_lines()))
+        self.assertEqual([], list(self.obj.get_complete_byte_lines()))
+
+        with open(filename, "ab") as fds:
+            fds.write(b"ond\nthird")
+        self.assertEqual([b"second", b"third"], list(self.obj.get_complete_byte_lines(last_pass=True)))
+
+    def test_complete_byte_lines_crlf(self):
+        filename = temp_file()
+        with open(filename, "wb") as fds:
+            fds.write(b"first\r\nsecond\r")
+        self.configure(filename)
+        self.assertEqual([b"first"], list(self.obj.get_complete_byte_lines()))
+        with open(filename, "ab") as fds:
+            fds.write(b"\n")
+        self.assertEqual([b"second"], list(self.obj.get_complete_byte_lines()))
+
+    def test_complete_lines_crlf(self):
+        filename = temp_file()
+        with open(filename, "wb") as fds:
+            fds.write(b"first\r\nsecond\r")
+        self.configure(filename)
+        self.assertEqual(["first"], list(self.obj.get_complete_lines()))
+        with open(filename, "ab") as fds:
+            fds.write(b"\n")
+        self.assertEqual(["second"], list(self.obj.get_complete_lines()))
+
+    def test_complete_lines_last_pass(self):
+        filename = temp_file()
+        with open(filename, "wb") as fds:
+            fds.write(b"".join(b"line %d\n" % num for num in range(1000)) + b"long" * 50 + b"\nlast")
+        self.configure(filename)
+        lines = list(self.obj.get_complete_lines(size=100, last_pass=True))  # read block by block
+        self.assertEqual(["line %d" % num for num in range(1000)] + ["long" * 50, "last"], lines)
+
+    def test_read_file_tail(self):
+        filename = temp_file()
+        with open(filename, "w") as fds:
+            fds.write("".join("line %s\n" % num for num in range(10000)))
+
+        self.assertEqual("line 0\nline 1\n", read_file_tail(filename, size=1024 * 1024)[:14])
+        tail = read_file_tail(filename, size=100)
+        self.assertTrue(tail.startswith("...\nline "))
+        self.assertTrue(tail.endswith("line 9999\n"))
+        self.assertLessEqual(len(tail), 100 + len("...\n"))
+
 
 class TestHTTPClient(BZTestCase):
     def test_proxy_setup(self):